@@ -0,0 +1,125 @@
+from loguru import logger as log
+
+from GtkHelper.GenerativeUI.ExpanderRow import ExpanderRow
+from GtkHelper.GenerativeUI.ScaleRow import ScaleRow
+from src.backend.DeckManagement.InputIdentifier import Input
+from src.backend.PluginManager.EventAssigner import EventAssigner
+from ..globals import Icons
+from ..internal.PulseHelpers import bounded_volume_values
+
+
+class AdjustCore:
+    # Mixin for AudioCore subclasses that step the volume of their target up and down. The current volume is read
+    # through get_indicator_state, subclasses write the step in write_adjustment
+    adjust_event_name: str = "volume"
+    adjust_event_label: str = "Volume"
+
+    def create_adjust_ui(self):
+        self.adjust: int = 1
+        self.bounds = 100
+
+        self.volume_adjust_row = ExpanderRow(
+            action_core=self,
+            var_name="adjust-expander",
+            default_value=False,
+            title="Volume Adjust Row",
+        )
+
+        self.volume_adjust_scale = ScaleRow(
+            action_core=self,
+            var_name="volume-adjust",
+            default_value=1,
+            min=-100,
+            max=100,
+            step=1,
+            digits=0,
+            title="Adjustment",
+            draw_value=True,
+            on_change=self.on_volume_adjust_change
+        )
+
+        self.volume_bound_scale = ScaleRow(
+            action_core=self,
+            var_name="volume-bounds",
+            default_value=100,
+            min=0,
+            max=150,
+            step=1,
+            digits=0,
+            title="Maximum Audio Bounds",
+            draw_value=True,
+            on_change=self.on_volume_bound_change
+        )
+
+        self.volume_adjust_row.add_row(self.volume_adjust_scale.widget)
+        self.volume_adjust_row.add_row(self.volume_bound_scale.widget)
+
+    def create_event_assigners(self):
+        self.add_event_assigner(EventAssigner(
+            id=f"adjust-{self.adjust_event_name}-positive",
+            ui_label=f"Adjust {self.adjust_event_label} Positive",
+            default_events=[Input.Key.Events.DOWN, Input.Dial.Events.TURN_CW],
+            callback=self.event_adjust_volume_positive
+        ))
+
+        self.add_event_assigner(EventAssigner(
+            id=f"adjust-{self.adjust_event_name}-negative",
+            ui_label=f"Adjust {self.adjust_event_label} Negative",
+            default_event=Input.Dial.Events.TURN_CCW,
+            callback=self.event_adjust_volume_negative
+        ))
+
+    def event_adjust_volume_positive(self, event):
+        self.adjust_volume(accelerate=event == Input.Dial.Events.TURN_CW)
+
+    def event_adjust_volume_negative(self, event):
+        self.adjust_volume(-1, accelerate=event == Input.Dial.Events.TURN_CCW)
+
+    def adjust_volume(self, modifier: int = 1, accelerate: bool = False):
+        adjustment = self.get_adjustment(self.adjust * modifier, accelerate)
+
+        # Steps waiting for their write build on the prediction of the ones before
+        current = self.predicted_volume
+        if current is None:
+            current, _ = self.get_indicator_state()
+
+        if current is None:
+            self.show_error(1)
+            return
+
+        self.predict(volume=round(bounded_volume_values([current * 0.01], adjustment, self.bounds)[0] * 100))
+        self.write_adjustment(adjustment)
+
+    def get_adjustment(self, adjustment: int, accelerate: bool) -> int:
+        # accelerate is set for dial turns
+        return adjustment
+
+    def write_adjustment(self, adjustment: int):
+        # Writes the step and settles the prediction, without a target the step is dropped
+        log.error(f"{type(self).__name__} has no volume target to adjust")
+        self.settle_prediction(False)
+        self.show_error(1)
+
+    def on_volume_adjust_change(self, widget, value, old):
+        self.adjust = value
+        self.display_device_info()
+        self.set_current_icon()
+
+    def on_volume_bound_change(self, widget, value, old):
+        self.bounds = value
+
+    ########### UI STUFF ###########
+
+    def set_current_icon(self):
+        if self.adjust >= 0:
+            self._current_icon = self.get_icon(Icons.VOLUME_UP)
+            self._icon_name = Icons.VOLUME_UP
+        else:
+            self._current_icon = self.get_icon(Icons.VOLUME_DOWN)
+            self._icon_name = Icons.VOLUME_DOWN
+
+        self.display_icon()
+
+    def display_adjustment(self):
+        sign = "+" if self.adjust > 0 else ""
+        return f"{sign}{self.adjust}"
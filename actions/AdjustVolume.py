@@ -1,129 +1,117 @@
-from loguru import logger as log
+from enum import Enum
 
-from GtkHelper.GenerativeUI.ExpanderRow import ExpanderRow
+from GtkHelper.ComboRow import SimpleComboRowItem
+from GtkHelper.GenerativeUI.ComboRow import ComboRow
 from GtkHelper.GenerativeUI.ScaleRow import ScaleRow
-from src.backend.DeckManagement.InputIdentifier import Input
-from src.backend.PluginManager.EventAssigner import EventAssigner
+from .AdjustCore import AdjustCore
 from .AudioCore import AudioCore
 from ..globals import Icons
-from ..internal.PulseHelpers import get_device, change_volume, get_volumes_from_device, set_volume
+from ..internal.DeviceStore import facility_name
+from ..internal.DialAcceleration import AccelerationCurve, DialAcceleration
+from ..internal.FadeEngine import fade_engine
+from ..internal.PulseHelpers import adjust_volume_bounded
+from ..internal.VolumeAccumulator import volume_accumulator
 
 
-class AdjustVolume(AudioCore):
+class AdjustMode(Enum):
+    IMMEDIATE = SimpleComboRowItem("immediate", "Immediate")
+    COALESCED = SimpleComboRowItem("coalesced", "Coalesced")
+
+
+class AdjustVolume(AdjustCore, AudioCore):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.icon_keys = [Icons.VOLUME_UP, Icons.VOLUME_DOWN]
 
-        self.adjust: int = 1
-        self.bounds = 100
+        self.adjust_mode = AdjustMode.COALESCED.value
+
+        self.acceleration = DialAcceleration()
+        self.acceleration_curve = AccelerationCurve.OFF.value
+        self.max_acceleration: int = 5
 
         self.create_generative_ui()
 
     def create_generative_ui(self):
         super().create_generative_ui()
+        self.create_adjust_ui()
 
-        self.volume_adjust_row = ExpanderRow(
+        self.adjust_mode_combo_row = ComboRow(
             action_core=self,
-            var_name="adjust-expander",
-            default_value=False,
-            title="Volume Adjust Row",
+            var_name="adjust-mode",
+            default_value=AdjustMode.COALESCED.value,
+            items=[adjust_mode.value for adjust_mode in AdjustMode],
+            title="Adjust Mode",
+            on_change=self.on_adjust_mode_change
         )
 
-        self.volume_adjust_scale = ScaleRow(
+        self.acceleration_combo_row = ComboRow(
             action_core=self,
-            var_name="volume-adjust",
-            default_value=1,
-            min=-100,
-            max=100,
-            step=1,
-            digits=0,
-            title="Adjustment",
-            draw_value=True,
-            on_change=self.on_volume_adjust_change
+            var_name="dial-acceleration",
+            default_value=AccelerationCurve.OFF.value,
+            items=[acceleration_curve.value for acceleration_curve in AccelerationCurve],
+            title="Dial Acceleration",
+            on_change=self.on_acceleration_change
         )
 
-        self.volume_bound_scale = ScaleRow(
+        self.max_acceleration_scale = ScaleRow(
             action_core=self,
-            var_name="volume-bounds",
-            default_value=100,
-            min=0,
-            max=150,
+            var_name="dial-acceleration-max",
+            default_value=5,
+            min=1,
+            max=20,
             step=1,
             digits=0,
-            title="Maximum Audio Bounds",
+            title="Largest Step Multiplier",
             draw_value=True,
-            on_change=self.on_volume_bound_change
+            on_change=self.on_max_acceleration_change
         )
 
-        self.volume_adjust_row.add_row(self.volume_adjust_scale.widget)
-        self.volume_adjust_row.add_row(self.volume_bound_scale.widget)
-
-    def create_event_assigners(self):
-        self.add_event_assigner(EventAssigner(
-            id="adjust-volume-positive",
-            ui_label="Adjust Volume Positive",
-            default_events=[Input.Key.Events.DOWN, Input.Dial.Events.TURN_CW],
-            callback=self.event_adjust_volume_positive
-        ))
+        self.volume_adjust_row.add_row(self.adjust_mode_combo_row.widget)
+        self.volume_adjust_row.add_row(self.acceleration_combo_row.widget)
+        self.volume_adjust_row.add_row(self.max_acceleration_scale.widget)
 
-        self.add_event_assigner(EventAssigner(
-            id="adjust-volume-negative",
-            ui_label="Adjust Volume Negative",
-            default_event=Input.Dial.Events.TURN_CCW,
-            callback=self.event_adjust_volume_negative
-        ))
+    def get_adjustment(self, adjustment: int, accelerate: bool) -> int:
+        # Fast turns take bigger steps, bounds still cap the result
+        if accelerate:
+            return self.acceleration.step(adjustment, self.acceleration_curve.get_value(), self.max_acceleration)
+        return adjustment
 
-    def event_adjust_volume_positive(self, event):
-        self.adjust_volume()
-
-    def event_adjust_volume_negative(self, event):
-        self.adjust_volume(-1)
-
-    def adjust_volume(self, modifier: int = 1):
-        adjustment = self.adjust * modifier
+    def write_adjustment(self, adjustment: int):
+        if self.adjust_mode == AdjustMode.COALESCED.value:
+            volume_accumulator.add(self.get_accumulator_key(), adjustment, self.apply_adjustment)
+        else:
+            self.apply_adjustment(adjustment)
 
+    def apply_adjustment(self, adjustment: int):
         if self.selected_device is None:
-            self.show_error(1)
             return
 
-        try:
-            device = get_device(self.device_filter, self.selected_device.pulse_name)
-
-            if adjustment < 0:
-                change_volume(device, adjustment)
-                return
+        # Adjusting takes over from a running fade
+        fade_engine.cancel(self.device_filter, self.selected_device.pulse_name)
+        volumes = adjust_volume_bounded(self.device_filter, self.selected_device.pulse_name, adjustment, self.bounds)
 
-            volumes = get_volumes_from_device(self.device_filter, device.name)
-
-            if len(volumes) > 0 and volumes[0] < self.bounds:
-                if volumes[0] + adjustment > self.bounds:
-                    set_volume(device, self.bounds)
-                else:
-                    change_volume(device, adjustment)
-        except Exception as e:
-            log.error(e)
-            self.show_error(1)
+        if volumes is None:
+            self.settle_prediction(False)
+            return
 
-    def on_volume_adjust_change(self, widget, value, old):
-        self.adjust = value
-        self.display_device_info()
-        self.set_current_icon()
+        # Detents that came in meanwhile keep the key on their prediction until their own write
+        if not self.has_waiting_write():
+            self.settle_prediction()
 
-    def on_volume_bound_change(self, widget, value, old):
-        self.bounds = value
+    def has_waiting_write(self) -> bool:
+        return self.selected_device is not None and volume_accumulator.has_waiting(self.get_accumulator_key())
 
-    ########### UI STUFF ###########
+    def get_accumulator_key(self) -> tuple:
+        # Per action, so every key clamps its own steps to its own bounds even when several control one device
+        return (id(self), facility_name(self.device_filter), self.selected_device.pulse_name)
 
-    def set_current_icon(self):
-        if self.adjust >= 0:
-            self._current_icon = self.get_icon(Icons.VOLUME_UP)
-            self._icon_name = Icons.VOLUME_UP
-        else:
-            self._current_icon = self.get_icon(Icons.VOLUME_DOWN)
-            self._icon_name = Icons.VOLUME_DOWN
+    def on_adjust_mode_change(self, widget, value, old):
+        self.adjust_mode = value
 
-        self.display_icon()
+    def on_acceleration_change(self, widget, value, old):
+        self.acceleration_curve = value
+        self.acceleration.reset()
 
-    def display_adjustment(self):
-        return f"{"+" if self.adjust > 0 else ""}{self.adjust}"
+    def on_max_acceleration_change(self, widget, value, old):
+        self.max_acceleration = int(value)
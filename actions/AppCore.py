@@ -0,0 +1,86 @@
+import enum
+
+from gi.repository import GLib
+from loguru import logger as log
+
+from GtkHelper.ComboRow import SimpleComboRowItem
+from .AudioCore import AudioCore
+from ..internal.DeviceStore import facility_name
+from ..internal.StreamIndex import stream_index
+
+
+class StreamFilter(enum.Enum):
+    SINK_INPUT = SimpleComboRowItem("sink_input", "Playback")
+    SOURCE_OUTPUT = SimpleComboRowItem("source_output", "Recording")
+
+    def get_value(self):
+        return self.value.get_value()
+
+
+class AppCore(AudioCore):
+    supports_standard_device = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        stream_index.add_listener(self.on_stream_index_change)
+
+    def get_filter_items(self) -> list:
+        return [stream_filter.value for stream_filter in StreamFilter]
+
+    def get_streams(self) -> list:
+        if self.device_filter is None or self.selected_device is None:
+            return []
+
+        return stream_index.get_streams(self.device_filter, self.selected_device.pulse_name)
+
+    def update_event_routes(self):
+        event_holder = self.plugin_base.pulse_sink_event_holder
+
+        if self.selected_device is None or self.device_filter is None:
+            event_holder.remove_routes(self.on_pulse_device_change)
+            return
+
+        indices = stream_index.get_indices(self.device_filter, self.selected_device.pulse_name)
+        event_holder.set_routes(self.on_pulse_device_change, *[(self.device_filter, index) for index in indices])
+
+    def on_removed_from_cache(self):
+        super().on_removed_from_cache()
+        stream_index.remove_listener(self.on_stream_index_change)
+
+    def load_devices(self):
+        try:
+            app = self.device_combo_row.get_value()
+            if app:
+                stream_index.add_app(self.device_filter, app)
+
+            # Shared with every other app action using the same filter
+            self.loaded_devices = stream_index.get_apps(self.device_filter)
+        except Exception as e:
+            log.error(f"Error while populating app list: {e}")
+            return
+
+        self.device_combo_row.populate(self.loaded_devices, self.device_combo_row.get_value())
+        self.display_device_info()
+
+    def on_stream_index_change(self, facility: str):
+        if self.device_filter is None or facility_name(self.device_filter) != facility:
+            return
+
+        # Streams of the app came or went
+        self.update_event_routes()
+        GLib.idle_add(self.load_devices)
+
+    def get_indicator_state(self) -> tuple[int | None, bool]:
+        streams = self.get_streams()
+
+        if len(streams) == 0:
+            return None, False
+        return round(streams[0].volume.values[0] * 100), all(stream.mute for stream in streams)
+
+    def display_volume(self):
+        streams = self.get_streams()
+
+        if len(streams) > 0:
+            return str(round(streams[0].volume.values[0] * 100))
+        return "N/A"
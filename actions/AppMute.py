@@ -0,0 +1,29 @@
+from .AppCore import AppCore
+from .MuteCore import MuteCore
+from ..globals import Icons
+from ..internal.PulseHelpers import mute_streams
+
+
+class AppMute(MuteCore, AppCore):
+    mute_event_id = "mute-app"
+    mute_event_label = "Mute App"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.icon_keys = [Icons.MUTED, Icons.UNMUTED]
+
+        self.is_muted = False
+
+        self.create_generative_ui()
+
+    def get_target_muted(self) -> bool | None:
+        streams = self.get_streams()
+
+        # The app counts as muted only if every stream is
+        if len(streams) == 0:
+            return None
+        return all(stream.mute for stream in streams)
+
+    def write_mute(self, state: bool) -> bool:
+        return mute_streams(self.get_streams(), state)
@@ -0,0 +1,24 @@
+from .AdjustCore import AdjustCore
+from .AppCore import AppCore
+from ..globals import Icons
+from ..internal.PulseHelpers import adjust_streams_bounded
+
+
+class AppVolume(AdjustCore, AppCore):
+    adjust_event_name = "app-volume"
+    adjust_event_label = "App Volume"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.icon_keys = [Icons.VOLUME_UP, Icons.VOLUME_DOWN]
+
+        self.create_generative_ui()
+
+    def create_generative_ui(self):
+        super().create_generative_ui()
+        self.create_adjust_ui()
+
+    def write_adjustment(self, adjustment: int):
+        volumes = adjust_streams_bounded(self.get_streams(), adjustment, self.bounds)
+        self.settle_prediction(volumes is not None)
@@ -1,15 +1,23 @@
 import enum
 
+from gi.repository import GLib
 from loguru import logger as log
 
-from GtkHelper.ComboRow import SimpleComboRowItem, BaseComboRowItem
+from GtkHelper.ComboRow import SimpleComboRowItem
 from GtkHelper.GenerativeUI.ComboRow import ComboRow
 from GtkHelper.GenerativeUI.EntryRow import EntryRow
 from GtkHelper.GenerativeUI.ExpanderRow import ExpanderRow
+from GtkHelper.GenerativeUI.ScaleRow import ScaleRow
 from GtkHelper.GenerativeUI.SwitchRow import SwitchRow
 from src.backend.PluginManager.ActionCore import ActionCore
-from ..internal.PulseHelpers import DeviceFilter, get_device_list, filter_proplist, get_volumes_from_device, \
-    get_standard_device
+from ..internal.DeviceCatalog import Device, device_catalog
+from ..internal.DeviceStore import facility_name
+from ..internal.FadeEngine import FadeCurve
+from ..internal.IconLoader import LazyIcons
+from ..internal.Instrumentation import InstrumentedAction
+from ..internal.OutputCache import OutputCache
+from ..internal.PulseHelpers import DeviceFilter, get_device, get_volumes_from_device, get_standard_device
+from ..internal.VolumeRenderer import DEFAULT_COLORS, volume_renderer
 
 
 class InfoContent(enum.Enum):
@@ -17,46 +25,45 @@ class InfoContent(enum.Enum):
     ADJUSTMENT = SimpleComboRowItem("adjustment", "Adjustment")
 
 
-class Device(BaseComboRowItem):
-    def __init__(self, pulse_name, pulse_index, device_name):
-        super().__init__()
-        self.pulse_name: str = pulse_name
-        self.pulse_index: int = pulse_index
-        self.device_name: str = device_name
+class VolumeIndicator(enum.Enum):
+    NONE = SimpleComboRowItem("none", "None")
+    BAR = SimpleComboRowItem("bar", "Bar")
+    ARC = SimpleComboRowItem("arc", "Arc")
 
-    def __str__(self):
-        return self.device_name
 
-    def get_value(self):
-        return self.pulse_name
+class AudioCore(InstrumentedAction, OutputCache, LazyIcons, ActionCore):
+    # Actions without a default device to follow keep the standard device row hidden and ignore its setting
+    supports_standard_device: bool = True
 
-
-class AudioCore(ActionCore):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.has_configuration = True
 
         self.plugin_base.asset_manager.icons.add_listener(self.icon_changed)
-
-        self.plugin_base.connect_to_event(event_id="com_gapls_AudioControl::PulseEvent",
-                                          callback=self.on_pulse_device_change)
+        self.plugin_base.pulse_sink_event_holder.add_default_listener(self.on_default_device_change)
+        device_catalog.add_listener(self.on_device_catalog_change)
 
         # Settings
 
-        self.selected_device: Device = None
-
         self.device_filter: DeviceFilter = None
+        self._selected_device: Device = None
         self.info_content = InfoContent.VOLUME.value
 
         self.show_device_name = True
         self.device_nick = ""
 
         self.show_info_content = True
+        self.volume_indicator = VolumeIndicator.NONE.value
 
         self.use_standard_device = False
 
         self.loaded_devices: list[Device] = []
 
+        # State a write is expected to produce, shown until the write finished. The store then carries the written
+        # state, and the event that follows reconciles it with the server's
+        self.predicted_volume: int | None = None
+        self.predicted_mute: bool | None = None
+
         # Icon
 
         self.icon_keys = []
@@ -87,8 +94,8 @@ class AudioCore(ActionCore):
         self.device_filter_combo_row = ComboRow(
             action_core=self,
             var_name="device-filter",
-            default_value=DeviceFilter.SINK.value,
-            items=[device_filter.value for device_filter in DeviceFilter],
+            default_value=self.get_filter_items()[0],
+            items=self.get_filter_items(),
             title="base-filter-dropdown",
             complex_var_name=False,
             on_change=self.device_filter_changed
@@ -104,6 +111,8 @@ class AudioCore(ActionCore):
             on_change=self.device_changed
         )
 
+        self.standard_device_switch.widget.set_visible(self.supports_standard_device)
+
         self.device_expander.add_row(self.standard_device_switch.widget)
         self.device_expander.add_row(self.device_filter_combo_row.widget)
         self.device_expander.add_row(self.device_combo_row.widget)
@@ -137,8 +146,19 @@ class AudioCore(ActionCore):
             on_change=self.info_content_changed
         )
 
+        self.volume_indicator_combo_row = ComboRow(
+            action_core=self,
+            var_name="volume-indicator",
+            default_value=VolumeIndicator.NONE.value,
+            items=[volume_indicator.value for volume_indicator in VolumeIndicator],
+            title="Volume Indicator",
+            complex_var_name=False,
+            on_change=self.volume_indicator_changed
+        )
+
         self.info_expander.add_row(self.info_content_switch.widget)
         self.info_expander.add_row(self.info_content_combo_row.widget)
+        self.info_expander.add_row(self.volume_indicator_combo_row.widget)
 
         self.device_name_expander = ExpanderRow(
             action_core=self,
@@ -170,38 +190,87 @@ class AudioCore(ActionCore):
 
         self.device_filter = self.device_filter_combo_row.get_selected_item()
 
+    def create_fade_ui(self):
+        # For actions that can fade to their target instead of jumping. A duration of 0 keeps the jump
+        self.fade_duration: int = 0
+        self.fade_curve = FadeCurve.LINEAR.value
+
+        self.fade_expander = ExpanderRow(
+            action_core=self,
+            var_name="fade-expander",
+            default_value=False,
+            title="Fade Row",
+        )
+
+        self.fade_duration_scale = ScaleRow(
+            action_core=self,
+            var_name="fade-duration",
+            default_value=0,
+            min=0,
+            max=5000,
+            step=50,
+            digits=0,
+            title="Fade Duration (ms)",
+            draw_value=True,
+            on_change=self.fade_duration_changed
+        )
+
+        self.fade_curve_combo_row = ComboRow(
+            action_core=self,
+            var_name="fade-curve",
+            default_value=FadeCurve.LINEAR.value,
+            items=[fade_curve.value for fade_curve in FadeCurve],
+            title="Fade Curve",
+            on_change=self.fade_curve_changed
+        )
+
+        self.fade_expander.add_row(self.fade_duration_scale.widget)
+        self.fade_expander.add_row(self.fade_curve_combo_row.widget)
+
     def create_event_assigners(self):
         pass
 
+    def get_filter_items(self) -> list:
+        return [device_filter.value for device_filter in DeviceFilter]
+
+    @property
+    def selected_device(self) -> Device:
+        return self._selected_device
+
+    @selected_device.setter
+    def selected_device(self, device: Device):
+        self._selected_device = device
+        self.update_event_routes()
+
+    def update_event_routes(self):
+        event_holder = self.plugin_base.pulse_sink_event_holder
+
+        if self.selected_device is None or self.device_filter is None:
+            event_holder.remove_routes(self.on_pulse_device_change)
+            return
+
+        event_holder.set_routes(self.on_pulse_device_change, (self.device_filter, self.selected_device.pulse_index))
+
+    def on_removed_from_cache(self):
+        self.plugin_base.pulse_sink_event_holder.remove_routes(self.on_pulse_device_change)
+        self.plugin_base.pulse_sink_event_holder.remove_default_listener(self.on_default_device_change)
+        device_catalog.remove_listener(self.on_device_catalog_change)
+
+    def on_ready(self):
+        # The key is drawn from scratch, nothing sent before can be assumed to be on it
+        self.clear_output_cache()
+        super().on_ready()
+
     def on_update(self):
         self.display_device_name()
         self.display_device_info()
         self.display_icon()
         return
 
-    def on_tick(self):
-        self.check_standard_device()
-
     def load_devices(self):
         try:
-            device_list = get_device_list(self.device_filter)
-
-            self.loaded_devices = []
-
-            for device in device_list:
-                if device.description.__contains__("Monitor"):
-                    continue
-
-                device_name = filter_proplist(device.proplist)
-
-                if device_name is None:
-                    continue
-
-                self.loaded_devices.append(Device(
-                    pulse_name=device.name,
-                    pulse_index=device.index,
-                    device_name=device_name
-                ))
+            # Shared with every other action using the same filter
+            self.loaded_devices = device_catalog.get_devices(self.device_filter)
         except Exception as e:
             log.error(f"Error while populating device list: {e}")
             return
@@ -209,15 +278,24 @@ class AudioCore(ActionCore):
         self.device_combo_row.populate(self.loaded_devices, self.device_combo_row.get_value())
         self.display_device_info()
 
+    def on_device_catalog_change(self, facility: str):
+        if self.device_filter is None or facility_name(self.device_filter) != facility:
+            return
+
+        # A returning device can have a new index
+        self.update_event_routes()
+        GLib.idle_add(self.load_devices)
+
     # UI Events
 
     def show_standard_device_changed(self, widget, value, old):
-        self.use_standard_device = value
+        self.use_standard_device = value and self.supports_standard_device
         self.device_combo_row.widget.set_sensitive(not self.use_standard_device)
         self.check_standard_device()
 
     def device_filter_changed(self, widget, value, old):
         self.device_filter = value
+        self.update_event_routes()
         self.load_devices()
 
     def device_changed(self, widget, value, old):
@@ -234,6 +312,10 @@ class AudioCore(ActionCore):
         self.info_content = value
         self.display_device_info()
 
+    def volume_indicator_changed(self, widget, value, old):
+        self.volume_indicator = value
+        self.display_icon()
+
     def show_device_nick_changed(self, widget, value, old):
         self.show_device_name = value
         self.display_device_name()
@@ -242,6 +324,47 @@ class AudioCore(ActionCore):
         self.device_nick = value
         self.display_device_name()
 
+    def fade_duration_changed(self, widget, value, old):
+        self.fade_duration = int(value)
+
+    def fade_curve_changed(self, widget, value, old):
+        self.fade_curve = value
+
+    ########## PREDICTION ###########
+
+    def predict(self, volume: int = None, muted: bool = None):
+        # Renders at once, before anything was sent
+        if volume is not None:
+            self.predicted_volume = volume
+        if muted is not None:
+            self.predicted_mute = muted
+
+        self.display_device_info()
+        self.display_icon()
+
+    def settle_prediction(self, success: bool = True):
+        # A failed write rolls the key back to the state in the store
+        self.predicted_volume = None
+        self.predicted_mute = None
+
+        if not success:
+            self.show_error(1)
+
+        self.display_device_info()
+        self.display_icon()
+
+    def reconcile_prediction(self):
+        # A change event confirms the writes made before it, including merged ones another action sent
+        if self.has_waiting_write():
+            return
+
+        self.predicted_volume = None
+        self.predicted_mute = None
+
+    def has_waiting_write(self) -> bool:
+        # Writes not sent yet keep their prediction through events of earlier ones
+        return False
+
     ############ DISPLAY #############
 
     def display_device_name(self):
@@ -263,7 +386,7 @@ class AudioCore(ActionCore):
             return
 
         if self.info_content == InfoContent.VOLUME.value:
-            self.set_bottom_label(self.display_volume())
+            self.set_bottom_label(self.display_volume() if self.predicted_volume is None else str(self.predicted_volume))
         elif self.info_content == InfoContent.ADJUSTMENT.value:
             self.set_bottom_label(self.display_adjustment())
         else:
@@ -298,12 +421,15 @@ class AudioCore(ActionCore):
         if len(args) < 2 or self.selected_device is None:
             return
 
-        event = args[1]
-        index = self.selected_device.pulse_index
+        self.reconcile_prediction()
+        self.display_icon()
+        self.display_device_info()
+
+    async def on_default_device_change(self, event_id: str, facility: str, pulse_name: str):
+        if self.device_filter is None or facility_name(self.device_filter) != facility:
+            return
 
-        if event.index == index:
-            self.display_icon()
-            self.display_device_info()
+        self.check_standard_device()
 
     def display_icon(self):
         if not self._current_icon:
@@ -312,8 +438,40 @@ class AudioCore(ActionCore):
         _, rendered = self._current_icon.get_values()
 
         if rendered or None:
+            if self.volume_indicator != VolumeIndicator.NONE.value:
+                rendered = self.render_volume_indicator(rendered)
             self.set_media(image=rendered)
 
+    def render_volume_indicator(self, rendered):
+        volume, muted = self.get_indicator_state()
+
+        if self.predicted_volume is not None:
+            volume = self.predicted_volume
+        if self.predicted_mute is not None:
+            muted = self.predicted_mute
+
+        if volume is None:
+            return rendered
+
+        return volume_renderer.render(
+            style=self.volume_indicator.get_value(),
+            base=rendered,
+            base_key=self._icon_name,
+            value=volume,
+            colors=DEFAULT_COLORS,
+            muted=muted
+        )
+
+    def get_indicator_state(self) -> tuple[int | None, bool]:
+        if not self.device_filter or not self.selected_device:
+            return None, False
+
+        device = get_device(self.device_filter, self.selected_device.pulse_name)
+        if device is None or len(device.volume.values) == 0:
+            return None, False
+
+        return round(device.volume.values[0] * 100), bool(device.mute)
+
     def set_current_icon(self):
         pass
 
@@ -321,6 +479,10 @@ class AudioCore(ActionCore):
         if self.use_standard_device:
             standard_device = get_standard_device(self.device_filter)
 
+            # No default yet, e.g. while the server is starting or no device of this kind exists
+            if standard_device is None:
+                return
+
             if self.selected_device is None or self.selected_device.pulse_name == standard_device.name:
                 return
 
@@ -0,0 +1,270 @@
+from gi.repository import GLib
+from loguru import logger as log
+
+from GtkHelper.GenerativeUI.ComboRow import ComboRow
+from GtkHelper.GenerativeUI.ExpanderRow import ExpanderRow
+from GtkHelper.GenerativeUI.ScaleRow import ScaleRow
+from src.backend.DeckManagement.InputIdentifier import Input
+from src.backend.PluginManager.ActionCore import ActionCore
+from src.backend.PluginManager.EventAssigner import EventAssigner
+from ..globals import Icons
+from ..internal.DeviceCatalog import device_catalog
+from ..internal.DuckingEngine import DuckRule, DuckTrigger, ducking_engine
+from ..internal.IconLoader import LazyIcons
+from ..internal.Instrumentation import InstrumentedAction
+from ..internal.OutputCache import OutputCache
+from ..internal.PulseHelpers import DeviceFilter
+from ..internal.StreamIndex import stream_index
+
+
+class Ducking(InstrumentedAction, OutputCache, LazyIcons, ActionCore):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.has_configuration = True
+
+        self.plugin_base.asset_manager.icons.add_listener(self.icon_changed)
+        # The ducking engine follows the stream index, which only the event listener keeps current
+        self.plugin_base.pulse_sink_event_holder.start()
+        device_catalog.add_listener(self.on_device_catalog_change)
+        stream_index.add_listener(self.on_stream_index_change)
+
+        self.rule = DuckRule(on_change=self.on_ducking_change)
+        self.trigger = DuckTrigger.SOURCE.value
+        # Toggled from the key rather than a row, so it is kept in the settings by hand
+        self.enabled = self.get_settings().get("duck-enabled", True)
+
+        self.icon_keys = [Icons.VOLUME_DOWN, Icons.UNMUTED]
+        self.icon_name = Icons.VOLUME_DOWN
+        self.current_icon = self.get_icon(Icons.VOLUME_DOWN)
+
+        self.create_generative_ui()
+        self.create_event_assigners()
+
+    def create_generative_ui(self):
+        self.trigger_expander = ExpanderRow(
+            action_core=self,
+            var_name="trigger-expander",
+            default_value=False,
+            title="Trigger Row",
+            show_enable_switch=False
+        )
+
+        self.trigger_combo_row = ComboRow(
+            action_core=self,
+            var_name="duck-trigger",
+            default_value=DuckTrigger.SOURCE.value,
+            items=[duck_trigger.value for duck_trigger in DuckTrigger],
+            title="Duck When",
+            on_change=self.trigger_changed
+        )
+
+        self.target_combo_row = ComboRow(
+            action_core=self,
+            var_name="duck-target",
+            default_value="",
+            items=[],
+            title="Microphone or App",
+            on_change=self.target_changed
+        )
+
+        self.trigger_expander.add_row(self.trigger_combo_row.widget)
+        self.trigger_expander.add_row(self.target_combo_row.widget)
+
+        self.duck_expander = ExpanderRow(
+            action_core=self,
+            var_name="duck-expander",
+            default_value=False,
+            title="Ducking Row",
+            show_enable_switch=False
+        )
+
+        self.amount_scale = ScaleRow(
+            action_core=self,
+            var_name="duck-amount",
+            default_value=50,
+            min=0,
+            max=100,
+            step=1,
+            digits=0,
+            title="Lower Other Apps By (%)",
+            draw_value=True,
+            on_change=self.amount_changed
+        )
+
+        self.fade_scale = ScaleRow(
+            action_core=self,
+            var_name="duck-fade",
+            default_value=300,
+            min=0,
+            max=3000,
+            step=50,
+            digits=0,
+            title="Fade (ms)",
+            draw_value=True,
+            on_change=self.fade_changed
+        )
+
+        self.debounce_scale = ScaleRow(
+            action_core=self,
+            var_name="duck-debounce",
+            default_value=200,
+            min=0,
+            max=3000,
+            step=50,
+            digits=0,
+            title="Start After (ms)",
+            draw_value=True,
+            on_change=self.debounce_changed
+        )
+
+        self.hold_scale = ScaleRow(
+            action_core=self,
+            var_name="duck-hold",
+            default_value=1000,
+            min=0,
+            max=10000,
+            step=100,
+            digits=0,
+            title="Restore After (ms)",
+            draw_value=True,
+            on_change=self.hold_changed
+        )
+
+        self.duck_expander.add_row(self.amount_scale.widget)
+        self.duck_expander.add_row(self.fade_scale.widget)
+        self.duck_expander.add_row(self.debounce_scale.widget)
+        self.duck_expander.add_row(self.hold_scale.widget)
+
+        self.trigger = self.trigger_combo_row.get_selected_item()
+        self.rule.trigger = self.trigger.get_value()
+
+    def create_event_assigners(self):
+        self.add_event_assigner(EventAssigner(
+            id="toggle-ducking",
+            ui_label="Toggle Ducking",
+            default_events=[Input.Key.Events.DOWN, Input.Dial.Events.DOWN],
+            callback=self.on_toggle
+        ))
+
+    def on_ready(self):
+        # The key is drawn from scratch, nothing sent before can be assumed to be on it
+        self.clear_output_cache()
+        super().on_ready()
+
+        self.load_targets()
+        if self.enabled:
+            ducking_engine.add_rule(self.rule)
+
+    def on_update(self):
+        self.display_state()
+        self.display_icon()
+
+    def on_removed_from_cache(self):
+        ducking_engine.remove_rule(self.rule)
+        device_catalog.remove_listener(self.on_device_catalog_change)
+        stream_index.remove_listener(self.on_stream_index_change)
+
+    def on_toggle(self, event):
+        self.enabled = not self.enabled
+
+        settings = self.get_settings()
+        settings["duck-enabled"] = self.enabled
+        self.set_settings(settings)
+
+        if self.enabled:
+            ducking_engine.add_rule(self.rule)
+        else:
+            ducking_engine.remove_rule(self.rule)
+
+        self.display_state()
+        self.display_icon()
+
+    def on_ducking_change(self, rule: DuckRule):
+        self.display_state()
+
+    def load_targets(self):
+        try:
+            if self.trigger == DuckTrigger.APP.value:
+                # Apps that are not running stay selectable
+                target = self.target_combo_row.get_value()
+                if target:
+                    stream_index.add_app("sink_input", target)
+                targets = stream_index.get_apps("sink_input")
+            else:
+                targets = [device for device in device_catalog.get_devices(DeviceFilter.SOURCE) if not device.pulse_name.endswith(".monitor")]
+        except Exception as e:
+            log.error(f"Error while populating ducking targets: {e}")
+            return
+
+        self.target_combo_row.populate(targets, self.target_combo_row.get_value())
+        self.rule.target = self.target_combo_row.get_value() or None
+
+    def on_device_catalog_change(self, facility: str):
+        if facility == "source" and self.trigger == DuckTrigger.SOURCE.value:
+            GLib.idle_add(self.load_targets)
+
+    def on_stream_index_change(self, facility: str):
+        if facility == "sink_input" and self.trigger == DuckTrigger.APP.value:
+            GLib.idle_add(self.load_targets)
+
+    # UI Events
+
+    def trigger_changed(self, widget, value, old):
+        self.trigger = value
+        self.rule.trigger = value.get_value()
+        self.load_targets()
+        self.update_rule()
+
+    def target_changed(self, widget, value, old):
+        self.rule.target = value.get_value() if value is not None else None
+        self.update_rule()
+
+    def amount_changed(self, widget, value, old):
+        self.rule.amount = int(value)
+        self.update_rule()
+
+    def fade_changed(self, widget, value, old):
+        self.rule.fade = value / 1000
+
+    def debounce_changed(self, widget, value, old):
+        self.rule.debounce = value / 1000
+
+    def hold_changed(self, widget, value, old):
+        self.rule.hold = value / 1000
+
+    def update_rule(self):
+        # Restores whatever the old settings ducked and starts over with the new ones
+        if self.enabled and self.rule in ducking_engine.rules:
+            ducking_engine.remove_rule(self.rule)
+            ducking_engine.add_rule(self.rule)
+
+    ########### UI STUFF ###########
+
+    def display_state(self):
+        if not self.enabled:
+            self.set_bottom_label("Off")
+        elif self.rule.ducking:
+            self.set_bottom_label("Ducked")
+        else:
+            self.set_bottom_label("Armed")
+
+    def display_icon(self):
+        key = Icons.VOLUME_DOWN if self.enabled else Icons.UNMUTED
+        if key != self.icon_name:
+            self.icon_name = key
+            self.current_icon = self.get_icon(key)
+
+        if not self.current_icon:
+            return
+
+        _, rendered = self.current_icon.get_values()
+
+        if rendered:
+            self.set_media(image=rendered)
+
+    async def icon_changed(self, event: str, key: str, asset):
+        if key not in self.icon_keys or key != self.icon_name:
+            return
+
+        self.current_icon = asset
+        self.display_icon()
@@ -0,0 +1,22 @@
+from .AdjustCore import AdjustCore
+from .GroupCore import GroupCore
+from ..globals import Icons
+
+
+class GroupAdjustVolume(AdjustCore, GroupCore):
+    adjust_event_name = "group-volume"
+    adjust_event_label = "Group Volume"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.icon_keys = [Icons.VOLUME_UP, Icons.VOLUME_DOWN]
+
+        self.create_generative_ui()
+
+    def create_generative_ui(self):
+        super().create_generative_ui()
+        self.create_adjust_ui()
+
+    def write_adjustment(self, adjustment: int):
+        self.settle_prediction(self.group.adjust_volume(adjustment, self.bounds) is not None)
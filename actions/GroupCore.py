@@ -0,0 +1,112 @@
+from gi.repository import Adw, GLib
+from loguru import logger as log
+
+from .AudioCore import AudioCore
+from ..internal.DeviceCatalog import device_catalog
+from ..internal.DeviceGroup import DeviceGroup
+from ..internal.PulseHelpers import DeviceFilter
+
+
+class GroupCore(AudioCore):
+    supports_standard_device = False
+
+    def __init__(self, *args, **kwargs):
+        self.group = DeviceGroup()
+        self.member_rows: list[Adw.SwitchRow] = []
+
+        super().__init__(*args, **kwargs)
+
+    def create_generative_ui(self):
+        super().create_generative_ui()
+
+        # Members are picked from every sink and source instead of one device of one filter
+        self.device_filter_combo_row.widget.hide()
+        self.device_combo_row.widget.hide()
+
+        self.group = DeviceGroup.from_settings(self.get_settings().get("group-members", []))
+        self.update_event_routes()
+
+    def update_event_routes(self):
+        event_holder = self.plugin_base.pulse_sink_event_holder
+
+        indices = self.group.get_indices()
+        if not indices:
+            event_holder.remove_routes(self.on_pulse_device_change)
+            return
+
+        event_holder.set_routes(self.on_pulse_device_change, *indices)
+
+    def load_devices(self):
+        try:
+            devices = [(device_filter, device) for device_filter in DeviceFilter for device in device_catalog.get_devices(device_filter)]
+        except Exception as e:
+            log.error(f"Error while populating group member list: {e}")
+            return
+
+        for row in self.member_rows:
+            self.device_expander.widget.remove(row)
+        self.member_rows = []
+
+        for device_filter, device in devices:
+            row = Adw.SwitchRow(title=device.device_name, subtitle=device_filter.value.label)
+            row.set_active(self.group.contains(device_filter, device.pulse_name))
+            row.connect("notify::active", self.on_member_toggled, device_filter, device.pulse_name)
+
+            self.device_expander.add_row(row)
+            self.member_rows.append(row)
+
+        self.display_device_name()
+        self.display_device_info()
+
+    def on_device_catalog_change(self, facility: str):
+        if facility not in ("sink", "source"):
+            return
+
+        # A returning member can have a new index
+        self.update_event_routes()
+        GLib.idle_add(self.load_devices)
+
+    def on_member_toggled(self, row, _, device_filter: DeviceFilter, pulse_name: str):
+        if row.get_active():
+            self.group.add(device_filter, pulse_name)
+        else:
+            self.group.remove(device_filter, pulse_name)
+
+        settings = self.get_settings()
+        settings["group-members"] = self.group.to_settings()
+        self.set_settings(settings)
+
+        self.update_event_routes()
+        self.display_device_name()
+        self.display_device_info()
+        self.display_icon()
+
+    async def on_pulse_device_change(self, *args, **kwargs):
+        if len(args) < 2:
+            return
+
+        self.reconcile_prediction()
+        self.display_icon()
+        self.display_device_info()
+
+    ########### UI STUFF ###########
+
+    def display_device_name(self):
+        if not self.show_device_name:
+            self.set_top_label("")
+            return
+
+        if self.device_nick:
+            self.set_top_label(self.device_nick)
+        else:
+            self.set_top_label(f"{len(self.group.members)} Devices")
+
+    def display_volume(self):
+        volume = self.group.get_volume()
+
+        if volume is None:
+            return "N/A"
+        return str(volume)
+
+    def get_indicator_state(self) -> tuple[int | None, bool]:
+        return self.group.get_volume(), self.group.is_muted()
@@ -0,0 +1,45 @@
+from GtkHelper.GenerativeUI.ComboRow import ComboRow
+from .GroupCore import GroupCore
+from .MuteCore import MuteCore
+from ..globals import Icons
+from ..internal.DeviceGroup import GroupMuteMode
+
+
+class GroupMute(MuteCore, GroupCore):
+    mute_event_id = "mute-group"
+    mute_event_label = "Mute Group"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.icon_keys = [Icons.MUTED, Icons.UNMUTED]
+
+        self.is_muted = False
+        self.mute_mode = GroupMuteMode.MAJORITY.value
+
+        self.create_generative_ui()
+
+    def create_generative_ui(self):
+        super().create_generative_ui()
+
+        self.mute_mode_combo_row = ComboRow(
+            action_core=self,
+            var_name="mute-mode",
+            default_value=GroupMuteMode.MAJORITY.value,
+            items=[mute_mode.value for mute_mode in GroupMuteMode],
+            title="Group Counts As Muted When",
+            on_change=self.on_mute_mode_change
+        )
+
+    def get_target_muted(self) -> bool | None:
+        return self.group.is_muted(self.mute_mode.get_value())
+
+    def write_mute(self, state: bool) -> bool:
+        return self.group.mute(state)
+
+    def on_mute_mode_change(self, widget, value, old):
+        self.mute_mode = value
+        self.update_mute_image()
+
+    def get_indicator_state(self) -> tuple[int | None, bool]:
+        return self.group.get_volume(), self.group.is_muted(self.mute_mode.get_value())
@@ -0,0 +1,64 @@
+from GtkHelper.GenerativeUI.ExpanderRow import ExpanderRow
+from GtkHelper.GenerativeUI.ScaleRow import ScaleRow
+from src.backend.DeckManagement.InputIdentifier import Input
+from src.backend.PluginManager.EventAssigner import EventAssigner
+from .GroupCore import GroupCore
+from ..globals import Icons
+
+
+class GroupSetVolume(GroupCore):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.icon_keys = [Icons.UNMUTED]
+        self._icon_name = Icons.UNMUTED
+        self._current_icon = self.get_icon(Icons.UNMUTED)
+
+        self.volume: int = 50
+
+        self.create_generative_ui()
+
+    def create_generative_ui(self):
+        super().create_generative_ui()
+
+        self.volume_expander = ExpanderRow(
+            action_core=self,
+            var_name="volume-expander",
+            default_value=False,
+            title="Volume Row",
+        )
+
+        self.volume_slider = ScaleRow(
+            action_core=self,
+            var_name="volume",
+            default_value=50,
+            min=0,
+            max=150,
+            title="Volume",
+            step=1,
+            digits=0,
+            on_change=self.volume_changed
+        )
+
+        self.volume_expander.add_row(self.volume_slider.widget)
+
+    def create_event_assigners(self):
+        self.add_event_assigner(EventAssigner(
+            id="set-group-volume",
+            ui_label="Set Group Volume",
+            default_events=[Input.Key.Events.DOWN, Input.Dial.Events.DOWN],
+            callback=self.on_set_volume
+        ))
+
+    def on_set_volume(self, event):
+        self.predict(volume=self.volume)
+        self.settle_prediction(self.group.set_volume(self.volume))
+
+    def volume_changed(self, widget, value, old):
+        self.volume = value
+        self.display_device_info()
+
+    ########### UI STUFF ###########
+
+    def display_adjustment(self):
+        return str(self.volume)
@@ -1,87 +1,52 @@
-import pulsectl
-from loguru import logger as log
-
-from src.backend.DeckManagement.InputIdentifier import Input
-from src.backend.PluginManager.EventAssigner import EventAssigner
 from .AudioCore import AudioCore
+from .MuteCore import MuteCore
 from ..globals import Icons
+from ..internal.FadeEngine import fade_engine
 from ..internal.PulseHelpers import get_device, mute
 
 
-class Mute(AudioCore):
+class Mute(MuteCore, AudioCore):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.icon_keys = [Icons.MUTED, Icons.UNMUTED]
 
-        self.plugin_base.connect_to_event(event_id="com_gapls_AudioControl::PulseEvent",
-                                          callback=self.on_pulse_device_change)
-
         self.is_muted = False
 
         self.create_generative_ui()
 
-    def create_event_assigners(self):
-        self.add_event_assigner(EventAssigner(
-            id="mute",
-            ui_label="Mute",
-            default_events=[Input.Key.Events.DOWN, Input.Dial.Events.DOWN],
-            callback=self.on_mute
-        ))
+    def create_generative_ui(self):
+        super().create_generative_ui()
+        self.create_fade_ui()
 
-    def on_update(self):
-        self.update_mute_image()
-        super().on_update()
-        return
-
-    def on_mute(self, event):
+    def get_target_muted(self) -> bool | None:
         if self.selected_device is None:
-            self.show_error(1)
-            return
-
-        try:
-            device = get_device(self.device_filter, self.selected_device.pulse_name)
-            self.mute(device)
-        except Exception as e:
-            log.error(f"Error while muting: {e}")
-            self.show_error(1)
-
-    ########### UI STUFF ###########
-
-    def update_mute_image(self):
-        with pulsectl.Pulse(f"mute-event") as pulse:
-            try:
-                device = get_device(self.device_filter, self.selected_device.pulse_name)
-                self.is_muted = bool(device.mute)
-
-                self.set_current_icon()
-                self.display_device_info()
-            except Exception as e:
-                log.error(f"Error while updating mute image: {e}")
-                self.show_error(1)
+            return None
 
-    def mute(self, device):
-        self.is_muted = not device.mute
+        # While a mute fade runs the device still shows its old state, toggle against where it is heading
+        target = fade_engine.get_mute_target(self.device_filter, self.selected_device.pulse_name)
+        if target is not None:
+            return target
 
-        self.set_current_icon()
+        device = get_device(self.device_filter, self.selected_device.pulse_name)
+        return None if device is None else bool(device.mute)
 
-        mute(device, self.is_muted)
+    def write_mute(self, state: bool) -> bool:
+        pulse_name = self.selected_device.pulse_name
 
-    def set_current_icon(self):
-        if self.is_muted:
-            self._current_icon = self.get_icon(Icons.MUTED)
-            self._icon_name = Icons.MUTED
-        else:
-            self._current_icon = self.get_icon(Icons.UNMUTED)
-            self._icon_name = Icons.UNMUTED
+        if self.fade_duration > 0:
+            return fade_engine.fade_mute(self.device_filter, pulse_name, state, self.fade_duration / 1000, self.fade_curve.get_value())
 
-        self.display_icon()
+        device = get_device(self.device_filter, pulse_name)
+        if device is None:
+            fade_engine.cancel(self.device_filter, pulse_name)
+            return False
 
-    async def on_pulse_device_change(self, *args, **kwargs):
-        await super().on_pulse_device_change(*args, **kwargs)
-        self.update_mute_image()
+        # A cancelled mute fade puts the saved level back, which should only be heard once unmuted
+        if state:
+            written = mute(device, True)
+            fade_engine.cancel(self.device_filter, pulse_name)
+            return written
 
-    def display_adjustment(self):
-        if self.is_muted:
-            return "Muted"
-        return "Unmuted"
+        fade_engine.cancel(self.device_filter, pulse_name)
+        return mute(device, False)
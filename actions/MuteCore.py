@@ -0,0 +1,93 @@
+from loguru import logger as log
+
+from src.backend.DeckManagement.InputIdentifier import Input
+from src.backend.PluginManager.EventAssigner import EventAssigner
+from ..globals import Icons
+from ..internal.Instrumentation import InstrumentedAction
+
+
+class MuteCore(InstrumentedAction):
+    # Mixin for AudioCore subclasses that toggle the mute of their target. Subclasses read it in get_target_muted and
+    # write it in write_mute, the defaults leave the key showing an error
+    mute_event_id: str = "mute"
+    mute_event_label: str = "Mute"
+
+    def create_event_assigners(self):
+        self.add_event_assigner(EventAssigner(
+            id=self.mute_event_id,
+            ui_label=self.mute_event_label,
+            default_events=[Input.Key.Events.DOWN, Input.Dial.Events.DOWN],
+            callback=self.on_mute
+        ))
+
+    def on_update(self):
+        self.update_mute_image()
+        super().on_update()
+
+    def on_mute(self, event):
+        try:
+            muted = self.get_target_muted()
+        except Exception as e:
+            log.error(f"Error while muting: {e}")
+            muted = None
+
+        if muted is None:
+            self.show_error(1)
+            return
+
+        state = not muted
+
+        self.is_muted = state
+        self.set_current_icon()
+        self.predict(muted=state)
+
+        if not self.write_mute(state):
+            self.is_muted = not state
+            self.set_current_icon()
+            self.settle_prediction(False)
+            return
+
+        self.settle_prediction()
+
+    def get_target_muted(self) -> bool | None:
+        # None while there is nothing to mute
+        return None
+
+    def write_mute(self, state: bool) -> bool:
+        # False when nothing was written
+        log.error(f"{type(self).__name__} has no mute target to write to")
+        return False
+
+    ########### UI STUFF ###########
+
+    def update_mute_image(self):
+        try:
+            if self.predicted_mute is not None:
+                self.is_muted = self.predicted_mute
+            else:
+                self.is_muted = bool(self.get_target_muted())
+
+            self.set_current_icon()
+            self.display_device_info()
+        except Exception as e:
+            log.error(f"Error while updating mute image: {e}")
+            self.show_error(1)
+
+    def set_current_icon(self):
+        if self.is_muted:
+            self._current_icon = self.get_icon(Icons.MUTED)
+            self._icon_name = Icons.MUTED
+        else:
+            self._current_icon = self.get_icon(Icons.UNMUTED)
+            self._icon_name = Icons.UNMUTED
+
+        self.display_icon()
+
+    async def on_pulse_device_change(self, *args, **kwargs):
+        await super().on_pulse_device_change(*args, **kwargs)
+        self.update_mute_image()
+
+    def display_adjustment(self):
+        if self.is_muted:
+            return "Muted"
+        return "Unmuted"
@@ -0,0 +1,131 @@
+import time
+
+from PIL import Image, ImageDraw
+
+from GtkHelper.GenerativeUI.ExpanderRow import ExpanderRow
+from GtkHelper.GenerativeUI.ScaleRow import ScaleRow
+from .AudioCore import AudioCore, InfoContent
+from ..internal.PeakMonitor import peak_monitor
+
+# Used where the deck does not report its key size
+DEFAULT_CANVAS_SIZE = 72
+
+
+class PeakMeter(AudioCore):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.frame_rate: int = 15
+        self.level: float = 0.0
+
+        # (device filter, pulse name, frame rate) of the current subscription
+        self._subscription: tuple = None
+        # (canvas size, bar height) of the last draw
+        self._drawn_bar: tuple = None
+        self._last_draw: float = 0.0
+
+        self.create_generative_ui()
+
+    def create_generative_ui(self):
+        super().create_generative_ui()
+
+        self.meter_expander = ExpanderRow(
+            action_core=self,
+            var_name="meter-expander",
+            default_value=False,
+            title="Meter Row",
+        )
+
+        self.frame_rate_scale = ScaleRow(
+            action_core=self,
+            var_name="frame-rate",
+            default_value=15,
+            min=1,
+            max=25,
+            step=1,
+            digits=0,
+            title="Frames per Second",
+            draw_value=True,
+            on_change=self.on_frame_rate_change
+        )
+
+        self.meter_expander.add_row(self.frame_rate_scale.widget)
+
+    def on_ready(self):
+        super().on_ready()
+        self.info_content_combo_row.populate([InfoContent.VOLUME.value])
+
+        # The key may have shown another page since the last draw
+        self._drawn_bar = None
+        self.update_peak_subscription()
+
+    def on_frame_rate_change(self, widget, value, old):
+        self.frame_rate = int(value)
+        self.update_peak_subscription()
+
+    def update_event_routes(self):
+        super().update_event_routes()
+        self.update_peak_subscription()
+
+    def update_peak_subscription(self):
+        subscription = None
+        if self.selected_device is not None and self.device_filter is not None:
+            subscription = (self.device_filter, self.selected_device.pulse_name, self.frame_rate)
+
+        if subscription == self._subscription:
+            return
+
+        peak_monitor.unsubscribe(self.on_peak_level)
+        self._subscription = subscription
+
+        if subscription is not None:
+            device_filter, pulse_name, frame_rate = subscription
+            peak_monitor.subscribe(device_filter, pulse_name, self.on_peak_level, frame_rate)
+
+    def on_removed_from_cache(self):
+        super().on_removed_from_cache()
+        peak_monitor.unsubscribe(self.on_peak_level)
+        self._subscription = None
+
+    def on_peak_level(self, level: float):
+        self.level = level
+
+        # The capture is shared, so each button keeps to its own frame rate
+        now = time.monotonic()
+        if now - self._last_draw < 1 / self.frame_rate:
+            return
+
+        self._last_draw = now
+        self.display_icon()
+
+    ########### UI STUFF ###########
+
+    def get_canvas_size(self) -> int:
+        size = self.deck_controller.get_key_image_size()
+        if not size:
+            return DEFAULT_CANVAS_SIZE
+        return max(size)
+
+    def display_icon(self):
+        size = self.get_canvas_size()
+        height = round(self.level * size)
+
+        # Nothing visible changed
+        if (size, height) == self._drawn_bar:
+            return
+        self._drawn_bar = (size, height)
+
+        image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+
+        if height > 0:
+            if self.level > 0.9:
+                color = (220, 50, 50, 255)
+            elif self.level > 0.7:
+                color = (230, 200, 40, 255)
+            else:
+                color = (60, 200, 90, 255)
+
+            draw.rectangle((size * 0.3, size - height, size * 0.7, size - 1), fill=color)
+
+        self.set_media(image=image)
@@ -0,0 +1,119 @@
+from loguru import logger as log
+
+from GtkHelper.GenerativeUI.ComboRow import ComboRow
+from GtkHelper.GenerativeUI.ExpanderRow import ExpanderRow
+from src.backend.DeckManagement.InputIdentifier import Input
+from src.backend.PluginManager.ActionCore import ActionCore
+from src.backend.PluginManager.EventAssigner import EventAssigner
+from ..globals import Icons
+from ..internal.IconLoader import LazyIcons
+from ..internal.Instrumentation import InstrumentedAction
+from ..internal.OutputCache import OutputCache
+from ..internal.SceneStore import ScenePreset, scene_store
+
+
+class Scene(InstrumentedAction, OutputCache, LazyIcons, ActionCore):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.has_configuration = True
+
+        self.plugin_base.asset_manager.icons.add_listener(self.icon_changed)
+        # Scenes are captured from the caches, which only the event listener keeps current
+        self.plugin_base.pulse_sink_event_holder.start()
+
+        self.scene = ScenePreset.GAMING.value
+
+        self.icon_keys = [Icons.MAIN]
+        self.icon_name = Icons.MAIN
+        self.current_icon = self.get_icon(Icons.MAIN)
+
+        self.create_generative_ui()
+        self.create_event_assigners()
+
+    def create_generative_ui(self):
+        self.scene_expander = ExpanderRow(
+            action_core=self,
+            var_name="scene-expander",
+            default_value=False,
+            title="Scene Row",
+            show_enable_switch=False
+        )
+
+        self.scene_combo_row = ComboRow(
+            action_core=self,
+            var_name="scene",
+            default_value=ScenePreset.GAMING.value,
+            items=[scene_preset.value for scene_preset in ScenePreset],
+            title="Scene",
+            on_change=self.scene_changed
+        )
+
+        self.scene_expander.add_row(self.scene_combo_row.widget)
+
+    def create_event_assigners(self):
+        # Restoring on release keeps a hold from restoring right before it captures
+        self.add_event_assigner(EventAssigner(
+            id="restore-scene",
+            ui_label="Restore Scene",
+            default_events=[Input.Key.Events.SHORT_UP, Input.Dial.Events.SHORT_UP],
+            callback=self.on_restore
+        ))
+
+        self.add_event_assigner(EventAssigner(
+            id="capture-scene",
+            ui_label="Capture Scene",
+            default_events=[Input.Key.Events.HOLD_START, Input.Dial.Events.HOLD_START],
+            callback=self.on_capture
+        ))
+
+    def on_ready(self):
+        # The key is drawn from scratch, nothing sent before can be assumed to be on it
+        self.clear_output_cache()
+        super().on_ready()
+
+    def on_update(self):
+        self.display_scene()
+        self.display_icon()
+
+    def on_restore(self, event):
+        if not scene_store.restore(self.scene.get_value()):
+            self.show_error(1)
+            return
+
+        self.display_scene()
+
+    def on_capture(self, event):
+        try:
+            scene_store.capture(self.scene.get_value())
+        except Exception as e:
+            log.error(f"Error while capturing scene {self.scene.get_value()}: {e}")
+            self.show_error(1)
+            return
+
+        self.set_top_label("Saved")
+
+    def scene_changed(self, widget, value, old):
+        self.scene = value
+        self.display_scene()
+
+    ########### UI STUFF ###########
+
+    def display_scene(self):
+        self.set_top_label("")
+        self.set_bottom_label(str(self.scene))
+
+    def display_icon(self):
+        if not self.current_icon:
+            return
+
+        _, rendered = self.current_icon.get_values()
+
+        if rendered:
+            self.set_media(image=rendered)
+
+    async def icon_changed(self, event: str, key: str, asset):
+        if key not in self.icon_keys or key != self.icon_name:
+            return
+
+        self.current_icon = asset
+        self.display_icon()
@@ -5,26 +5,20 @@ from src.backend.DeckManagement.InputIdentifier import Input
 from src.backend.PluginManager.EventAssigner import EventAssigner
 from .AudioCore import AudioCore
 from ..globals import Icons
+from ..internal.DeviceStore import facility_name
 from ..internal.PulseHelpers import get_device, mute, set_default_device, get_standard_device
 
 
 class SetDefaultDevice(AudioCore):
+    supports_standard_device = False
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.icon_keys = [Icons.HEADPHONE_DEFAULT, Icons.NONE_DEFAULT]
 
-        self.plugin_base.connect_to_event(event_id="com_gapls_AudioControl::PulseEvent",
-                                          callback=self.on_pulse_device_change)
-
         self.create_generative_ui()
 
-    def create_generative_ui(self):
-        super().create_generative_ui()
-
-        self.standard_device_switch.widget.hide()
-        self.standard_device_switch = None
-
     def create_event_assigners(self):
         self.add_event_assigner(EventAssigner(
             id="set-default-device",
@@ -36,7 +30,10 @@ class SetDefaultDevice(AudioCore):
     def on_update(self):
         super().on_update()
 
-    def on_tick(self):
+    async def on_default_device_change(self, event_id: str, facility: str, pulse_name: str):
+        if self.device_filter is None or facility_name(self.device_filter) != facility:
+            return
+
         self.set_current_icon()
         self.display_device_info()
 
@@ -46,7 +43,8 @@ class SetDefaultDevice(AudioCore):
             return
 
         try:
-            set_default_device(self.device_filter, self.selected_device.pulse_name)
+            if not set_default_device(self.device_filter, self.selected_device.pulse_name):
+                self.show_error(1)
             self.display_device_info()
             self.set_current_icon()
         except Exception as e:
@@ -58,7 +56,7 @@ class SetDefaultDevice(AudioCore):
     def set_current_icon(self):
         standard_device = get_standard_device(self.device_filter)
 
-        if standard_device.name == self.selected_device.pulse_name:
+        if standard_device is not None and standard_device.name == self.selected_device.pulse_name:
             self._current_icon = self.get_icon(Icons.HEADPHONE_DEFAULT)
             self._icon_name = Icons.HEADPHONE_DEFAULT
         else:
@@ -70,6 +68,6 @@ class SetDefaultDevice(AudioCore):
     def display_adjustment(self):
         standard_device = get_standard_device(self.device_filter)
 
-        if standard_device.name == self.selected_device.pulse_name:
+        if standard_device is not None and standard_device.name == self.selected_device.pulse_name:
             return "SELECTED"
         return ""
\ No newline at end of file
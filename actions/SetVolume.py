@@ -7,6 +7,7 @@ from src.backend.DeckManagement.InputIdentifier import Input
 from src.backend.PluginManager.EventAssigner import EventAssigner
 from .AudioCore import AudioCore
 from ..globals import Icons
+from ..internal.FadeEngine import fade_engine
 from ..internal.PulseHelpers import get_device, set_volume
 
 
@@ -56,6 +57,8 @@ class SetVolume(AudioCore):
         self.volume_expander.add_row(self.extend_volume_switch.widget)
         self.volume_expander.add_row(self.volume_slider.widget)
 
+        self.create_fade_ui()
+
     def create_event_assigners(self):
         self.add_event_assigner(EventAssigner(
             id="set-volume",
@@ -73,11 +76,22 @@ class SetVolume(AudioCore):
             return
 
         try:
-            device = get_device(self.device_filter, self.selected_device.pulse_name)
-            set_volume(device, self.volume)
+            pulse_name = self.selected_device.pulse_name
+
+            if self.fade_duration > 0:
+                if not fade_engine.fade_to(self.device_filter, pulse_name, self.volume * 0.01, self.fade_duration / 1000, self.fade_curve.get_value()):
+                    self.show_error(1)
+                return
+
+            # The level is written right away, a cancelled mute fade need not put its own back first
+            fade_engine.cancel(self.device_filter, pulse_name, restore=False)
+            self.predict(volume=self.volume)
+
+            device = get_device(self.device_filter, pulse_name)
+            self.settle_prediction(device is not None and set_volume(device, self.volume))
         except Exception as e:
             log.error(e)
-            self.show_error(1)
+            self.settle_prediction(False)
 
     def volume_changed(self, widget, value, old):
         self.volume = value
@@ -11,10 +11,16 @@ from src.backend.PluginManager.PluginSettings.Asset import Color, Icon
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
 
-from ..internal.PulseHelpers import DeviceFilter, get_device_list, filter_proplist, get_volumes_from_device, \
-    get_standard_device, set_default_device
+from gi.repository import GLib
+
+from ..internal.PulseHelpers import DeviceFilter, get_volumes_from_device, get_standard_device, set_default_device
 
 from .AudioCore import Device, InfoContent
+from ..internal.DeviceCatalog import device_catalog
+from ..internal.DeviceStore import facility_name
+from ..internal.IconLoader import LazyIcons
+from ..internal.Instrumentation import InstrumentedAction
+from ..internal.OutputCache import OutputCache
 
 from loguru import logger as log
 
@@ -29,15 +35,14 @@ class DeviceSelection(StrEnum):
     HEADPHONE = "headphone"
 
 
-class ToggleDefaultDevice(ActionCore):
+class ToggleDefaultDevice(InstrumentedAction, OutputCache, LazyIcons, ActionCore):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.has_configuration = True
 
         self.plugin_base.asset_manager.icons.add_listener(self.icon_changed)
-
-        self.plugin_base.connect_to_event(event_id="com_gapls_AudioControl::PulseEvent",
-                                          callback=self.on_pulse_device_change)
+        self.plugin_base.pulse_sink_event_holder.add_default_listener(self.on_default_device_change)
+        device_catalog.add_listener(self.on_device_catalog_change)
 
         # Action Variables
         self.speaker_device: Device = None
@@ -175,6 +180,11 @@ class ToggleDefaultDevice(ActionCore):
     # ----------# Action Events #----------#
     # Contains all methods that come from the ActionCore itself
 
+    def on_ready(self):
+        # The key is drawn from scratch, nothing sent before can be assumed to be on it
+        self.clear_output_cache()
+        super().on_ready()
+
     def on_update(self):
         self.change_icon()
 
@@ -182,7 +192,10 @@ class ToggleDefaultDevice(ActionCore):
         self.display_device_info()
         self.display_icon()
 
-    def on_tick(self):
+    async def on_default_device_change(self, event_id: str, facility: str, pulse_name: str):
+        if self.device_filter is None or facility_name(self.device_filter) != facility:
+            return
+
         self.change_icon()
 
         self.display_device_name()
@@ -211,10 +224,12 @@ class ToggleDefaultDevice(ActionCore):
 
     def device_filter_changed(self, widget, value, old):
         self.device_filter = value
+        self.update_event_routes()
         self.load_devices()
 
     def speaker_changed(self, widget, value, old):
         self.speaker_device = value
+        self.update_event_routes()
 
         self.change_icon()
         self.display_device_name()
@@ -223,6 +238,7 @@ class ToggleDefaultDevice(ActionCore):
 
     def headphone_changed(self, widget, value, old):
         self.headphone_device = value
+        self.update_event_routes()
 
         self.change_icon()
         self.display_device_name()
@@ -367,26 +383,27 @@ class ToggleDefaultDevice(ActionCore):
             self.display_icon()
             self.display_device_info()
 
-    def load_devices(self):
-        try:
-            device_list = get_device_list(self.device_filter)
-
-            self.loaded_devices = []
+    def update_event_routes(self):
+        if self.device_filter is None:
+            self.plugin_base.pulse_sink_event_holder.remove_routes(self.on_pulse_device_change)
+            return
 
-            for device in device_list:
-                if device.description.__contains__("Monitor"):
-                    continue
+        devices = [device for device in (self.speaker_device, self.headphone_device) if device is not None]
 
-                device_name = filter_proplist(device.proplist)
+        self.plugin_base.pulse_sink_event_holder.set_routes(
+            self.on_pulse_device_change,
+            *[(self.device_filter, device.pulse_index) for device in devices]
+        )
 
-                if device_name is None:
-                    continue
+    def on_removed_from_cache(self):
+        self.plugin_base.pulse_sink_event_holder.remove_routes(self.on_pulse_device_change)
+        self.plugin_base.pulse_sink_event_holder.remove_default_listener(self.on_default_device_change)
+        device_catalog.remove_listener(self.on_device_catalog_change)
 
-                self.loaded_devices.append(Device(
-                    pulse_name=device.name,
-                    pulse_index=device.index,
-                    device_name=device_name
-                ))
+    def load_devices(self):
+        try:
+            # Shared with every other action using the same filter
+            self.loaded_devices = device_catalog.get_devices(self.device_filter)
         except Exception as e:
             log.error(f"Error while populating device list: {e}")
             return
@@ -396,6 +413,14 @@ class ToggleDefaultDevice(ActionCore):
 
         self.display_device_info()
 
+    def on_device_catalog_change(self, facility: str):
+        if self.device_filter is None or facility_name(self.device_filter) != facility:
+            return
+
+        # A returning device can have a new index
+        self.update_event_routes()
+        GLib.idle_add(self.load_devices)
+
     def get_selected_device(self) -> tuple:
         try:
             device = get_standard_device(self.device_filter)
@@ -25,9 +25,6 @@ class VolumeWarning(AudioCore):
 
         self.color_keys = [Colors.VOLUME_OK, Colors.VOLUME_WARNING]
 
-        self.plugin_base.connect_to_event(event_id="com_gapls_AudioControl::PulseEvent",
-                                          callback=self.on_pulse_device_change)
-
         self.plugin_base.asset_manager.colors.add_listener(self.color_changed)
         self.plugin_base.asset_manager.icons.remove_listener(self.icon_changed)
 
@@ -125,11 +122,7 @@ class VolumeWarning(AudioCore):
         if len(args) < 2 or self.selected_device is None:
             return
 
-        event = args[1]
-        index = self.selected_device.pulse_index
-
-        if event.index == index:
-            self.check_volume()
+        self.check_volume()
 
     def check_volume(self):
         if self.warning_color is None or self.default_color is None:
@@ -0,0 +1,154 @@
+import asyncio
+
+import pulsectl
+
+
+class FakePulse:
+    # Implements the part of pulsectl.Pulse the plugin uses on top of a simulator, so the pulsectl backend and its
+    # connection pool can be measured without a sound server
+    def __init__(self, client_name: str = None, simulator=None):
+        self.name = client_name
+        self.simulator = simulator
+        self.connected = True
+
+        self._subscription = None
+        self._event_callback = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connected = False
+
+        if self._subscription is not None:
+            self._subscription.close()
+
+    # Queries
+
+    def sink_list(self):
+        return self._call(self.simulator.get_all, "sink")
+
+    def source_list(self):
+        return self._call(self.simulator.get_all, "source")
+
+    def sink_input_list(self):
+        return self._call(self.simulator.get_all, "sink_input")
+
+    def source_output_list(self):
+        return self._call(self.simulator.get_all, "source_output")
+
+    def sink_info(self, index: int):
+        return self._call(self.simulator.get, "sink", index)
+
+    def source_info(self, index: int):
+        return self._call(self.simulator.get, "source", index)
+
+    def sink_input_info(self, index: int):
+        return self._call(self.simulator.get, "sink_input", index)
+
+    def source_output_info(self, index: int):
+        return self._call(self.simulator.get, "source_output", index)
+
+    def get_sink_by_name(self, name: str):
+        return self._call(self.simulator.get_by_name, "sink", name)
+
+    def get_source_by_name(self, name: str):
+        return self._call(self.simulator.get_by_name, "source", name)
+
+    def server_info(self):
+        return self._call(self.simulator.server_info)
+
+    # Writes
+
+    def volume_set(self, obj, vol):
+        self._call(self.simulator.set_volume, obj, list(vol.values))
+
+    def volume_set_all_chans(self, obj, vol: float):
+        self.volume_set(obj, pulsectl.PulseVolumeInfo(vol, len(obj.volume.values)))
+
+    def volume_change_all_chans(self, obj, inc: float):
+        self.volume_set(obj, pulsectl.PulseVolumeInfo([max(0, value + inc) for value in obj.volume.values]))
+
+    def mute(self, obj, mute: bool = True):
+        self._call(self.simulator.mute, obj, mute)
+
+    def sink_default_set(self, obj):
+        self._call(self.simulator.set_default, "sink", obj)
+
+    def source_default_set(self, obj):
+        self._call(self.simulator.set_default, "source", obj)
+
+    # Events
+
+    def event_mask_set(self, *masks):
+        if self._subscription is not None:
+            self._subscription.close()
+        self._subscription = self.simulator.subscribe(self.name, *masks)
+
+    def event_callback_set(self, callback):
+        self._event_callback = callback
+
+    def event_listen(self, timeout: float = None):
+        # Delivers events to the callback until it raises PulseLoopStop or the timeout runs out
+        self._ensure_connected()
+
+        if timeout is None:
+            while True:
+                if self._deliver(self._subscription.next_event()):
+                    return
+
+        for event in self._subscription.collect(timeout):
+            if self._deliver(event):
+                return
+
+    def _deliver(self, event) -> bool:
+        try:
+            self._event_callback(event)
+        except pulsectl.PulseLoopStop:
+            return True
+        return False
+
+    def _call(self, func, *args):
+        self._ensure_connected()
+        return func(*args)
+
+    def _ensure_connected(self):
+        if not self.connected:
+            raise pulsectl.PulseDisconnected()
+
+
+class FakePulseAsync:
+    # The part of pulsectl_asyncio.PulseAsync the async backend uses, on top of a FakePulse. Commands block for the
+    # simulated round trip like a sequential command waits for its reply, only waiting for events leaves the loop
+    def __init__(self, client_name: str = None, simulator=None):
+        self.client = FakePulse(client_name, simulator)
+
+    @property
+    def connected(self) -> bool:
+        return self.client.connected
+
+    async def connect(self):
+        self.client.connected = True
+
+    def close(self):
+        self.client.close()
+
+    async def subscribe_events(self, *masks):
+        self.client.event_mask_set(*masks)
+        subscription = self.client._subscription
+        loop = asyncio.get_running_loop()
+
+        while self.client.connected:
+            for event in await loop.run_in_executor(None, subscription.wait):
+                yield event
+
+    def __getattr__(self, name: str):
+        method = getattr(self.client, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+
+        return call
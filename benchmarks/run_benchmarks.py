@@ -0,0 +1,566 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from loguru import logger as log
+
+from FakePulse import FakePulse, FakePulseAsync
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentiles(samples: list[float], scale: float = 1000) -> dict:
+    # Milliseconds by default
+    if not samples:
+        return {"count": 0}
+
+    ordered = sorted(samples)
+
+    def at(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * scale, 4)
+
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered) * scale, 4),
+        "p50": at(0.50),
+        "p90": at(0.90),
+        "p99": at(0.99),
+        "max": round(ordered[-1] * scale, 4),
+    }
+
+
+def wait_for(condition, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.0005)
+    return True
+
+
+class Plugin:
+    # Imports the plugin as a package from its parent directory, the way StreamController loads it
+    def __init__(self, streamcontroller: str = None, backend: str = "pulsectl"):
+        self.backend = backend
+
+        if streamcontroller:
+            sys.path.insert(0, streamcontroller)
+        sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+
+        package = os.path.basename(PLUGIN_DIR)
+
+        def load(name: str):
+            return importlib.import_module(f"{package}.{name}")
+
+        self.connection_manager = load("internal.PulseConnectionManager").connection_manager
+        self.audio_backend = load("internal.AudioBackend").audio_backend
+        self.PulsectlBackend = load("internal.PulsectlBackend").PulsectlBackend
+        self.SimulatedBackend = load("internal.SimulatedBackend").SimulatedBackend
+        self.pulse_async_backend = load("internal.PulseAsyncBackend").pulse_async_backend
+        self.device_store = load("internal.DeviceStore").device_store
+        self.facility_name = load("internal.DeviceStore").facility_name
+        self.device_catalog = load("internal.DeviceCatalog").device_catalog
+        self.stream_index = load("internal.StreamIndex").stream_index
+        self.helpers = load("internal.PulseHelpers")
+        self.PulseEvent = load("internal.PulseEventListener").PulseEvent
+
+        audio_core = load("actions.AudioCore")
+        self.InfoContent = audio_core.InfoContent
+        self.VolumeIndicator = audio_core.VolumeIndicator
+        self.AdjustMode = load("actions.AdjustVolume").AdjustMode
+        self.AdjustVolume = load("actions.AdjustVolume").AdjustVolume
+        dial_acceleration = load("internal.DialAcceleration")
+        self.AccelerationCurve = dial_acceleration.AccelerationCurve
+        self.DialAcceleration = dial_acceleration.DialAcceleration
+        self.Mute = load("actions.Mute").Mute
+        self.ToggleDefaultDevice = load("actions.ToggleDefaultDevice").ToggleDefaultDevice
+        self.ActionCore = importlib.import_module("src.backend.PluginManager.ActionCore").ActionCore
+
+        # The async backend always needs a real server
+        self.pulse_async_backend.enabled = False
+
+        with open(os.path.join(PLUGIN_DIR, "manifest.json")) as f:
+            self.version = json.load(f).get("version")
+
+        self.plugin_base = BenchPluginBase()
+        self.RecordingOutput = create_recording_output(self.ActionCore)
+
+    def use_server(self, server):
+        # Every benchmark starts from empty caches on its own simulator. With the pulsectl backend it is reached through
+        # fake clients, so the connection pool is part of the measurement
+        self.connection_manager.close()
+
+        if self.backend == "pulsectl":
+            self.connection_manager.client_factory = lambda client_name: FakePulse(client_name, server)
+            self.audio_backend.use(self.PulsectlBackend())
+        else:
+            self.audio_backend.use(server)
+
+        self.device_store.clear()
+        self.stream_index.clear()
+        self.device_catalog.rebuild()
+
+    def create_action(self, action_class, **attributes):
+        # Skips ActionCore.__init__, which needs a running deck, and sets what the UI would have loaded instead
+        bench_class = type(f"Bench{action_class.__name__}", (action_class, self.RecordingOutput), {})
+        action = object.__new__(bench_class)
+
+        action.plugin_base = self.plugin_base
+        action.outputs = []
+        action.errors = 0
+
+        for key, value in attributes.items():
+            setattr(action, key, value)
+        return action
+
+    def create_audio_action(self, action_class, device, **attributes):
+        defaults = {
+            "device_filter": self.helpers.DeviceFilter.SINK.value,
+            "_selected_device": device,
+            "info_content": self.InfoContent.VOLUME.value,
+            "show_device_name": True,
+            "device_nick": "",
+            "show_info_content": True,
+            "volume_indicator": self.VolumeIndicator.NONE.value,
+            "use_standard_device": False,
+            "loaded_devices": [],
+            "icon_keys": [],
+            "_current_icon": None,
+            "_icon_name": "",
+            "predicted_volume": None,
+            "predicted_mute": None,
+        }
+        defaults.update(attributes)
+        return self.create_action(action_class, **defaults)
+
+
+class BenchPluginBase:
+    def __init__(self):
+        self.pulse_sink_event_holder = None
+
+
+def create_recording_output(action_core):
+    # Sits between OutputCache and ActionCore, so suppressed writes never reach it
+    class RecordingOutput(action_core):
+        def _record(self, output: str):
+            self.outputs.append((time.monotonic(), output))
+
+        def set_top_label(self, *args, **kwargs):
+            self._record("top-label")
+
+        def set_center_label(self, *args, **kwargs):
+            self._record("center-label")
+
+        def set_bottom_label(self, *args, **kwargs):
+            self._record("bottom-label")
+
+        def set_media(self, *args, **kwargs):
+            self._record("media")
+
+        def set_background_color(self, *args, **kwargs):
+            self._record("background-color")
+
+        def show_error(self, *args, **kwargs):
+            self.errors += 1
+
+        def get_icon(self, *args, **kwargs):
+            return None
+
+    return RecordingOutput
+
+
+def create_server(plugin: Plugin, args):
+    server = plugin.SimulatedBackend(latency=args.latency / 1000)
+
+    for i in range(args.devices):
+        server.add_sink(f"alsa_output.bench-{i}", f"Bench Output {i}", proplist={"alsa.card_name": f"Bench Card {i}"})
+        server.add_source(f"alsa_input.bench-{i}", f"Bench Input {i}", proplist={"alsa.card_name": f"Bench Mic {i}"})
+
+    for i in range(args.streams):
+        server.add_stream("sink_input", f"App{i % 4}")
+
+    return server
+
+
+def first_device(plugin: Plugin):
+    return plugin.device_catalog.get_devices(plugin.helpers.DeviceFilter.SINK.value)[0]
+
+
+def bench_helpers(plugin: Plugin, args) -> dict:
+    server = create_server(plugin, args)
+    plugin.use_server(server)
+
+    helpers = plugin.helpers
+    sink = helpers.DeviceFilter.SINK.value
+    name = first_device(plugin).pulse_name
+    device = helpers.get_device(sink, name)
+
+    cases = {
+        "get_device": lambda: helpers.get_device(sink, name),
+        "get_device_list": lambda: helpers.get_device_list(sink),
+        "get_volumes_from_device": lambda: helpers.get_volumes_from_device(sink, name),
+        "get_standard_device": lambda: helpers.get_standard_device(sink),
+        "filter_proplist": lambda: helpers.filter_proplist(device.proplist),
+        "set_volume": lambda: helpers.set_volume(device, 50),
+        "adjust_volume_bounded": lambda: helpers.adjust_volume_bounded(sink, name, 1, 100),
+    }
+
+    results = {}
+    for case, func in cases.items():
+        server.reset_counters()
+        samples = []
+
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+
+        results[case] = {
+            "latency_ms": percentiles(samples),
+            "round_trips_per_call": server.round_trips / args.iterations,
+        }
+    return results
+
+
+def bench_adjust_volume(plugin: Plugin, args) -> dict:
+    server = create_server(plugin, args)
+    plugin.use_server(server)
+
+    results = {}
+    for mode in plugin.AdjustMode:
+        action = plugin.create_audio_action(plugin.AdjustVolume, first_device(plugin), adjust=1, bounds=100, adjust_mode=mode.value)
+        server.reset_counters()
+        samples = []
+        label_samples = []
+
+        # Alternating direction keeps the volume inside the bounds, so every press writes
+        for i in range(args.iterations):
+            writes = len(server.writes)
+            outputs = len(action.outputs)
+            pressed = time.monotonic()
+            action.adjust_volume(1 if i % 2 == 0 else -1)
+
+            labels = [at for at, output in action.outputs[outputs:] if output == "bottom-label"]
+            if labels:
+                label_samples.append(labels[0] - pressed)
+
+            if wait_for(lambda: len(server.writes) > writes):
+                samples.append(server.writes[writes][0] - pressed)
+
+        results[mode.value.get_value()] = {
+            "press_to_label_ms": percentiles(label_samples),
+            "press_to_write_ms": percentiles(samples),
+            "round_trips_per_press": server.round_trips / args.iterations,
+            "outputs_per_press": len(action.outputs) / args.iterations,
+            "errors": action.errors,
+        }
+
+    # A fast dial spin, every detent arrives well within one coalescing window
+    action = plugin.create_audio_action(plugin.AdjustVolume, first_device(plugin), adjust=1, bounds=100,
+                                        adjust_mode=plugin.AdjustMode.COALESCED.value)
+    server.reset_counters()
+    bursts = max(1, args.iterations // 10)
+
+    for i in range(bursts):
+        writes = len(server.writes)
+        for _ in range(10):
+            action.adjust_volume(1 if i % 2 == 0 else -1)
+
+        wait_for(lambda: len(server.writes) > writes)
+        # Lets a write that was already running flush the detents that came in behind it
+        time.sleep(0.1)
+
+    results["dial-spin"] = {
+        "detents": bursts * 10,
+        "writes": len(server.writes),
+        "round_trips_per_detent": server.round_trips / (bursts * 10),
+    }
+
+    # A steady sweep from 10 % to 90 % at 40 detents per second, with every acceleration curve
+    sink = plugin.helpers.DeviceFilter.SINK.value
+    device = first_device(plugin)
+
+    for curve in plugin.AccelerationCurve:
+        action = plugin.create_audio_action(plugin.AdjustVolume, device, adjust=1, bounds=100,
+                                            adjust_mode=plugin.AdjustMode.IMMEDIATE.value, acceleration=plugin.DialAcceleration(),
+                                            acceleration_curve=curve.value, max_acceleration=10)
+        plugin.helpers.set_volume(plugin.helpers.get_device(sink, device.pulse_name), 10)
+        server.reset_counters()
+        detents = 0
+
+        while plugin.helpers.get_volumes_from_device(sink, device.pulse_name)[0] < 90 and detents < 200:
+            action.adjust_volume(accelerate=True)
+            detents += 1
+            time.sleep(1 / 40)
+
+        results[f"sweep-{curve.value.get_value()}"] = {
+            "detents": detents,
+            "writes": len(server.writes),
+        }
+    return results
+
+
+def bench_mute(plugin: Plugin, args) -> dict:
+    server = create_server(plugin, args)
+    plugin.use_server(server)
+
+    action = plugin.create_audio_action(plugin.Mute, first_device(plugin), is_muted=False, fade_duration=0)
+    server.reset_counters()
+    samples = []
+
+    for _ in range(args.iterations):
+        writes = len(server.writes)
+        pressed = time.monotonic()
+        action.on_mute(None)
+
+        if len(server.writes) > writes:
+            samples.append(server.writes[writes][0] - pressed)
+
+    return {
+        "press_to_write_ms": percentiles(samples),
+        "round_trips_per_press": server.round_trips / args.iterations,
+        "outputs_per_press": len(action.outputs) / args.iterations,
+        "errors": action.errors,
+    }
+
+
+def bench_toggle_default_device(plugin: Plugin, args) -> dict:
+    server = create_server(plugin, args)
+    plugin.use_server(server)
+
+    devices = plugin.device_catalog.get_devices(plugin.helpers.DeviceFilter.SINK.value)
+    if len(devices) < 2:
+        return {"skipped": "needs at least two devices"}
+
+    action = plugin.create_action(
+        plugin.ToggleDefaultDevice,
+        device_filter=plugin.helpers.DeviceFilter.SINK.value,
+        info_content=plugin.InfoContent.VOLUME.value,
+        show_device_name=True,
+        show_info_content=True,
+        speaker_device=devices[0],
+        headphone_device=devices[1],
+        loaded_devices=devices,
+        icon_keys=[],
+        color_keys=[],
+        current_icon=None,
+        current_color=None,
+        icon_name="",
+        color_name="",
+    )
+
+    # The updates StreamController asks for on every redraw
+    server.reset_counters()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+
+    for _ in range(args.iterations):
+        action.on_update()
+
+    update = {
+        "cpu_us_per_call": round((time.process_time() - cpu_start) / args.iterations * 1e6, 3),
+        "wall_us_per_call": round((time.perf_counter() - wall_start) / args.iterations * 1e6, 3),
+        "round_trips_per_call": server.round_trips / args.iterations,
+        "outputs_per_call": len(action.outputs) / args.iterations,
+    }
+
+    server.reset_counters()
+    samples = []
+
+    for _ in range(args.iterations):
+        pressed = time.monotonic()
+        action.on_toggle_device(None)
+        samples.append(time.monotonic() - pressed)
+
+        # Done by the event listener in the plugin, there is none running here
+        plugin.device_store.refresh_defaults()
+
+    return {
+        "on_update": update,
+        "toggle": {
+            "press_to_return_ms": percentiles(samples),
+            "round_trips_per_press": server.round_trips / args.iterations,
+        },
+    }
+
+
+def check_event_masks(plugin: Plugin):
+    # The simulator has to filter events with the masks the plugin passes, which are pulsectl enum values, not strings
+    import pulsectl
+
+    server = plugin.SimulatedBackend()
+    with server.subscribe("bench::check-masks", pulsectl.PulseEventMaskEnum.sink) as subscription:
+        server.add_source("bench-check-source")
+        server.add_sink("bench-check-sink")
+
+        events = subscription.collect(0.05)
+
+    facilities = [plugin.facility_name(event.facility) for event in events]
+    if facilities != ["sink"]:
+        raise SystemExit(f"Simulator delivered {facilities} for a sink subscription, expected ['sink']")
+
+
+def bench_events(plugin: Plugin, args) -> dict:
+    import pulsectl
+
+    masks = (
+        pulsectl.PulseEventMaskEnum.sink,
+        pulsectl.PulseEventMaskEnum.source,
+        pulsectl.PulseEventMaskEnum.server,
+        pulsectl.PulseEventMaskEnum.sink_input,
+        pulsectl.PulseEventMaskEnum.source_output,
+    )
+
+    results = {}
+    for window in (0, 1 / 30):
+        server = create_server(plugin, args)
+        plugin.use_server(server)
+
+        # Loads the caches the events are applied to
+        plugin.device_catalog.get_devices(plugin.helpers.DeviceFilter.SINK.value)
+        plugin.device_catalog.get_devices(plugin.helpers.DeviceFilter.SOURCE.value)
+
+        pulse_event = plugin.PulseEvent(plugin.plugin_base, f"bench::PulseEvent-{window:.3f}", *masks, coalesce_window=window)
+        pulse_event.start()
+        server.wait_idle()
+        server.reset_counters()
+
+        start = time.perf_counter()
+        server.storm(args.storm)
+
+        received = wait_for(lambda: pulse_event.events_received >= args.storm, timeout=60)
+        server.wait_idle(60)
+        elapsed = time.perf_counter() - start
+
+        results[f"window-{round(window * 1000)}ms"] = {
+            "events": args.storm,
+            "complete": received,
+            "events_per_second": round(pulse_event.events_received / elapsed, 1),
+            "events_delivered": pulse_event.events_delivered,
+            "round_trips": server.round_trips,
+            "round_trips_per_event": round(server.round_trips / args.storm, 4),
+        }
+    return results
+
+
+def bench_write_paths(plugin: Plugin, args) -> dict:
+    # The same volume write from an action thread, through the connection pool the backend uses and through the async
+    # backend loop it could hand writes to instead
+    if plugin.backend != "pulsectl":
+        return {"skipped": "only the pulsectl backend has an async path"}
+
+    import pulsectl
+
+    async_backend = plugin.pulse_async_backend
+    paths = {
+        "pool": lambda device, values: plugin.audio_backend.set_volume(device, values),
+        "async": lambda device, values: async_backend.call_blocking("volume_set", device, pulsectl.PulseVolumeInfo(values)),
+    }
+
+    results = {}
+    for path, write in paths.items():
+        server = create_server(plugin, args)
+        plugin.use_server(server)
+
+        async_backend.close()
+        async_backend.client_factory = lambda client_name: FakePulseAsync(client_name, server)
+
+        device = plugin.helpers.get_device(plugin.helpers.DeviceFilter.SINK.value, first_device(plugin).pulse_name)
+        channels = len(device.volume.values)
+        # Opens the connection of the path before measuring
+        write(device, [0.5] * channels)
+        server.reset_counters()
+        samples = []
+
+        for i in range(args.iterations):
+            start = time.perf_counter()
+            write(device, [(i % 100) / 100] * channels)
+            samples.append(time.perf_counter() - start)
+
+        results[path] = {
+            "write_ms": percentiles(samples),
+            "round_trips_per_write": server.round_trips / args.iterations,
+        }
+
+    async_backend.close()
+    return results
+
+
+BENCHMARKS = {
+    "helpers": bench_helpers,
+    "adjust_volume": bench_adjust_volume,
+    "mute": bench_mute,
+    "toggle_default_device": bench_toggle_default_device,
+    "events": bench_events,
+    "write_paths": bench_write_paths,
+}
+
+
+def compare(old: dict, new: dict, path: str = "") -> list[str]:
+    # Relative change of every number present in both result files
+    lines = []
+    for key, value in new.items():
+        old_value = old.get(key) if isinstance(old, dict) else None
+        name = f"{path}.{key}" if path else key
+
+        if isinstance(value, dict) and isinstance(old_value, dict):
+            lines += compare(old_value, value, name)
+        elif isinstance(value, (int, float)) and isinstance(old_value, (int, float)) and not isinstance(value, bool):
+            change = (value - old_value) / old_value * 100 if old_value else 0
+            lines.append(f"{name}: {old_value} -> {value} ({change:+.1f}%)")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the Audio Control plugin against an in-process fake pulse server")
+    parser.add_argument("--streamcontroller", help="Path of a StreamController checkout, if it is not importable already")
+    parser.add_argument("--output", help="Result file, defaults to benchmark-<version>.json next to this script")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    parser.add_argument("--backend", choices=("pulsectl", "simulator"), default="pulsectl",
+                        help="pulsectl runs the pulsectl backend against fake clients, simulator uses the simulator backend directly")
+    parser.add_argument("--only", nargs="*", choices=list(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--devices", type=int, default=4, help="Sinks and sources each")
+    parser.add_argument("--streams", type=int, default=8)
+    parser.add_argument("--storm", type=int, default=5000, help="Events per event storm")
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated server round trip in milliseconds")
+    args = parser.parse_args()
+
+    log.remove()
+    log.add(sys.stderr, level="WARNING")
+
+    plugin = Plugin(args.streamcontroller, args.backend)
+    check_event_masks(plugin)
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        print(f"Running {name}...", file=sys.stderr)
+        results[name] = BENCHMARKS[name](plugin, args)
+
+    report = {
+        "version": plugin.version,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "streamcontroller")},
+        "results": results,
+    }
+
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), f"benchmark-{plugin.version}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        print("\n".join(compare(old.get("results", {}), results)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import abc
+
+from loguru import logger as log
+
+from .Instrumentation import instrumentation
+
+
+class EventSubscription(abc.ABC):
+    # Events of the subscribed facilities, in arrival order. Close it, or use it as a context manager
+
+    @abc.abstractmethod
+    def wait(self) -> list:
+        # Blocks until at least one event arrived and returns everything received so far
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def collect(self, duration: float) -> list:
+        # Returns every event arriving within duration seconds
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def close(self):
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PeakSampler(abc.ABC):
+    # Measures peak levels of one source on its own connection and hands them to the callback, peaks are only
+    # delivered while run() pumps the connection
+
+    @abc.abstractmethod
+    def connect(self, source_name: str, callback):
+        # Replaces the stream of any earlier source
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def disconnect(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def run(self, duration: float):
+        # Blocks for duration seconds while delivering peaks
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def close(self):
+        raise NotImplementedError
+
+
+class AudioBackend(abc.ABC):
+    # Everything the plugin asks of the sound server. Facilities are "sink", "source", "sink_input" and
+    # "source_output". Unknown objects raise pulsectl.PulseIndexError, lost connections pulsectl.PulseDisconnected
+    name: str = None
+
+    @abc.abstractmethod
+    def get_all(self, facility: str) -> list:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get(self, facility: str, index: int):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_by_name(self, facility: str, name: str):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def server_info(self):
+        # Anything with default_sink_name and default_source_name
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def set_volume(self, obj, values: list[float]):
+        # Updates obj.volume as well
+        raise NotImplementedError
+
+    def set_volumes(self, updates: list[tuple]):
+        # (obj, values) pairs, written as one batch where the backend can
+        for obj, values in updates:
+            self.set_volume(obj, values)
+
+    @abc.abstractmethod
+    def mute(self, obj, state: bool):
+        # Updates obj.mute as well
+        raise NotImplementedError
+
+    def mute_many(self, objs: list, state: bool):
+        for obj in objs:
+            self.mute(obj, state)
+
+    @abc.abstractmethod
+    def set_default(self, facility: str, obj):
+        raise NotImplementedError
+
+    def write_batch(self, volumes: list[tuple], mutes: list[tuple], defaults: list[tuple]):
+        # (obj, values), (obj, state) and (facility, obj) pairs, written as one batch where the backend can
+        self.set_volumes(volumes)
+        for obj, state in mutes:
+            self.mute(obj, state)
+        for facility, obj in defaults:
+            self.set_default(facility, obj)
+
+    @abc.abstractmethod
+    def subscribe(self, client_name: str, *masks) -> EventSubscription:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def open_peak_sampler(self, client_name: str, rate: float) -> PeakSampler:
+        # rate is how many peaks per second the server reports
+        raise NotImplementedError
+
+    def get_async(self):
+        # The asyncio backend talking to the same server, for events and commands, or None
+        return None
+
+    def stats(self) -> dict:
+        return {}
+
+
+class ActiveBackend:
+    # The backend every module talks to. Defaults to pulsectl, swap it with use() before the first call
+
+    def __init__(self):
+        self._backend: AudioBackend = None
+
+    @property
+    def backend(self) -> AudioBackend:
+        if self._backend is None:
+            from .PulsectlBackend import PulsectlBackend
+            self._backend = PulsectlBackend()
+        return self._backend
+
+    def use(self, backend: AudioBackend):
+        log.info(f"Using {backend.name} audio backend")
+        self._backend = backend
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.backend, name)
+
+        if instrumentation.enabled and callable(attribute):
+            return instrumentation.round_trip(name, attribute)
+        return attribute
+
+
+audio_backend = ActiveBackend()
@@ -0,0 +1,177 @@
+import threading
+
+import pulsectl
+from loguru import logger as log
+
+from GtkHelper.ComboRow import BaseComboRowItem
+from .DeviceStore import device_store, facility_name
+from .DeviceNames import device_names
+
+
+class Device(BaseComboRowItem):
+    def __init__(self, pulse_name, pulse_index, device_name):
+        super().__init__()
+        self.pulse_name: str = pulse_name
+        self.pulse_index: int = pulse_index
+        self.device_name: str = device_name
+
+    def __str__(self):
+        return self.device_name
+
+    def get_value(self):
+        return self.pulse_name
+
+
+def create_device(pulse_device) -> Device | None:
+    if pulse_device.description.__contains__("Monitor"):
+        return None
+
+    device_name = device_names.resolve(pulse_device)
+
+    if device_name is None:
+        return None
+
+    return Device(
+        pulse_name=pulse_device.name,
+        pulse_index=pulse_device.index,
+        device_name=device_name
+    )
+
+
+class DeviceCatalog:
+    def __init__(self):
+        # One list per facility, handed out by reference and only ever changed in place
+        self._devices: dict[str, list[Device]] = {}
+        # Removed devices by pulse name, so a device that comes back keeps its Device object
+        self._detached: dict[str, dict[str, Device]] = {}
+        self._lock = threading.RLock()
+
+        self.listeners: list = []
+
+        # Counters
+        self.builds: int = 0
+
+    def get_devices(self, filter) -> list[Device]:
+        facility = facility_name(filter)
+
+        with self._lock:
+            devices = self._devices.get(facility)
+            if devices is None:
+                devices = self._devices[facility] = []
+                self._build(facility, devices)
+            return devices
+
+    def add_listener(self, callback):
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def rebuild(self):
+        with self._lock:
+            for facility, devices in self._devices.items():
+                self._build(facility, devices)
+            facilities = list(self._devices)
+
+        for facility in facilities:
+            self._notify(facility)
+
+    def refresh_names(self):
+        # Renames entries in place, e.g. after a name override changed
+        with self._lock:
+            facilities = list(self._devices)
+
+            for facility in facilities:
+                for device in self._devices[facility]:
+                    pulse_device = device_store.get(facility, device.pulse_name)
+                    if pulse_device is not None:
+                        device.device_name = device_names.resolve(pulse_device) or device.device_name
+
+        for facility in facilities:
+            self._notify(facility)
+
+    def apply_event(self, event):
+        facility = facility_name(event.facility)
+
+        with self._lock:
+            devices = self._devices.get(facility)
+            if devices is None:
+                return
+
+            if event.t == pulsectl.PulseEventTypeEnum.remove:
+                changed = self._remove(facility, devices, event.index)
+            else:
+                # New and change are treated alike, coalescing may hand over a change for an unknown device
+                changed = self._add(facility, devices, event.index)
+
+        if changed:
+            self._notify(facility)
+
+    def _build(self, facility: str, devices: list[Device]):
+        self.builds += 1
+
+        # Devices keep their Device object by name, a rebuild after a server restart only moves indices
+        existing = {device.pulse_name: device for device in devices}
+        detached = self._detached.setdefault(facility, {})
+
+        built = []
+        for pulse_device in device_store.get_all(facility):
+            device = existing.pop(pulse_device.name, None) or detached.pop(pulse_device.name, None)
+
+            if device is None:
+                device = create_device(pulse_device)
+            else:
+                device.pulse_index = pulse_device.index
+                device.device_name = device_names.resolve(pulse_device) or device.device_name
+
+            if device is not None:
+                built.append(device)
+
+        detached.update(existing)
+        devices[:] = built
+
+    def _add(self, facility: str, devices: list[Device], index: int) -> bool:
+        if any(device.pulse_index == index for device in devices):
+            return False
+
+        pulse_device = device_store.get_by_index(facility, index)
+        if pulse_device is None:
+            return False
+
+        for device in devices:
+            if device.pulse_name == pulse_device.name:
+                device.pulse_index = pulse_device.index
+                return True
+
+        # A device that comes back gets a new index but keeps its name
+        device = self._detached.get(facility, {}).pop(pulse_device.name, None)
+        if device is not None:
+            device.pulse_index = pulse_device.index
+        else:
+            device = create_device(pulse_device)
+
+        if device is None:
+            return False
+
+        devices.append(device)
+        return True
+
+    def _remove(self, facility: str, devices: list[Device], index: int) -> bool:
+        for device in devices:
+            if device.pulse_index == index:
+                devices.remove(device)
+                self._detached.setdefault(facility, {})[device.pulse_name] = device
+                return True
+        return False
+
+    def _notify(self, facility: str):
+        for callback in list(self.listeners):
+            try:
+                callback(facility)
+            except Exception as e:
+                log.error(f"Error while notifying device catalog listener {callback}: {e}")
+
+
+device_catalog = DeviceCatalog()
@@ -0,0 +1,133 @@
+import enum
+
+from loguru import logger as log
+
+from GtkHelper.ComboRow import SimpleComboRowItem
+from .AudioBackend import audio_backend
+from .DeviceStore import device_store, facility_name
+from .Instrumentation import instrumentation
+from .PulseHelpers import bounded_volume_values
+
+
+class GroupMuteMode(enum.Enum):
+    MAJORITY = SimpleComboRowItem("majority", "Majority")
+    ANY = SimpleComboRowItem("any", "Any")
+
+    def get_value(self):
+        return self.value.get_value()
+
+
+class DeviceGroup:
+    # A user defined set of sinks and sources. State is read from the device store, writes go out as one batch
+    def __init__(self, members: list[tuple[str, str]] = ()):
+        # (facility, pulse name)
+        self.members: list[tuple[str, str]] = []
+        for facility, pulse_name in members:
+            self.add(facility, pulse_name)
+
+    @classmethod
+    def from_settings(cls, members: list[str]) -> "DeviceGroup":
+        # Stored as "facility:pulse name"
+        return cls(tuple(member.split(":", 1)) for member in members if ":" in member)
+
+    def to_settings(self) -> list[str]:
+        return [f"{facility}:{pulse_name}" for facility, pulse_name in self.members]
+
+    def add(self, facility, pulse_name: str):
+        member = (facility_name(facility), pulse_name)
+        if member not in self.members:
+            self.members.append(member)
+
+    def remove(self, facility, pulse_name: str):
+        member = (facility_name(facility), pulse_name)
+        if member in self.members:
+            self.members.remove(member)
+
+    def contains(self, facility, pulse_name: str) -> bool:
+        return (facility_name(facility), pulse_name) in self.members
+
+    def get_devices(self) -> list:
+        # Members that are currently present. Only the store is asked, a missing member costs no round trip
+        devices = []
+        for facility, pulse_name in self.members:
+            device = device_store.get(facility, pulse_name, query=False)
+            if device is not None:
+                devices.append(device)
+        return devices
+
+    def get_indices(self) -> list[tuple[str, int]]:
+        indices = []
+        for facility, pulse_name in self.members:
+            device = device_store.get(facility, pulse_name, query=False)
+            if device is not None:
+                indices.append((facility, device.index))
+        return indices
+
+    def get_volume(self) -> int | None:
+        # Mean over the members of their mean channel volume
+        levels = [sum(device.volume.values) / len(device.volume.values) for device in self.get_devices() if device.volume.values]
+
+        if not levels:
+            return None
+        return round(sum(levels) / len(levels) * 100)
+
+    def is_muted(self, mode: str = "majority") -> bool:
+        devices = self.get_devices()
+        muted = sum(1 for device in devices if device.mute)
+
+        if mode == "any":
+            return muted > 0
+        return muted * 2 > len(devices)
+
+    @instrumentation.timed("helpers.group_set_volume", scope=True)
+    def set_volume(self, volume: int) -> bool:
+        devices = self.get_devices()
+
+        try:
+            # Members already at the target are left out, the server rounds to whole percents on the way back
+            updates = [
+                (device, [volume * 0.01] * len(device.volume.values))
+                for device in devices
+                if any(round(value * 100) != volume for value in device.volume.values)
+            ]
+
+            if updates:
+                audio_backend.set_volumes(updates)
+            return len(devices) > 0
+        except Exception as e:
+            log.error(f"Error while setting volume of {len(devices)} grouped devices to {volume}. Error: {e}")
+            return False
+
+    @instrumentation.timed("helpers.group_adjust_volume", scope=True)
+    def adjust_volume(self, adjust: int, bounds: int) -> int | None:
+        # Every member moves by adjust, clamped on its own. Returns the new group volume
+        devices = self.get_devices()
+        if not devices:
+            return None
+
+        try:
+            updates = []
+            for device in devices:
+                values = bounded_volume_values(device.volume.values, adjust, bounds)
+                if values != list(device.volume.values):
+                    updates.append((device, values))
+
+            if updates:
+                audio_backend.set_volumes(updates)
+            return self.get_volume()
+        except Exception as e:
+            log.error(f"Error while adjusting volume of {len(devices)} grouped devices by {adjust}. Error: {e}")
+            return None
+
+    @instrumentation.timed("helpers.group_mute", scope=True)
+    def mute(self, state: bool) -> bool:
+        devices = self.get_devices()
+
+        try:
+            changed = [device for device in devices if bool(device.mute) != state]
+            if changed:
+                audio_backend.mute_many(changed, state)
+            return len(devices) > 0
+        except Exception as e:
+            log.error(f"Error while muting {len(devices)} grouped devices, state is {state}. Error: {e}")
+            return False
@@ -0,0 +1,57 @@
+import threading
+
+from .PulseHelpers import PROPLIST_FILTERS, filter_proplist
+
+
+class DeviceNameResolver:
+    def __init__(self):
+        # pulse name -> (hash of the scored proplist values, resolved name)
+        self._cache: dict[str, tuple[int, str | None]] = {}
+        self._lock = threading.Lock()
+
+        # pulse name -> name chosen by the user, persisted in the plugin settings
+        self.overrides: dict[str, str] = {}
+
+        # Counters
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def resolve(self, pulse_device) -> str | None:
+        override = self.overrides.get(pulse_device.name)
+        if override:
+            return override
+
+        proplist_hash = hash(tuple(pulse_device.proplist.get(key) for key in PROPLIST_FILTERS))
+
+        with self._lock:
+            cached = self._cache.get(pulse_device.name)
+            if cached is not None and cached[0] == proplist_hash:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        name = filter_proplist(pulse_device.proplist)
+
+        with self._lock:
+            self._cache[pulse_device.name] = (proplist_hash, name)
+        return name
+
+    def load_overrides(self, overrides: dict[str, str]):
+        self.overrides = {pulse_name: name for pulse_name, name in overrides.items() if name}
+
+    def set_override(self, pulse_name: str, name: str):
+        if name:
+            self.overrides[pulse_name] = name
+        else:
+            self.overrides.pop(pulse_name, None)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "cached": len(self._cache),
+            "overrides": len(self.overrides),
+        }
+
+
+device_names = DeviceNameResolver()
@@ -0,0 +1,184 @@
+import threading
+
+import pulsectl
+from loguru import logger as log
+
+from .AudioBackend import audio_backend
+
+FACILITIES = ("sink", "source", "sink_input", "source_output", "server")
+
+
+def facility_name(facility) -> str:
+    # Accepts DeviceFilter values, pulsectl event facilities and plain strings
+    if hasattr(facility, "get_value"):
+        return facility.get_value()
+
+    for name in FACILITIES:
+        if facility == name:
+            return name
+    return str(facility)
+
+
+class DeviceStore:
+    def __init__(self):
+        self._devices: dict[str, dict[int, object]] = {}
+        self._names: dict[str, dict[str, int]] = {}
+        self._defaults: dict[str, str] = {}
+        self._lock = threading.RLock()
+
+    def snapshot(self, facility: str):
+        devices = audio_backend.get_all(facility)
+
+        with self._lock:
+            self._devices[facility] = {device.index: device for device in devices}
+            self._names[facility] = {device.name: device.index for device in devices}
+
+    def resync(self) -> list[str]:
+        # Reloads every loaded facility and the defaults, e.g. after the server restarted. Returns the facilities
+        # whose default device changed
+        with self._lock:
+            facilities = list(self._devices)
+
+        devices = {facility: audio_backend.get_all(facility) for facility in facilities}
+        server_info = audio_backend.server_info()
+
+        with self._lock:
+            for facility, facility_devices in devices.items():
+                self._devices[facility] = {device.index: device for device in facility_devices}
+                self._names[facility] = {device.name: device.index for device in facility_devices}
+
+        return self.set_defaults(server_info)
+
+    def is_loaded(self, facility: str) -> bool:
+        return facility in self._devices
+
+    def get_all(self, facility: str) -> list:
+        self._ensure_loaded(facility)
+
+        with self._lock:
+            return list(self._devices.get(facility, {}).values())
+
+    def get(self, facility: str, name: str, query: bool = True):
+        self._ensure_loaded(facility)
+
+        with self._lock:
+            index = self._names.get(facility, {}).get(name)
+            if index is not None:
+                return self._devices[facility].get(index)
+
+        if not query:
+            return None
+
+        # Not known yet, e.g. the new event has not arrived. Ask the server once and remember the answer
+        try:
+            device = audio_backend.get_by_name(facility, name)
+        except pulsectl.PulseIndexError:
+            return None
+
+        if device is not None:
+            self.put(facility, device)
+        return device
+
+    def get_by_index(self, facility: str, index: int):
+        self._ensure_loaded(facility)
+
+        with self._lock:
+            return self._devices.get(facility, {}).get(index)
+
+    def refresh(self, facility: str, index: int):
+        if not self.is_loaded(facility):
+            return
+
+        try:
+            device = audio_backend.get(facility, index)
+        except pulsectl.PulseIndexError:
+            self.remove(facility, index)
+            return
+
+        if device is not None:
+            self.put(facility, device)
+
+    def put(self, facility: str, device):
+        with self._lock:
+            devices = self._devices.setdefault(facility, {})
+            names = self._names.setdefault(facility, {})
+
+            old = devices.get(device.index)
+            if old is not None and old.name != device.name and names.get(old.name) == device.index:
+                del names[old.name]
+
+            devices[device.index] = device
+            names[device.name] = device.index
+
+    def remove(self, facility: str, index: int):
+        with self._lock:
+            device = self._devices.get(facility, {}).pop(index, None)
+            if device is not None and self._names[facility].get(device.name) == index:
+                del self._names[facility][device.name]
+
+    def get_default_name(self, facility: str) -> str | None:
+        if not self._defaults:
+            self.refresh_defaults()
+
+        with self._lock:
+            return self._defaults.get(facility)
+
+    def refresh_defaults(self) -> list[str]:
+        # Returns the facilities whose default device changed
+        server_info = audio_backend.server_info()
+        return self.set_defaults(server_info)
+
+    def set_defaults(self, server_info) -> list[str]:
+        defaults = {
+            "sink": server_info.default_sink_name,
+            "source": server_info.default_source_name,
+        }
+
+        with self._lock:
+            changed = [facility for facility, name in defaults.items() if self._defaults.get(facility) != name]
+            self._defaults = defaults
+        return changed
+
+    def set_default_name(self, facility: str, name: str):
+        # Takes a default the plugin just wrote, the server event that follows confirms or corrects it
+        with self._lock:
+            if self._defaults:
+                self._defaults[facility] = name
+
+    def apply_event(self, event):
+        facility = facility_name(event.facility)
+
+        try:
+            if event.t == pulsectl.PulseEventTypeEnum.remove:
+                self.remove(facility, event.index)
+            else:
+                self.refresh(facility, event.index)
+        except Exception as e:
+            log.error(f"Error while updating device store for {facility} {event.index}: {e}")
+
+    async def apply_event_async(self, event, backend):
+        # Same as apply_event, but fetches through an async backend so the event loop is never blocked
+        facility = facility_name(event.facility)
+
+        try:
+            if event.t == pulsectl.PulseEventTypeEnum.remove:
+                self.remove(facility, event.index)
+            elif self.is_loaded(facility):
+                self.put(facility, await backend.call(f"{facility}_info", event.index))
+        except pulsectl.PulseIndexError:
+            self.remove(facility, event.index)
+        except Exception as e:
+            log.error(f"Error while updating device store for {facility} {event.index}: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._devices.clear()
+            self._names.clear()
+            self._defaults = {}
+
+    def _ensure_loaded(self, facility: str):
+        if not self.is_loaded(facility):
+            self.snapshot(facility)
+
+
+device_store = DeviceStore()
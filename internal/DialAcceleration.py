@@ -0,0 +1,68 @@
+import enum
+import time
+from collections import deque
+
+from GtkHelper.ComboRow import SimpleComboRowItem
+
+# Detents per second below which turning stays at the plain step, and at which the largest multiplier is reached
+SLOW_VELOCITY: float = 5.0
+FAST_VELOCITY: float = 40.0
+
+
+class AccelerationCurve(enum.Enum):
+    OFF = SimpleComboRowItem("off", "Off")
+    LINEAR = SimpleComboRowItem("linear", "Linear")
+    QUADRATIC = SimpleComboRowItem("quadratic", "Quadratic")
+
+    def get_value(self):
+        return self.value.get_value()
+
+
+class DialAcceleration:
+    # Measures how fast a dial turns from the times of its last detents and scales the step with it
+    def __init__(self, size: int = 6, window: float = 0.35):
+        self.window = window
+
+        self._detents: deque[float] = deque(maxlen=size)
+        self._direction: int = 0
+
+    def velocity(self) -> float:
+        # Detents per second over the detents within the window. Two detents in a row can be a single twitch
+        if len(self._detents) < 3:
+            return 0.0
+
+        elapsed = self._detents[-1] - self._detents[0]
+        if elapsed <= 0:
+            return FAST_VELOCITY
+        return (len(self._detents) - 1) / elapsed
+
+    def multiplier(self, curve: str, max_multiplier: float) -> float:
+        if curve == "off":
+            return 1.0
+
+        progress = (self.velocity() - SLOW_VELOCITY) / (FAST_VELOCITY - SLOW_VELOCITY)
+        progress = min(max(progress, 0.0), 1.0)
+
+        if curve == "quadratic":
+            progress *= progress
+        return 1 + (max_multiplier - 1) * progress
+
+    def step(self, adjust: int, curve: str, max_multiplier: float, now: float = None) -> int:
+        # Records a detent and returns the step to apply for it, keeping the sign of adjust
+        now = time.monotonic() if now is None else now
+        direction = 1 if adjust >= 0 else -1
+
+        # Turning back or pausing starts slow again
+        if direction != self._direction or (self._detents and now - self._detents[-1] > self.window):
+            self._detents.clear()
+        self._direction = direction
+
+        while self._detents and now - self._detents[0] > self.window:
+            self._detents.popleft()
+        self._detents.append(now)
+
+        return round(adjust * self.multiplier(curve, max_multiplier))
+
+    def reset(self):
+        self._detents.clear()
+        self._direction = 0
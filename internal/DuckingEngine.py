@@ -0,0 +1,211 @@
+import enum
+import threading
+
+from loguru import logger as log
+
+from GtkHelper.ComboRow import SimpleComboRowItem
+from .DeviceStore import device_store
+from .FadeEngine import fade_engine
+from .StreamIndex import get_app_keys, get_app_name, stream_index
+
+# Streams the plugin opens itself, e.g. for peak meters, never trigger or get ducked
+OWN_CLIENT_PREFIX = "audio-control"
+
+
+class DuckTrigger(enum.Enum):
+    SOURCE = SimpleComboRowItem("source", "Microphone In Use")
+    APP = SimpleComboRowItem("app", "App Playing")
+
+    def get_value(self):
+        return self.value.get_value()
+
+
+class DuckRule:
+    def __init__(self, trigger: str = "source", target: str = None, amount: int = 50, fade: float = 0.3,
+                 debounce: float = 0.2, hold: float = 1.0, on_change=None):
+        # target is the pulse name of a source or the name of an app
+        self.trigger = trigger
+        self.target = target
+        # Percent the other streams are lowered by
+        self.amount = amount
+        # Seconds
+        self.fade = fade
+        self.debounce = debounce
+        self.hold = hold
+        self.on_change = on_change
+
+        self.ducking: bool = False
+        self._timer: threading.Timer = None
+        self._pending: bool = None
+
+
+def is_own_stream(stream) -> bool:
+    app = get_app_name(stream) or ""
+    return app.startswith(OWN_CLIENT_PREFIX)
+
+
+class DuckingEngine:
+    # Reacts to the stream index, which the event listener keeps current, so nothing is polled. The level every stream
+    # had before it was ducked is kept here, restoring never asks the server
+    def __init__(self):
+        self.rules: list[DuckRule] = []
+
+        # sink input index -> (volume before ducking, amount it is ducked by)
+        self._ducked: dict[int, tuple[list[float], int]] = {}
+        self._lock = threading.RLock()
+        self._listening = False
+
+        # Counters
+        self.ducks: int = 0
+        self.restores: int = 0
+        self.debounced: int = 0
+
+    def add_rule(self, rule: DuckRule):
+        with self._lock:
+            if rule not in self.rules:
+                self.rules.append(rule)
+
+            if not self._listening:
+                stream_index.add_listener(self.on_stream_index_change)
+                self._listening = True
+
+        self.evaluate(rule)
+
+    def remove_rule(self, rule: DuckRule):
+        with self._lock:
+            if rule in self.rules:
+                self.rules.remove(rule)
+            self._cancel_timer(rule)
+            was_ducking, rule.ducking = rule.ducking, False
+
+        if was_ducking:
+            self._apply(rule.fade)
+
+    def is_triggered(self, rule: DuckRule) -> bool:
+        if rule.target is None:
+            return False
+
+        if rule.trigger == "app":
+            return any(not getattr(stream, "corked", False) for stream in stream_index.get_streams("sink_input", rule.target))
+
+        source = device_store.get("source", rule.target, query=False)
+        if source is None:
+            return False
+
+        return any(
+            getattr(stream, "source", None) == source.index and not getattr(stream, "corked", False) and not is_own_stream(stream)
+            for stream in stream_index.get_all("source_output")
+        )
+
+    def evaluate(self, rule: DuckRule):
+        # A change only takes effect once it held for the debounce time when starting, or the hold time when ending
+        triggered = self.is_triggered(rule)
+
+        with self._lock:
+            if triggered == rule.ducking:
+                if rule._timer is not None:
+                    self.debounced += 1
+                self._cancel_timer(rule)
+                return
+
+            if rule._pending == triggered:
+                return
+
+            self._cancel_timer(rule)
+            rule._pending = triggered
+            rule._timer = threading.Timer(rule.debounce if triggered else rule.hold, self._settle, (rule, triggered))
+            rule._timer.daemon = True
+            rule._timer.start()
+
+    def on_stream_index_change(self, facility: str):
+        with self._lock:
+            rules = list(self.rules)
+
+        for rule in rules:
+            self.evaluate(rule)
+
+        # A stream starting while ducked joins in, one that ended is forgotten
+        if facility == "sink_input" and any(rule.ducking for rule in rules):
+            self._apply(max(rule.fade for rule in rules))
+
+    def rebase(self, index: int, values: list[float]) -> list[float]:
+        # A level set from outside, e.g. by a restored scene, becomes the one a ducked stream returns to. Returns the
+        # level to write now
+        with self._lock:
+            ducked = self._ducked.get(index)
+            if ducked is None:
+                return values
+
+            _, amount = ducked
+            self._ducked[index] = (list(values), amount)
+            return [value * (100 - amount) / 100 for value in values]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rules": len(self.rules),
+                "ducking": sum(1 for rule in self.rules if rule.ducking),
+                "ducked_streams": len(self._ducked),
+                "ducks": self.ducks,
+                "restores": self.restores,
+                "debounced": self.debounced,
+            }
+
+    def _settle(self, rule: DuckRule, triggered: bool):
+        with self._lock:
+            rule._timer = None
+            rule._pending = None
+
+            if rule not in self.rules or self.is_triggered(rule) != triggered:
+                return
+            rule.ducking = triggered
+
+        self._apply(rule.fade)
+
+        if rule.on_change is not None:
+            try:
+                rule.on_change(rule)
+            except Exception as e:
+                log.error(f"Error while notifying ducking change: {e}")
+
+    def _apply(self, fade: float):
+        # Every playback stream is lowered by the largest amount of the rules ducking it
+        with self._lock:
+            active = [rule for rule in self.rules if rule.ducking]
+            streams = stream_index.get_all("sink_input")
+            present = set()
+
+            for stream in streams:
+                if is_own_stream(stream):
+                    continue
+                present.add(stream.index)
+
+                keys = get_app_keys(stream)
+                amount = max((rule.amount for rule in active if not (rule.trigger == "app" and rule.target in keys)), default=0)
+
+                original, ducked_by = self._ducked.get(stream.index, (None, 0))
+                if amount == ducked_by:
+                    continue
+
+                if amount > 0:
+                    if original is None:
+                        original = list(stream.volume.values)
+                    self._ducked[stream.index] = (original, amount)
+                    fade_engine.fade_stream("sink_input", stream.index, [value * (100 - amount) / 100 for value in original], fade)
+                    self.ducks += 1
+                else:
+                    del self._ducked[stream.index]
+                    fade_engine.fade_stream("sink_input", stream.index, original, fade)
+                    self.restores += 1
+
+            for index in set(self._ducked) - present:
+                del self._ducked[index]
+
+    def _cancel_timer(self, rule: DuckRule):
+        if rule._timer is not None:
+            rule._timer.cancel()
+        rule._timer = None
+        rule._pending = None
+
+
+ducking_engine = DuckingEngine()
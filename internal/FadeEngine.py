@@ -0,0 +1,255 @@
+import enum
+import math
+import threading
+import time
+
+from loguru import logger as log
+
+from GtkHelper.ComboRow import SimpleComboRowItem
+from .AudioBackend import audio_backend
+from .DeviceStore import device_store, facility_name
+from .StreamIndex import STREAM_FACILITIES, stream_index
+
+# Quietest level a dB fade passes through, anything below is treated as silence
+DB_FLOOR: float = -60.0
+
+
+class FadeCurve(enum.Enum):
+    LINEAR = SimpleComboRowItem("linear", "Linear")
+    DB = SimpleComboRowItem("db", "dB-linear")
+    EASE = SimpleComboRowItem("ease", "Ease in/out")
+
+    def get_value(self):
+        return self.value.get_value()
+
+
+def _to_db(value: float) -> float:
+    if value <= 0:
+        return DB_FLOOR
+    return max(20 * math.log10(value), DB_FLOOR)
+
+
+def interpolate(start: float, end: float, progress: float, curve: str) -> float:
+    if progress >= 1:
+        return end
+
+    if curve == "db":
+        # Equal steps in loudness instead of amplitude, so fades do not seem to jump at the quiet end
+        db = _to_db(start) + (_to_db(end) - _to_db(start)) * progress
+        return 0.0 if db <= DB_FLOOR else 10 ** (db / 20)
+
+    if curve == "ease":
+        progress = progress * progress * (3 - 2 * progress)
+
+    return start + (end - start) * progress
+
+
+class Fade:
+    def __init__(self, start: list[float], target: list[float], duration: float, curve: str, on_done=None):
+        self.start = start
+        self.target = target
+        self.duration = duration
+        self.curve = curve
+        self.on_done = on_done
+
+        self.started = time.monotonic()
+        self.last_values: list[float] = list(start)
+
+        # Volume to go back to once a fade to mute finished, and the mute state the fade ends in
+        self.restore: list[float] = None
+        self.mute_target: bool = None
+
+    def values_at(self, now: float) -> tuple[list[float], bool]:
+        progress = 1.0 if self.duration <= 0 else min((now - self.started) / self.duration, 1.0)
+        return [interpolate(start, end, progress, self.curve) for start, end in zip(self.start, self.target)], progress >= 1
+
+
+class FadeEngine:
+    # One scheduler thread for every fade. Each step writes all devices that changed in one batch, at most once each
+    def __init__(self, step: float = 1 / 30):
+        self.step = step
+
+        # (facility, pulse name) -> running fade
+        self._fades: dict[tuple[str, str], Fade] = {}
+        self._condition = threading.Condition()
+        # Keeps a step that was already under way from landing after a cancelled fade restored its level
+        self._write_lock = threading.Lock()
+        self._thread: threading.Thread = None
+
+        # Counters
+        self.fades_started: int = 0
+        self.retargets: int = 0
+        self.steps: int = 0
+        self.writes: int = 0
+
+    def fade_to(self, filter, pulse_name: str, target, duration: float, curve: str = "linear", on_done=None) -> bool:
+        # target is a level (1.0 = 100 %) or one per channel. Replaces a running fade of the device, starting from where
+        # it currently is
+        return self._fade((facility_name(filter), pulse_name), target, duration, curve, on_done)
+
+    def fade_stream(self, filter, index: int, target, duration: float, curve: str = "linear", on_done=None) -> bool:
+        # Streams have no unique name, they are faded by index
+        return self._fade((facility_name(filter), index), target, duration, curve, on_done)
+
+    def fade_mute(self, filter, pulse_name: str, state: bool, duration: float, curve: str = "linear") -> bool:
+        # Muting fades to silence, then mutes and restores the level. Unmuting starts silent and fades back up
+        key = (facility_name(filter), pulse_name)
+        device = self._resolve(*key)
+        if device is None:
+            return False
+
+        with self._condition:
+            running = self._fades.get(key)
+        restore = running.restore if running is not None and running.restore is not None else list(device.volume.values)
+
+        if state:
+            def finish(device):
+                audio_backend.mute(device, True)
+                audio_backend.set_volume(device, restore)
+
+            fade = Fade(list(device.volume.values), [0.0] * len(restore), duration, curve, finish)
+        else:
+            if device.mute:
+                audio_backend.set_volume(device, [0.0] * len(restore))
+                audio_backend.mute(device, False)
+
+            fade = Fade(list(device.volume.values), restore, duration, curve)
+
+        fade.restore = restore
+        fade.mute_target = state
+        self._start(key, fade)
+        return True
+
+    def cancel(self, filter, pulse_name: str, restore: bool = True) -> bool:
+        # The device stays where the fade left it. A mute fade puts back the level it saved first, nothing else would,
+        # unless the caller writes a level of its own right after
+        key = (facility_name(filter), pulse_name)
+        with self._condition:
+            fade = self._fades.pop(key, None)
+
+        if fade is None:
+            return False
+
+        if restore and fade.restore is not None:
+            device = self._resolve(*key)
+            if device is not None:
+                try:
+                    with self._write_lock:
+                        audio_backend.set_volume(device, fade.restore)
+                except Exception as e:
+                    log.error(f"Error while restoring the level of {key}: {e}")
+
+        return True
+
+    def is_fading(self, filter, pulse_name: str) -> bool:
+        with self._condition:
+            return (facility_name(filter), pulse_name) in self._fades
+
+    def get_mute_target(self, filter, pulse_name: str) -> bool | None:
+        # The mute state a running mute fade is heading for
+        with self._condition:
+            fade = self._fades.get((facility_name(filter), pulse_name))
+            return None if fade is None else fade.mute_target
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "active": len(self._fades),
+                "fades_started": self.fades_started,
+                "retargets": self.retargets,
+                "steps": self.steps,
+                "writes": self.writes,
+            }
+
+    def _fade(self, key: tuple, target, duration: float, curve: str, on_done) -> bool:
+        device = self._resolve(*key)
+        if device is None:
+            return False
+
+        start = list(device.volume.values)
+        if not isinstance(target, (list, tuple)):
+            target = [target] * len(start)
+
+        fade = Fade(start, list(target), duration, curve, on_done)
+        self._start(key, fade)
+        return True
+
+    def _resolve(self, facility: str, name):
+        if facility in STREAM_FACILITIES:
+            return stream_index.get_stream(facility, name)
+        return device_store.get(facility, name)
+
+    def _start(self, key: tuple[str, str], fade: Fade):
+        with self._condition:
+            if key in self._fades:
+                self.retargets += 1
+            self._fades[key] = fade
+            self.fades_started += 1
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audio-control-fades")
+                self._thread.daemon = True
+                self._thread.start()
+
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._fades:
+                    self._condition.wait()
+                fades = list(self._fades.items())
+
+            started = time.monotonic()
+            self._step(fades, started)
+
+            time.sleep(max(self.step - (time.monotonic() - started), 0))
+
+    def _step(self, fades: list, now: float):
+        updates = []
+        finished = []
+
+        for key, fade in fades:
+            device = self._resolve(*key)
+            if device is None:
+                finished.append((key, fade, None))
+                continue
+
+            values, done = fade.values_at(now)
+            if values != fade.last_values:
+                updates.append((key, fade, device, values))
+                fade.last_values = values
+
+            if done:
+                finished.append((key, fade, device))
+
+        self.steps += 1
+
+        if updates:
+            with self._write_lock:
+                # Fades cancelled or replaced since the snapshot are skipped
+                with self._condition:
+                    updates = [(device, values) for key, fade, device, values in updates if self._fades.get(key) is fade]
+
+                try:
+                    if updates:
+                        audio_backend.set_volumes(updates)
+                        self.writes += len(updates)
+                except Exception as e:
+                    log.error(f"Error while writing fade step for {len(updates)} devices: {e}")
+
+        for key, fade, device in finished:
+            with self._condition:
+                # A fade that was replaced meanwhile keeps running under the new one
+                if self._fades.get(key) is not fade:
+                    continue
+                del self._fades[key]
+
+            if fade.on_done is not None and device is not None:
+                try:
+                    fade.on_done(device)
+                except Exception as e:
+                    log.error(f"Error while finishing fade of {key}: {e}")
+
+
+fade_engine = FadeEngine()
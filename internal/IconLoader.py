@@ -0,0 +1,66 @@
+import threading
+import time
+
+from loguru import logger as log
+
+
+class IconLoader:
+    # Icons are only decoded and registered with the asset manager once something asks for them. The asset manager
+    # keeps the decoded image, so every key is loaded once no matter how many actions show it
+    def __init__(self):
+        self.plugin_base = None
+
+        # key -> (path, size)
+        self._specs: dict[str, tuple[str, float]] = {}
+        self._loaded: set[str] = set()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.loads: int = 0
+        self.load_time: float = 0.0
+
+    def register(self, key: str, path: str, size: float = 1.0):
+        self._specs[key] = (path, size)
+
+    def load(self, key: str):
+        if key in self._loaded:
+            return
+
+        with self._lock:
+            if key in self._loaded or key not in self._specs or self.plugin_base is None:
+                return
+
+            path, size = self._specs[key]
+            start = time.perf_counter()
+            try:
+                self.plugin_base.add_icon(key, path, size)
+            except Exception as e:
+                log.error(f"Error while loading icon {key}: {e}")
+            finally:
+                self._loaded.add(key)
+                self.loads += 1
+                self.load_time += time.perf_counter() - start
+
+    def load_next(self) -> bool:
+        # Loads one icon nobody asked for yet, meant for idle callbacks. Returns whether any are left
+        pending = [key for key in self._specs if key not in self._loaded]
+        if pending:
+            self.load(pending[0])
+        return len(pending) > 1
+
+    def stats(self) -> dict:
+        return {
+            "registered": len(self._specs),
+            "loaded": len(self._loaded),
+            "load_ms": round(self.load_time * 1000, 3),
+        }
+
+
+class LazyIcons:
+    # Mixin for ActionCore subclasses, loads an icon the first time the action asks for it
+    def get_icon(self, key: str, *args, **kwargs):
+        icon_loader.load(key)
+        return super().get_icon(key, *args, **kwargs)
+
+
+icon_loader = IconLoader()
@@ -0,0 +1,226 @@
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from loguru import logger as log
+
+# Upper bounds of the histogram buckets in seconds, the last bucket takes everything slower
+BUCKETS: tuple[float, ...] = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, float("inf")
+)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts: list[int] = [0] * len(BUCKETS)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def add(self, seconds: float):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        # Upper bound of the bucket the percentile falls into, the maximum for the last one
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if count and seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        # Milliseconds
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 4) if self.count else 0,
+            "p50_ms": round(self.percentile(0.5) * 1000, 4),
+            "p90_ms": round(self.percentile(0.9) * 1000, 4),
+            "p99_ms": round(self.percentile(0.99) * 1000, 4),
+            "max_ms": round(self.max * 1000, 4),
+            "buckets": {("inf" if bound == float("inf") else f"{bound * 1000:g}ms"): count for bound, count in zip(BUCKETS, self.counts) if count},
+        }
+
+
+class Instrumentation:
+    # Counters and latency histograms. Every entry point checks enabled first, so the cost when off is one attribute read
+    def __init__(self):
+        self.enabled: bool = False
+
+        self.counters: dict[str, int] = {}
+        self.histograms: dict[str, Histogram] = {}
+        # name -> callable returning a dict, e.g. the stats() of the singletons. Only read for snapshots
+        self.sources: dict = {}
+
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def count(self, name: str, amount: int = 1):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, seconds: float):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def timer(self, name, *args):
+        # name may be a function building the name from args, it is only called while enabled
+        if not self.enabled:
+            return nullcontext()
+        if args:
+            name = name(*args)
+        return self._timer(name)
+
+    def timed(self, name: str, scope: bool = False):
+        # Decorator. With scope, backend round trips made inside are counted under name as well
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+
+                with self._timer(name), (self.scope(name) if scope else nullcontext()):
+                    return func(*args, **kwargs)
+
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def scope(self, name: str):
+        # Only the outermost scope on a thread counts, helpers calling helpers are attributed to the first one
+        if getattr(self._local, "scope", None) is not None:
+            yield
+            return
+
+        self._local.scope = name
+        try:
+            yield
+        finally:
+            self._local.scope = None
+
+    def round_trip(self, method: str, func):
+        # Wraps a backend method, counting it per method and per helper scope it was made from
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            scope = getattr(self._local, "scope", None) or "other"
+            self.count(f"round_trips.{scope}")
+            with self._timer(f"backend.{method}"):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def add_source(self, name: str, stats):
+        self.sources[name] = stats
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.started = time.time()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = {name: histogram.to_dict() for name, histogram in self.histograms.items()}
+
+        sources = {}
+        for name, stats in self.sources.items():
+            try:
+                sources[name] = stats()
+            except Exception as e:
+                sources[name] = {"error": str(e)}
+
+        return {
+            "enabled": self.enabled,
+            "since": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "duration_s": round(time.time() - self.started, 1),
+            "counters": dict(sorted(counters.items())),
+            "histograms": dict(sorted(histograms.items())),
+            "sources": sources,
+        }
+
+    def dump(self, path: str) -> str:
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2, default=str)
+
+        log.info(f"Wrote instrumentation data to {path}")
+        return path
+
+    def summary(self) -> str:
+        # Short human readable view for the settings page
+        snapshot = self.snapshot()
+        lines = [f"Collecting for {snapshot['duration_s']} s" if self.enabled else "Collection is turned off"]
+
+        for name, histogram in snapshot["histograms"].items():
+            lines.append(f"{name}: {histogram['count']}x, p50 {histogram['p50_ms']} ms, p99 {histogram['p99_ms']} ms, max {histogram['max_ms']} ms")
+        for name, value in snapshot["counters"].items():
+            lines.append(f"{name}: {value}")
+        for name, stats in snapshot["sources"].items():
+            lines.append(f"{name}: " + ", ".join(f"{key} {value}" for key, value in stats.items()))
+
+        return "\n".join(lines)
+
+    @contextmanager
+    def _timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+
+class InstrumentedAction:
+    # Mixin for ActionCore subclasses, times on_update and on_tick per action type. Nested super() calls are only
+    # counted once, at the outermost class
+
+    TIMED_METHODS = ("on_update", "on_tick")
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        for method in cls.TIMED_METHODS:
+            func = cls.__dict__.get(method)
+            if func is not None and not getattr(func, "_instrumented", False):
+                setattr(cls, method, _time_action_method(method, func))
+
+
+def _time_action_method(method: str, func):
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not instrumentation.enabled or getattr(self, "_instrumented_depth", 0):
+            return func(self, *args, **kwargs)
+
+        self._instrumented_depth = 1
+        try:
+            with instrumentation.timer(f"action.{method}.{type(self).__name__}"):
+                return func(self, *args, **kwargs)
+        finally:
+            self._instrumented_depth = 0
+
+    wrapper._instrumented = True
+    return wrapper
+
+
+instrumentation = Instrumentation()
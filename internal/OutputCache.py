@@ -0,0 +1,80 @@
+_MISSING = object()
+
+# Totals over every action, per action counts live on the action itself
+output_counters = {
+    "forwarded": 0,
+    "suppressed": 0,
+}
+
+
+class OutputCache:
+    # Mixin for ActionCore subclasses that only forwards labels, media and background colours that changed.
+    # Has to come before ActionCore in the bases. Call clear_output_cache whenever the key is drawn from scratch
+
+    def clear_output_cache(self):
+        self._output_cache = {}
+
+    def set_top_label(self, *args, **kwargs):
+        if self._output_unchanged("top-label", args, kwargs):
+            return
+        super().set_top_label(*args, **kwargs)
+
+    def set_center_label(self, *args, **kwargs):
+        if self._output_unchanged("center-label", args, kwargs):
+            return
+        super().set_center_label(*args, **kwargs)
+
+    def set_bottom_label(self, *args, **kwargs):
+        if self._output_unchanged("bottom-label", args, kwargs):
+            return
+        super().set_bottom_label(*args, **kwargs)
+
+    def set_media(self, *args, **kwargs):
+        if self._output_unchanged("media", args, kwargs):
+            return
+        super().set_media(*args, **kwargs)
+
+    def set_background_color(self, *args, **kwargs):
+        if self._output_unchanged("background-color", args, kwargs):
+            return
+        super().set_background_color(*args, **kwargs)
+
+    def _output_unchanged(self, output: str, args: tuple, kwargs: dict) -> bool:
+        cache = getattr(self, "_output_cache", None)
+        if cache is None:
+            cache = self._output_cache = {}
+
+        value = (self._freeze(args), self._freeze(kwargs))
+        unchanged = cache.get(output, _MISSING) == value
+
+        if unchanged:
+            self.suppressed_writes = getattr(self, "suppressed_writes", 0) + 1
+            output_counters["suppressed"] += 1
+        else:
+            cache[output] = value
+            output_counters["forwarded"] += 1
+        return unchanged
+
+    def _freeze(self, value):
+        # Images are compared by identity, rendered frames and icons are reused objects
+        if isinstance(value, (str, int, float, bool, type(None))):
+            return value
+        if isinstance(value, (list, tuple)):
+            return tuple(self._freeze(item) for item in value)
+        if isinstance(value, dict):
+            return tuple(sorted((key, self._freeze(item)) for key, item in value.items()))
+        return _Identity(value)
+
+
+class _Identity:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        # Holding the object keeps its id from being reused while it is cached
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, _Identity) and other.value is self.value
+
+    def __hash__(self):
+        return id(self.value)
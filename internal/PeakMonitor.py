@@ -0,0 +1,166 @@
+import threading
+import time
+from collections import deque
+
+import pulsectl
+from loguru import logger as log
+
+from .DeviceStore import device_store, facility_name
+from .AudioBackend import audio_backend
+
+
+class PeakCapture:
+    def __init__(self, facility: str, pulse_name: str, rate: float):
+        self.facility = facility
+        self.pulse_name = pulse_name
+        self.rate = rate
+
+        # Levels drop by this factor per second once the signal falls
+        self.release = 0.05
+
+        # callback -> frames per second it wants, replaced rather than mutated so the capture thread reads a snapshot
+        self.subscribers: dict = {}
+        self.samples: deque = deque(maxlen=64)
+        self.level: float = 0.0
+
+        self._running = False
+        self._thread: threading.Thread = None
+        self._last_publish = time.monotonic()
+
+    def add_subscriber(self, callback, frame_rate: float):
+        self.subscribers = {**self.subscribers, callback: frame_rate}
+
+    def remove_subscriber(self, callback):
+        if callback in self.subscribers:
+            self.subscribers = {key: value for key, value in self.subscribers.items() if key != callback}
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"peak-{self.pulse_name}")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    def get_frame_rate(self) -> float:
+        # Publish as often as the fastest subscriber wants to redraw
+        return max(self.subscribers.values(), default=1)
+
+    def _get_source_name(self) -> str | None:
+        device = device_store.get(self.facility, self.pulse_name)
+        if device is None:
+            return None
+
+        # Sinks are measured on their monitor source
+        if self.facility == "sink":
+            return device.monitor_source_name
+        return device.name
+
+    def _run(self):
+        sampler = None
+        source = None
+
+        while self._running:
+            try:
+                if sampler is None:
+                    sampler = audio_backend.open_peak_sampler(f"audio-control-peak-{self.pulse_name}", self.rate)
+                    source = None
+
+                # The sampler is only pointed elsewhere when the device moves to another source
+                current = self._get_source_name()
+                if current != source:
+                    sampler.disconnect()
+                    source = current
+                    if source is not None:
+                        sampler.connect(source, self.samples.append)
+
+                if source is None:
+                    time.sleep(1)
+                    continue
+
+                # Peaks arrive while the connection runs, each frame publishes the ones since the last
+                sampler.run(1 / self.get_frame_rate())
+                self._publish()
+            except pulsectl.PulseDisconnected:
+                sampler = None
+                time.sleep(1)
+            except pulsectl.PulseError as e:
+                log.error(f"Error while sampling peaks of {self.pulse_name}: {e}")
+                source = None
+                time.sleep(1)
+            except Exception as e:
+                # Keep the meter alive, a fresh sampler is opened on the next pass
+                log.error(f"Unexpected error while sampling peaks of {self.pulse_name}: {e}")
+                self._close_sampler(sampler)
+                sampler = None
+                time.sleep(1)
+
+        self._close_sampler(sampler)
+
+    def _close_sampler(self, sampler):
+        if sampler is None:
+            return
+        try:
+            sampler.close()
+        except Exception as e:
+            log.error(f"Error while closing peak sampler of {self.pulse_name}: {e}")
+
+    def _publish(self):
+        now = time.monotonic()
+        elapsed = now - self._last_publish
+        self._last_publish = now
+
+        # Downsample the window to its peak and let the meter fall off smoothly, a silent window only decays
+        peak = min(max(self.samples, default=0.0), 1.0)
+        self.samples.clear()
+
+        self.level = max(peak, self.level * self.release ** elapsed)
+
+        for callback in self.subscribers:
+            try:
+                callback(self.level)
+            except Exception as e:
+                log.error(f"Error while publishing peak level to {callback}: {e}")
+
+
+class PeakMonitor:
+    def __init__(self, rate: float = 25):
+        self.rate = rate
+
+        self._captures: dict[tuple[str, str], PeakCapture] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, filter, pulse_name: str, callback, frame_rate: float = 15):
+        # Every subscriber of a device shares one capture
+        key = (facility_name(filter), pulse_name)
+
+        with self._lock:
+            capture = self._captures.get(key)
+            if capture is not None:
+                capture.add_subscriber(callback, frame_rate)
+                return
+
+            # The first frame already runs at the subscriber's rate
+            capture = self._captures[key] = PeakCapture(key[0], pulse_name, self.rate)
+            capture.add_subscriber(callback, frame_rate)
+            capture.start()
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            for key, capture in list(self._captures.items()):
+                capture.remove_subscriber(callback)
+
+                if not capture.subscribers:
+                    capture.stop()
+                    del self._captures[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "captures": len(self._captures),
+                "subscribers": sum(len(capture.subscribers) for capture in self._captures.values()),
+            }
+
+
+peak_monitor = PeakMonitor()
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+
+from loguru import logger as log
+
+try:
+    import pulsectl_asyncio
+except ImportError:
+    pulsectl_asyncio = None
+
+
+class PulseAsyncBackend:
+    def __init__(self, client_name: str):
+        self.client_name = client_name
+        self.enabled: bool = True
+        # Creates clients, replaceable with a stand-in that behaves like pulsectl_asyncio.PulseAsync
+        self.client_factory = None if pulsectl_asyncio is None else pulsectl_asyncio.PulseAsync
+
+        self.loop: asyncio.AbstractEventLoop = None
+        self.thread: threading.Thread = None
+        self.pulse = None
+
+        self._start_lock = threading.Lock()
+        self._connect_lock: asyncio.Lock = None
+
+        # Counters
+        self.connections_opened: int = 0
+        self.commands: int = 0
+
+    def is_available(self) -> bool:
+        return self.enabled and self.client_factory is not None
+
+    def start(self):
+        with self._start_lock:
+            if self.loop is not None:
+                return
+
+            self.loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(target=self._run_loop, name=f"{self.client_name}-loop")
+            self.thread.daemon = True
+            self.thread.start()
+
+    def in_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def submit(self, coroutine):
+        # Schedules a coroutine on the backend loop from any thread and returns a concurrent.futures.Future
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    async def call(self, method: str, *args, **kwargs):
+        # Awaitable from any loop, the command always runs on the shared backend connection
+        if self.in_loop():
+            return await self._call(method, *args, **kwargs)
+        return await asyncio.wrap_future(self.submit(self._call(method, *args, **kwargs)))
+
+    def call_blocking(self, method: str, *args, timeout: float = None, **kwargs):
+        if self.in_loop():
+            raise RuntimeError("call_blocking can not be used from inside the backend loop")
+        return self.submit(self._call(method, *args, **kwargs)).result(timeout)
+
+    def subscribe(self, callback, *masks, on_connected=None):
+        # Awaits callback(event) on the backend loop for every event matching the masks, and on_connected() once the
+        # subscription is set up
+        return self.submit(self._subscribe(callback, *masks, on_connected=on_connected))
+
+    def close(self):
+        # The next command opens a new connection
+        if self.pulse is not None:
+            self.pulse.close()
+            self.pulse = None
+
+    def stats(self) -> dict:
+        return {
+            "connections_opened": self.connections_opened,
+            "commands": self.commands,
+        }
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _get_pulse(self):
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+
+        async with self._connect_lock:
+            if self.pulse is None or not self.pulse.connected:
+                if self.pulse is not None:
+                    self.pulse.close()
+
+                self.pulse = self.client_factory(self.client_name)
+                await self.pulse.connect()
+                self.connections_opened += 1
+                log.debug(f"Opened async pulse connection for {self.client_name}")
+
+        return self.pulse
+
+    async def _call(self, method: str, *args, **kwargs):
+        return await self._run(lambda pulse: getattr(pulse, method)(*args, **kwargs))
+
+    async def _run(self, function):
+        pulse = await self._get_pulse()
+        self.commands += 1
+        return await function(pulse)
+
+    async def _subscribe(self, callback, *masks, on_connected=None):
+        pulse = await self._get_pulse()
+
+        if on_connected is not None:
+            await on_connected()
+
+        async for event in pulse.subscribe_events(*masks):
+            await callback(event)
+
+
+pulse_async_backend = PulseAsyncBackend("audio-control-async")
@@ -0,0 +1,167 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import pulsectl
+from loguru import logger as log
+
+
+class PulseConnectionManager:
+    def __init__(self, client_name: str, pool_size: int = 2, health_check_interval: float = 30):
+        self.client_name = client_name
+        self.pool_size = pool_size
+        self.health_check_interval = health_check_interval
+
+        # Creates clients, replaceable with a stand-in that behaves like pulsectl.Pulse
+        self.client_factory = pulsectl.Pulse
+
+        self._idle: list[pulsectl.Pulse] = []
+        self._in_use: int = 0
+        self._last_used: dict[int, float] = {}
+        self._condition = threading.Condition()
+        self._local = threading.local()
+
+        # Counters
+        self.connections_opened: int = 0
+        self.connections_closed: int = 0
+        self.reconnects: int = 0
+        self.checkouts: int = 0
+
+    @contextmanager
+    def connection(self):
+        # Nested use on the same thread reuses the client that is already checked out
+        current = getattr(self._local, "pulse", None)
+        if current is not None:
+            self._local.depth += 1
+            try:
+                yield current
+            finally:
+                self._local.depth -= 1
+            return
+
+        pulse = self._acquire()
+        self._local.pulse = pulse
+        self._local.depth = 1
+        healthy = True
+        try:
+            yield pulse
+        except pulsectl.PulseDisconnected:
+            healthy = False
+            raise
+        finally:
+            self._local.pulse = None
+            self._local.depth = 0
+            self._release(pulse, healthy)
+
+    def call(self, func, *args, **kwargs):
+        # Runs func(pulse, *args, **kwargs) on a pooled client, retrying once on a fresh client if the connection dropped
+        try:
+            with self.connection() as pulse:
+                return func(pulse, *args, **kwargs)
+        except pulsectl.PulseDisconnected:
+            if getattr(self._local, "pulse", None) is not None:
+                raise
+            log.warning(f"Pulse connection of {self.client_name} dropped, reconnecting")
+
+        with self.connection() as pulse:
+            return func(pulse, *args, **kwargs)
+
+    def open_dedicated(self, client_name: str) -> pulsectl.Pulse:
+        # For long blocking work like peak sampling that must not hold a pooled client. The caller closes it
+        pulse = self.client_factory(client_name)
+
+        with self._condition:
+            self.connections_opened += 1
+
+        log.debug(f"Opened dedicated pulse connection {client_name}")
+        return pulse
+
+    def close(self):
+        with self._condition:
+            idle, self._idle = self._idle, []
+
+        for pulse in idle:
+            self._close(pulse)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "connections_opened": self.connections_opened,
+                "connections_closed": self.connections_closed,
+                "reconnects": self.reconnects,
+                "checkouts": self.checkouts,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+            }
+
+    def _acquire(self) -> pulsectl.Pulse:
+        with self._condition:
+            while not self._idle and self._in_use >= self.pool_size:
+                self._condition.wait()
+
+            self._in_use += 1
+            self.checkouts += 1
+            pulse = self._idle.pop() if self._idle else None
+
+        try:
+            if pulse is None:
+                pulse = self._open()
+            elif not self._is_healthy(pulse):
+                self._close(pulse)
+                with self._condition:
+                    self.reconnects += 1
+                pulse = self._open()
+        except Exception:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+
+        return pulse
+
+    def _release(self, pulse: pulsectl.Pulse, healthy: bool):
+        with self._condition:
+            self._in_use -= 1
+            if healthy:
+                self._last_used[id(pulse)] = time.monotonic()
+                self._idle.append(pulse)
+            self._condition.notify()
+
+        if not healthy:
+            self._close(pulse)
+
+    def _open(self) -> pulsectl.Pulse:
+        pulse = self.client_factory(self.client_name)
+
+        with self._condition:
+            self.connections_opened += 1
+            self._last_used[id(pulse)] = time.monotonic()
+
+        log.debug(f"Opened pulse connection for {self.client_name} ({self.connections_opened} total)")
+        return pulse
+
+    def _close(self, pulse: pulsectl.Pulse):
+        with self._condition:
+            self.connections_closed += 1
+            self._last_used.pop(id(pulse), None)
+
+        try:
+            pulse.close()
+        except Exception as e:
+            log.error(f"Error while closing pulse connection: {e}")
+
+    def _is_healthy(self, pulse: pulsectl.Pulse) -> bool:
+        if not pulse.connected:
+            return False
+
+        if time.monotonic() - self._last_used.get(id(pulse), 0) < self.health_check_interval:
+            return True
+
+        try:
+            pulse.server_info()
+            return True
+        except (pulsectl.PulseError, pulsectl.PulseDisconnected):
+            return False
+
+
+connection_manager = PulseConnectionManager("audio-control")
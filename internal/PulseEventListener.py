@@ -1,28 +1,405 @@
+import asyncio
+import inspect
 import threading
+import time
 
 import pulsectl
+from loguru import logger as log
 from src.backend.PluginManager.EventHolder import EventHolder
 
+from .AudioBackend import audio_backend
+from .DeviceCatalog import device_catalog
+from .DeviceStore import device_store, facility_name
+from .Instrumentation import instrumentation
+from .StreamIndex import stream_index
+
+
+def coalesce_events(events: list) -> list:
+    # Keeps the latest event per (facility, index) at the position of the first one. Remove events are always kept
+    # and drop anything still pending for the same device before them
+    merged: list = []
+    positions: dict[tuple[str, int], int] = {}
+
+    for event in events:
+        key = (facility_name(event.facility), event.index)
+
+        if event.t == pulsectl.PulseEventTypeEnum.remove:
+            position = positions.pop(key, None)
+            if position is not None:
+                merged[position] = None
+            merged.append(event)
+        elif key in positions:
+            merged[positions[key]] = event
+        else:
+            positions[key] = len(merged)
+            merged.append(event)
+
+    return [event for event in merged if event is not None]
+
+
+def callback_metric(callback) -> str:
+    # Callbacks are grouped by the action type they belong to
+    owner = getattr(callback, "__self__", None)
+    name = type(owner).__name__ if owner is not None else getattr(callback, "__qualname__", "callback")
+    return f"callback.{name}.{getattr(callback, '__name__', 'call')}"
+
+
+class RefreshEvent:
+    # Sent once per routed device after a reconnect, in place of every event missed while the server was gone
+    def __init__(self, facility: str, index: int):
+        self.facility = facility
+        self.index = index
+        self.t = pulsectl.PulseEventTypeEnum.change
+
 
 class PulseEvent(EventHolder):
-    def __init__(self, plugin_base: "PluginBase", event_id: str, *masks):
+    def __init__(self, plugin_base: "PluginBase", event_id: str, *masks, coalesce_window: float = 1 / 30):
         super().__init__(plugin_base=plugin_base, event_id=event_id)
         self.masks = masks
+        # Set on start, only backends talking to a real server have one
+        self.async_backend = None
+        # Coroutine callbacks run here for as long as the listener lives. The backend loop when there is one
+        self.callback_loop: asyncio.AbstractEventLoop = None
+
+        # Events arriving within this many seconds of the first one are merged before delivery
+        self.coalesce_window = coalesce_window
+        self.pending_events: list = []
+        self.flush_scheduled = False
+        self.flush_lock: asyncio.Lock = None
+
+        self.events_received: int = 0
+        self.events_delivered: int = 0
+
+        # Reconnecting, the delay doubles with every failed attempt
+        self.reconnect_delay: float = 0.5
+        self.max_reconnect_delay: float = 30
+        self.reconnect_attempts: int = 0
+        self.connected = False
+        self.disconnected_at: float = None
+        self.last_error: str = None
+
+        self.reconnects: int = 0
+        self.downtime: float = 0.0
+
+        # (facility, index) -> callbacks interested in that device
+        self.routes: dict[tuple[str, int], list] = {}
+        self.callback_routes: dict = {}
+        self.routes_lock = threading.Lock()
+
+        self.default_listeners: list = []
+
+        self.pulse_sink_thread: threading.Thread = None
+        self.subscription = None
+
+        # The server is only connected to once the first listener subscribes
+        self.started = False
+        self.start_lock = threading.Lock()
+
+    def start(self):
+        with self.start_lock:
+            if self.started:
+                return
+            self.started = True
+
+        self.async_backend = audio_backend.backend.get_async()
+        if self.async_backend is not None:
+            # Events, commands and callbacks share one connection and run on the backend loop
+            self.async_backend.start()
+            self.callback_loop = self.async_backend.loop
+            self._subscribe_async()
+        else:
+            self.callback_loop = asyncio.new_event_loop()
+            callback_thread = threading.Thread(target=self.callback_loop.run_forever, name=f"{self.event_id}-callbacks")
+            callback_thread.daemon = True
+            callback_thread.start()
+
+            self.pulse_sink_thread = threading.Thread(target=self._start_loop)
+            self.pulse_sink_thread.daemon = True
+            self.pulse_sink_thread.start()
 
-        self.pulse_sink_thread = threading.Thread(target=self._start_loop)
-        self.pulse_sink_thread.daemon = True
-        self.pulse_sink_thread.start()
+    def add_listener(self, *args, **kwargs):
+        # Listeners connected through connect_to_event
+        super().add_listener(*args, **kwargs)
+        self.start()
+
+    def set_routes(self, callback, *devices: tuple):
+        # Replaces every route of the callback with the given (facility, index) pairs
+        self.start()
+        keys = {(facility_name(facility), index) for facility, index in devices if index is not None}
+
+        with self.routes_lock:
+            self._remove_routes(callback)
+
+            for key in keys:
+                self.routes.setdefault(key, []).append(callback)
+
+            if keys:
+                self.callback_routes[callback] = keys
+
+    def remove_routes(self, callback):
+        with self.routes_lock:
+            self._remove_routes(callback)
+
+    def _remove_routes(self, callback):
+        for key in self.callback_routes.pop(callback, ()):
+            callbacks = self.routes.get(key, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks:
+                self.routes.pop(key, None)
+
+    def add_default_listener(self, callback):
+        self.start()
+        if callback not in self.default_listeners:
+            self.default_listeners.append(callback)
+
+    def remove_default_listener(self, callback):
+        if callback in self.default_listeners:
+            self.default_listeners.remove(callback)
+
+    def stats(self) -> dict:
+        return {
+            "events_received": self.events_received,
+            "events_delivered": self.events_delivered,
+            "coalesce_window": self.coalesce_window,
+            "started": self.started,
+            "connected": self.connected,
+            "reconnects": self.reconnects,
+            "downtime_s": round(self.downtime + self._current_downtime(), 3),
+            "last_error": self.last_error,
+        }
 
     def _start_loop(self):
-        self._loop()
+        # Runs for the lifetime of the plugin, a dropped connection only ends one _loop
+        while True:
+            try:
+                self._loop()
+            except Exception as e:
+                self._on_disconnected(e)
+
+            time.sleep(self._next_reconnect_delay())
 
     def _loop(self):
-        with pulsectl.Pulse(f"{self.event_id}::pulse-sink-event-loop") as pulse:
+        with audio_backend.subscribe(f"{self.event_id}::pulse-sink-event-loop", *self.masks) as subscription:
+            self._on_connected()
 
-            pulse.event_mask_set(*self.masks)
+            while True:
+                events = subscription.wait()
 
-            pulsectl.Pulse()
-            pulse.event_callback_set(lambda event: self.trigger_event(event))
+                if self.coalesce_window > 0:
+                    events += subscription.collect(self.coalesce_window)
 
-            while True:
-                pulse.event_listen()
\ No newline at end of file
+                self.events_received += len(events)
+                self.pending_events.extend(events)
+
+                for event in self._take_pending_events():
+                    with instrumentation.timer("events.handle"):
+                        self._handle_event(event)
+
+    def _on_connected(self):
+        self.connected = True
+        self.reconnect_attempts = 0
+
+        if self.disconnected_at is None:
+            return
+
+        downtime = self._current_downtime()
+        self.disconnected_at = None
+        self.reconnects += 1
+        self.downtime += downtime
+
+        instrumentation.count("events.reconnects")
+        instrumentation.observe("events.downtime", downtime)
+        log.info(f"Pulse event listener reconnected after {downtime:.1f} s")
+
+        self._resync()
+
+    def _on_disconnected(self, error: Exception):
+        self.connected = False
+        self.last_error = f"{type(error).__name__}: {error}"
+
+        if self.disconnected_at is None:
+            self.disconnected_at = time.monotonic()
+            log.warning(f"Pulse event listener lost its connection, reconnecting: {self.last_error}")
+
+        # Whatever was collected belongs to the old connection, the resync replaces it
+        self.pending_events = []
+
+    def _next_reconnect_delay(self) -> float:
+        delay = min(self.reconnect_delay * 2 ** self.reconnect_attempts, self.max_reconnect_delay)
+        self.reconnect_attempts += 1
+        return delay
+
+    def _current_downtime(self) -> float:
+        if self.disconnected_at is None:
+            return 0.0
+        return time.monotonic() - self.disconnected_at
+
+    def _resync(self):
+        # Indices are handed out anew when the server restarts, so everything cached is reloaded
+        try:
+            changed = device_store.resync()
+            stream_index.resync()
+            device_catalog.rebuild()
+        except Exception as e:
+            log.error(f"Error while resyncing after reconnect: {e}")
+            return
+
+        self._refresh(changed)
+
+    def _refresh(self, changed_defaults: list[str]):
+        # Catalog listeners already moved the routes to the new indices. Every routed device gets one change
+        with self.routes_lock:
+            targets = [(key, list(callbacks)) for key, callbacks in self.routes.items()]
+
+        for (facility, index), callbacks in targets:
+            for callback in callbacks:
+                self._notify(callback, RefreshEvent(facility, index))
+
+        for facility in changed_defaults:
+            name = device_store.get_default_name(facility)
+
+            for callback in list(self.default_listeners):
+                self._notify(callback, facility, name)
+
+    def _take_pending_events(self) -> list:
+        events, self.pending_events = self.pending_events, []
+        events = coalesce_events(events)
+
+        self.events_delivered += len(events)
+        return events
+
+    def _handle_event(self, event):
+        if facility_name(event.facility) == "server":
+            self._handle_server_event()
+            return
+
+        device_store.apply_event(event)
+        device_catalog.apply_event(event)
+        stream_index.apply_event(event)
+
+        for callback in self._routed_callbacks(event):
+            self._notify(callback, event)
+
+        # Listeners connected through connect_to_event still receive everything
+        self.trigger_event(event)
+
+    def _handle_server_event(self):
+        try:
+            changed = device_store.refresh_defaults()
+        except Exception as e:
+            log.error(f"Error while refreshing default devices: {e}")
+            return
+
+        for facility in changed:
+            name = device_store.get_default_name(facility)
+
+            for callback in list(self.default_listeners):
+                self._notify(callback, facility, name)
+
+    async def _on_event_async(self, event):
+        self.events_received += 1
+        self.pending_events.append(event)
+
+        # Only collect here, the subscription has to keep receiving while the window is open
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            asyncio.get_running_loop().call_later(max(self.coalesce_window, 0), self._start_flush_async)
+
+    def _start_flush_async(self):
+        self.flush_scheduled = False
+        asyncio.create_task(self._flush_events_async(self._take_pending_events()))
+
+    async def _flush_events_async(self, events: list):
+        if self.flush_lock is None:
+            self.flush_lock = asyncio.Lock()
+
+        async with self.flush_lock:
+            for event in events:
+                with instrumentation.timer("events.handle"):
+                    await self._handle_event_async(event)
+
+    async def _handle_event_async(self, event):
+        if facility_name(event.facility) == "server":
+            await self._handle_server_event_async()
+            return
+
+        loop = asyncio.get_running_loop()
+
+        await device_store.apply_event_async(event, self.async_backend)
+        # Catalog listeners are actions, which may block
+        await loop.run_in_executor(None, device_catalog.apply_event, event)
+        await stream_index.apply_event_async(event, self.async_backend)
+
+        for callback in self._routed_callbacks(event):
+            await self._notify_async(callback, event)
+
+        # EventHolder may start its own loop, which is not allowed inside the running one
+        await loop.run_in_executor(None, self.trigger_event, event)
+
+    async def _handle_server_event_async(self):
+        try:
+            changed = device_store.set_defaults(await self.async_backend.call("server_info"))
+        except Exception as e:
+            log.error(f"Error while refreshing default devices: {e}")
+            return
+
+        for facility in changed:
+            name = device_store.get_default_name(facility)
+
+            for callback in list(self.default_listeners):
+                await self._notify_async(callback, facility, name)
+
+    def _subscribe_async(self):
+        self.subscription = self.async_backend.subscribe(self._on_event_async, *self.masks, on_connected=self._on_connected_async)
+        self.subscription.add_done_callback(self._on_subscription_done)
+
+    async def _on_connected_async(self):
+        # The resync uses blocking calls, which must not run on the backend loop
+        await asyncio.get_running_loop().run_in_executor(None, self._on_connected)
+
+    def _on_subscription_done(self, future):
+        if future.cancelled():
+            return
+
+        error = future.exception() or pulsectl.PulseDisconnected("subscription ended")
+        self._on_disconnected(error)
+
+        timer = threading.Timer(self._next_reconnect_delay(), self._subscribe_async)
+        timer.daemon = True
+        timer.start()
+
+    def _routed_callbacks(self, event) -> list:
+        key = (facility_name(event.facility), event.index)
+
+        with self.routes_lock:
+            return list(self.routes.get(key, ()))
+
+    def _notify(self, callback, *args):
+        # Plain callbacks run on the calling thread, coroutines are handed to the callback loop
+        instrumentation.count("events.dispatched")
+        try:
+            if inspect.iscoroutinefunction(callback):
+                asyncio.run_coroutine_threadsafe(self._await_callback(callback, *args), self.callback_loop)
+                return
+
+            with instrumentation.timer(callback_metric, callback):
+                callback(self.event_id, *args)
+        except Exception as e:
+            log.error(f"Error while dispatching pulse event to {callback}: {e}")
+
+    async def _notify_async(self, callback, *args):
+        # Coroutines are awaited on the backend loop itself, plain callbacks may block and go to the executor
+        if not inspect.iscoroutinefunction(callback):
+            await asyncio.get_running_loop().run_in_executor(None, self._notify, callback, *args)
+            return
+
+        instrumentation.count("events.dispatched")
+        await self._await_callback(callback, *args)
+
+    async def _await_callback(self, callback, *args):
+        try:
+            with instrumentation.timer(callback_metric, callback):
+                await callback(self.event_id, *args)
+        except Exception as e:
+            log.error(f"Error while dispatching pulse event to {callback}: {e}")
@@ -1,9 +1,11 @@
 import enum
 
-import pulsectl
 from loguru import logger as log
 
 from GtkHelper.ComboRow import SimpleComboRowItem
+from .AudioBackend import audio_backend
+from .DeviceStore import device_store, facility_name
+from .Instrumentation import instrumentation
 
 
 class DeviceFilter(enum.Enum):
@@ -13,71 +15,64 @@ class DeviceFilter(enum.Enum):
     def get_value(self):
         return self.value.get_value()
 
+PROPLIST_FILTERS: tuple[str, ...] = (
+    "alsa.card_name",
+    "alsa.long_card_name",
+    "node.name",
+    "node.nick",
+    "device.name",
+    "device.nick",
+    "device.description",
+    "device.serial"
+)
+
+NAME_WEIGHTS: dict[str, int] = {
+    '.': -50,
+    '_': -10,
+    ':': -25,
+    ';': -100,
+    '-': -5
+}
+
+LENGTH_WEIGHT: int = -5
+
+
+def score_name(name: str) -> int:
+    return sum(NAME_WEIGHTS.get(char, 0) + LENGTH_WEIGHT for char in name)
+
 def filter_proplist(proplist) -> str | None:
-    filters: list[str] = [
-        "alsa.card_name",
-        "alsa.long_card_name",
-        "node.name",
-        "node.nick",
-        "device.name",
-        "device.nick",
-        "device.description",
-        "device.serial"
-    ]
-
-    weights: list[(str, int)] = [
-        ('.', -50),
-        ('_', -10),
-        (':', -25),
-        (';', -100),
-        ('-', -5)
-    ]
-
-    length_weight: int = -5
-
-    minimal_weights: list[(int, str)] = []
-
-    for filter in filters:
+    best_name: str | None = None
+    best_weight: int | None = None
+
+    for filter in PROPLIST_FILTERS:
         out: str = proplist.get(filter)
 
         if out is None or len(out) < 3:
             continue
-        current_weight: int = 0
-
-        current_weight += sum(out.count(weight[0]) * weight[1] for weight in weights)
-        current_weight += (len(out) * length_weight)
 
-        minimal_weights.append((current_weight, out))
+        # Ties keep the earlier key
+        weight = score_name(out)
+        if best_weight is None or weight > best_weight:
+            best_weight = weight
+            best_name = out
 
-    minimal_weights.sort(key=lambda x: x[0], reverse=True)
-
-    if len(minimal_weights) > 0:
-        return minimal_weights[0][1] or None
-    return None
+    return best_name or None
 
 
+@instrumentation.timed("helpers.get_device", scope=True)
 def get_device(filter: DeviceFilter, pulse_device_name):
-    with pulsectl.Pulse("device-getter") as pulse:
-        try:
-            device = None
-            if filter == DeviceFilter.SINK.get_value():
-                device = pulse.get_sink_by_name(pulse_device_name)
-            elif filter == DeviceFilter.SOURCE.get_value():
-                device = pulse.get_source_by_name(pulse_device_name)
-            return device
-        except Exception as e:
-            log.error(f"Error while getting device: {pulse_device_name} with filter: {filter}. Error: {e}")
+    try:
+        return device_store.get(facility_name(filter), pulse_device_name)
+    except Exception as e:
+        log.error(f"Error while getting device: {pulse_device_name} with filter: {filter}. Error: {e}")
     return None
 
 
+@instrumentation.timed("helpers.get_device_list", scope=True)
 def get_device_list(filter: DeviceFilter):
-    with pulsectl.Pulse("device-list-getter") as pulse:
-        switch = {
-            DeviceFilter.SINK.get_value(): pulse.sink_list(),
-            DeviceFilter.SOURCE.get_value(): pulse.source_list(),
-        }
-        return switch.get(filter.get_value(), {})
+    return device_store.get_all(facility_name(filter))
 
+@instrumentation.timed("helpers.get_volumes_from_device", scope=True)
 def get_volumes_from_device(device_filter: DeviceFilter, pulse_device_name: str):
     try:
         device = get_device(device_filter, pulse_device_name)
@@ -87,46 +82,108 @@ def get_volumes_from_device(device_filter: DeviceFilter, pulse_device_name: str)
         log.error(f"Error while getting volumes from device: {pulse_device_name} with filter: {device_filter}. Error: {e}")
         return []
 
+@instrumentation.timed("helpers.change_volume", scope=True)
 def change_volume(device, adjust):
-    with pulsectl.Pulse("change-volume") as pulse:
-        try:
-            pulse.volume_change_all_chans(device, adjust * 0.01)
-        except Exception as e:
-            log.error(f"Error while changing volume on device: {device.name}, adjustment is {adjust}. Error: {e}")
-
-def set_default_device(device_filter: DeviceFilter, pulse_device_name: str):
+    try:
+        audio_backend.set_volume(device, [max(value + adjust * 0.01, 0) for value in device.volume.values])
+    except Exception as e:
+        log.error(f"Error while changing volume on device: {device.name}, adjustment is {adjust}. Error: {e}")
+
+def bounded_volume_values(values: list[float], adjust: int, bounds: int) -> list[float]:
+    # Raising a channel never takes it above bounds, lowering never below 0. Channels already above bounds are kept
+    increment = adjust * 0.01
+    limit = bounds * 0.01
+
+    bounded = []
+    for value in values:
+        if increment < 0:
+            bounded.append(max(value + increment, 0))
+        elif value >= limit:
+            bounded.append(value)
+        else:
+            bounded.append(min(value + increment, limit))
+    return bounded
+
+@instrumentation.timed("helpers.adjust_volume_bounded", scope=True)
+def adjust_volume_bounded(device_filter: DeviceFilter, pulse_device_name: str, adjust: int, bounds: int) -> list[int] | None:
     try:
         device = get_device(device_filter, pulse_device_name)
+        if device is None:
+            return None
+
+        values = bounded_volume_values(device.volume.values, adjust, bounds)
+
+        if values != device.volume.values:
+            audio_backend.set_volume(device, values)
+
+        return [round(value * 100) for value in values]
+    except Exception as e:
+        log.error(f"Error while adjusting volume on device: {pulse_device_name}, adjustment is {adjust}, bounds are {bounds}. Error: {e}")
+        return None
+
+@instrumentation.timed("helpers.adjust_streams_bounded", scope=True)
+def adjust_streams_bounded(streams: list, adjust: int, bounds: int) -> list[int] | None:
+    # Adjusts every stream of an app in one batch, returns the new volumes of the first stream
+    try:
+        bounded = [(stream, bounded_volume_values(stream.volume.values, adjust, bounds)) for stream in streams]
+        updates = [(stream, values) for stream, values in bounded if values != stream.volume.values]
+
+        if updates:
+            audio_backend.set_volumes(updates)
+
+        if not bounded:
+            return []
+        return [round(value * 100) for value in bounded[0][1]]
+    except Exception as e:
+        log.error(f"Error while adjusting volume on {len(streams)} streams, adjustment is {adjust}, bounds are {bounds}. Error: {e}")
+        return None
+
+@instrumentation.timed("helpers.mute_streams", scope=True)
+def mute_streams(streams: list, state: bool) -> bool:
+    try:
+        audio_backend.mute_many(streams, state)
+        return True
+    except Exception as e:
+        log.error(f"Error while muting {len(streams)} streams, state is {state}. Error: {e}")
+        return False
 
-        with pulsectl.Pulse("device-setter") as pulse:
-            if device_filter == DeviceFilter.SINK.value:
-                pulse.sink_default_set(device)
-            elif device_filter == DeviceFilter.SOURCE.value:
-                pulse.source_default_set(device)
+@instrumentation.timed("helpers.set_default_device", scope=True)
+def set_default_device(device_filter: DeviceFilter, pulse_device_name: str) -> bool:
+    try:
+        device = get_device(device_filter, pulse_device_name)
+        audio_backend.set_default(facility_name(device_filter), device)
+        device_store.set_default_name(facility_name(device_filter), device.name)
+        return True
     except Exception as e:
         log.error(f"Error while settings default device: {e}")
+        return False
 
-def set_volume(device, volume):
-    with pulsectl.Pulse("change-volume") as pulse:
-        try:
-            pulse.volume_set_all_chans(device, volume * 0.01)
-        except Exception as e:
-            log.error(f"Error while setting volume on device: {device.name}, volume is {volume}. Error: {e}")
+@instrumentation.timed("helpers.set_volume", scope=True)
+def set_volume(device, volume) -> bool:
+    try:
+        audio_backend.set_volume(device, [volume * 0.01] * len(device.volume.values))
+        return True
+    except Exception as e:
+        log.error(f"Error while setting volume on device: {device.name}, volume is {volume}. Error: {e}")
+        return False
 
-def mute(device, state):
-    with pulsectl.Pulse("change-volume") as pulse:
-        try:
-            pulse.mute(device, state)
-        except Exception as e:
-            log.error(f"Error while muting device: {device.name}, state is {state}. Error: {e}")
+@instrumentation.timed("helpers.mute", scope=True)
+def mute(device, state) -> bool:
+    try:
+        audio_backend.mute(device, state)
+        return True
+    except Exception as e:
+        log.error(f"Error while muting device: {device.name}, state is {state}. Error: {e}")
+        return False
 
+@instrumentation.timed("helpers.get_standard_device", scope=True)
 def get_standard_device(device_filter: DeviceFilter):
-    with pulsectl.Pulse("change-volume") as pulse:
-        try:
-            if device_filter == DeviceFilter.SINK.value:
-                return get_device(device_filter, pulse.server_info().default_sink_name)
-            elif device_filter == DeviceFilter.SOURCE.value:
-                return get_device(device_filter, pulse.server_info().default_source_name)
+    try:
+        facility = facility_name(device_filter)
+        default_name = device_store.get_default_name(facility)
+
+        if default_name is None:
             return None
-        except Exception as e:
-            log.error(f"Error while getting standard device for filter: {str(device_filter)}. Error: {e}")
\ No newline at end of file
+        return device_store.get(facility, default_name)
+    except Exception as e:
+        log.error(f"Error while getting standard device for filter: {str(device_filter)}. Error: {e}")
@@ -0,0 +1,175 @@
+import pulsectl
+
+from .AudioBackend import AudioBackend, EventSubscription, PeakSampler
+from .PulseAsyncBackend import pulse_async_backend
+from .PulseConnectionManager import PulseConnectionManager, connection_manager
+
+LIST_METHODS = {
+    "sink": "sink_list",
+    "source": "source_list",
+    "sink_input": "sink_input_list",
+    "source_output": "source_output_list",
+}
+
+INFO_METHODS = {
+    "sink": "sink_info",
+    "source": "source_info",
+    "sink_input": "sink_input_info",
+    "source_output": "source_output_info",
+}
+
+BY_NAME_METHODS = {
+    "sink": "get_sink_by_name",
+    "source": "get_source_by_name",
+}
+
+DEFAULT_METHODS = {
+    "sink": "sink_default_set",
+    "source": "source_default_set",
+}
+
+
+class PulsectlSubscription(EventSubscription):
+    def __init__(self, pulse: pulsectl.Pulse, *masks):
+        self.pulse = pulse
+        self.pending: list = []
+        self.collecting = False
+
+        self.pulse.event_mask_set(*masks)
+        self.pulse.event_callback_set(self._on_event)
+
+    def wait(self) -> list:
+        if not self.pending:
+            self.pulse.event_listen()
+        return self._take()
+
+    def collect(self, duration: float) -> list:
+        self.collecting = True
+        try:
+            self.pulse.event_listen(timeout=duration)
+        finally:
+            self.collecting = False
+        return self._take()
+
+    def close(self):
+        self.pulse.close()
+
+    def _on_event(self, event):
+        # Pulse calls are not allowed inside the callback, so stop listening and hand the event out
+        self.pending.append(event)
+
+        if not self.collecting:
+            raise pulsectl.PulseLoopStop
+
+    def _take(self) -> list:
+        events, self.pending = self.pending, []
+        return events
+
+
+class PulsectlPeakSampler(PeakSampler):
+    # Sticks to the public Pulse.get_peak_sample, which sets up a record stream per call and samples at 25 Hz. Each
+    # call covers at least MIN_WINDOW so the stream setup does not eat most of the window
+    MIN_WINDOW = 0.2
+
+    def __init__(self, pulse: pulsectl.Pulse, rate: float):
+        self.pulse = pulse
+        self.rate = rate
+        self.callback = None
+        self.source_name: str = None
+
+    def connect(self, source_name: str, callback):
+        self.source_name = source_name
+        self.callback = callback
+
+    def disconnect(self):
+        self.source_name = None
+        self.callback = None
+
+    def run(self, duration: float):
+        # Polling a dropped connection returns at once instead of raising
+        if not self.pulse.connected:
+            raise pulsectl.PulseDisconnected()
+        if self.source_name is None:
+            return
+
+        peak = self.pulse.get_peak_sample(self.source_name, max(duration, self.MIN_WINDOW))
+        if self.callback is not None:
+            self.callback(min(1.0, peak))
+
+    def close(self):
+        self.disconnect()
+        self.pulse.close()
+
+
+class PulsectlBackend(AudioBackend):
+    name = "pulsectl"
+
+    def __init__(self, connections: PulseConnectionManager = connection_manager):
+        self.connections = connections
+
+    def get_all(self, facility: str) -> list:
+        method = LIST_METHODS.get(facility)
+        if method is None:
+            return []
+        return self.connections.call(lambda pulse: getattr(pulse, method)())
+
+    def get(self, facility: str, index: int):
+        method = INFO_METHODS.get(facility)
+        if method is None:
+            return None
+        return self.connections.call(lambda pulse: getattr(pulse, method)(index))
+
+    def get_by_name(self, facility: str, name: str):
+        method = BY_NAME_METHODS.get(facility)
+        if method is None:
+            return None
+        return self.connections.call(lambda pulse: getattr(pulse, method)(name))
+
+    def server_info(self):
+        return self.connections.call(lambda pulse: pulse.server_info())
+
+    def set_volume(self, obj, values: list[float]):
+        self._write([("volume_set", obj, pulsectl.PulseVolumeInfo(values))])
+
+    def set_volumes(self, updates: list[tuple]):
+        self._write([("volume_set", obj, pulsectl.PulseVolumeInfo(values)) for obj, values in updates])
+
+    def mute(self, obj, state: bool):
+        self._write([("mute", obj, state)])
+
+    def mute_many(self, objs: list, state: bool):
+        self._write([("mute", obj, state) for obj in objs])
+
+    def set_default(self, facility: str, obj):
+        self.write_batch([], [], [(facility, obj)])
+
+    def write_batch(self, volumes: list[tuple], mutes: list[tuple], defaults: list[tuple]):
+        self._write(
+            [("volume_set", obj, pulsectl.PulseVolumeInfo(values)) for obj, values in volumes]
+            + [("mute", obj, state) for obj, state in mutes]
+            + [(DEFAULT_METHODS[facility], obj) for facility, obj in defaults if facility in DEFAULT_METHODS]
+        )
+
+    def subscribe(self, client_name: str, *masks) -> PulsectlSubscription:
+        # Listening blocks the client, so it never comes from the pool
+        return PulsectlSubscription(self.connections.open_dedicated(client_name), *masks)
+
+    def open_peak_sampler(self, client_name: str, rate: float) -> PulsectlPeakSampler:
+        return PulsectlPeakSampler(self.connections.open_dedicated(client_name), rate)
+
+    def get_async(self):
+        if pulse_async_backend.is_available():
+            return pulse_async_backend
+        return None
+
+    def stats(self) -> dict:
+        return self.connections.stats()
+
+    def _write(self, commands: list[tuple]):
+        # (method, *args) tuples sent as one batch on a pooled client. The async backend only carries events: handing a
+        # write from an action thread to its loop adds a thread hop, which the write_paths benchmark shows is slower
+        def write_all(pulse):
+            for method, *args in commands:
+                getattr(pulse, method)(*args)
+
+        self.connections.call(write_all)
@@ -0,0 +1,196 @@
+import enum
+import json
+import os
+import threading
+
+from loguru import logger as log
+
+from GtkHelper.ComboRow import SimpleComboRowItem
+from .AudioBackend import audio_backend
+from .DeviceStore import device_store
+from .DuckingEngine import ducking_engine
+from .FadeEngine import fade_engine
+from .Instrumentation import instrumentation
+from .PulseHelpers import get_device
+from .StreamIndex import STREAM_FACILITIES, get_app_name, stream_index
+
+DEVICE_FACILITIES = ("sink", "source")
+
+SCENE_VERSION = 1
+
+
+def rounded(values) -> list[float]:
+    # Volumes are kept to a tenth of a percent
+    return [round(value, 3) for value in values]
+
+
+class ScenePreset(enum.Enum):
+    GAMING = SimpleComboRowItem("gaming", "Gaming")
+    CALL = SimpleComboRowItem("call", "Call")
+    STREAM = SimpleComboRowItem("stream", "Stream")
+
+    def get_value(self):
+        return self.value.get_value()
+
+
+class VolumeScene:
+    def __init__(self, name: str, defaults: dict[str, str], entries: dict[str, dict[str, tuple[list[float], bool]]]):
+        self.name = name
+        # facility -> pulse name of the default device
+        self.defaults = defaults
+        # facility -> pulse name, or app name for streams -> (channel volumes, muted)
+        self.entries = entries
+
+    def to_dict(self) -> dict:
+        return {
+            "v": SCENE_VERSION,
+            "defaults": self.defaults,
+            "entries": {
+                facility: {key: [values, int(muted)] for key, (values, muted) in entries.items()}
+                for facility, entries in self.entries.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, name: str, data: dict) -> "VolumeScene":
+        entries = {
+            facility: {key: (values, bool(muted)) for key, (values, muted) in facility_entries.items()}
+            for facility, facility_entries in data.get("entries", {}).items()
+        }
+        return cls(name, data.get("defaults", {}), entries)
+
+
+class SceneStore:
+    # Scenes are captured from the device store and stream index, so capturing costs no round trips once they are
+    # loaded. One file per scene, read the first time the scene is used
+    def __init__(self):
+        self.directory: str = None
+
+        self._scenes: dict[str, VolumeScene] = {}
+        self._lock = threading.Lock()
+
+        # Counters
+        self.captures: int = 0
+        self.restores: int = 0
+        self.loads: int = 0
+        self.writes: int = 0
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.json")
+
+    @instrumentation.timed("scenes.capture", scope=True)
+    def capture(self, name: str) -> VolumeScene:
+        entries = {}
+
+        for facility in DEVICE_FACILITIES:
+            entries[facility] = {device.name: (rounded(device.volume.values), bool(device.mute)) for device in device_store.get_all(facility)}
+
+        for facility in STREAM_FACILITIES:
+            # Streams come and go, they are matched by app. The first stream of an app stands for all of them
+            entries[facility] = {}
+            for stream in stream_index.get_all(facility):
+                app = get_app_name(stream)
+                if app is not None and app not in entries[facility]:
+                    entries[facility][app] = (rounded(stream.volume.values), bool(stream.mute))
+
+        defaults = {facility: device_store.get_default_name(facility) for facility in DEVICE_FACILITIES}
+        scene = VolumeScene(name, {facility: pulse_name for facility, pulse_name in defaults.items() if pulse_name}, entries)
+
+        self.save(scene)
+
+        with self._lock:
+            self._scenes[name] = scene
+            self.captures += 1
+        return scene
+
+    def get(self, name: str) -> VolumeScene | None:
+        with self._lock:
+            scene = self._scenes.get(name)
+        if scene is not None:
+            return scene
+
+        try:
+            with open(self.get_path(name)) as f:
+                scene = VolumeScene.from_dict(name, json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log.error(f"Error while loading scene {name}: {e}")
+            return None
+
+        with self._lock:
+            self._scenes[name] = scene
+            self.loads += 1
+        return scene
+
+    def save(self, scene: VolumeScene):
+        os.makedirs(self.directory, exist_ok=True)
+
+        with open(self.get_path(scene.name), "w") as f:
+            json.dump(scene.to_dict(), f, separators=(",", ":"))
+
+    @instrumentation.timed("scenes.restore", scope=True)
+    def restore(self, name: str) -> bool:
+        # Everything that differs from the current state goes out in one batch
+        scene = self.get(name)
+        if scene is None:
+            return False
+
+        volumes, mutes, defaults = [], [], []
+
+        for facility, entries in scene.entries.items():
+            for key, (values, muted) in entries.items():
+                if facility in STREAM_FACILITIES:
+                    objs = stream_index.get_streams(facility, key)
+                else:
+                    device = get_device(facility, key)
+                    objs = [] if device is None else [device]
+
+                for obj in objs:
+                    target = values if len(values) == len(obj.volume.values) else rounded([sum(values) / len(values)] * len(obj.volume.values))
+
+                    # A running fade would overwrite the scene on its next step, ducking keeps a ducked stream lowered
+                    if facility in STREAM_FACILITIES:
+                        fade_engine.cancel(facility, obj.index, restore=False)
+                        if facility == "sink_input":
+                            target = rounded(ducking_engine.rebase(obj.index, target))
+                    else:
+                        fade_engine.cancel(facility, key, restore=False)
+
+                    if rounded(obj.volume.values) != target:
+                        volumes.append((obj, target))
+                    if bool(obj.mute) != muted:
+                        mutes.append((obj, muted))
+
+        for facility, pulse_name in scene.defaults.items():
+            if device_store.get_default_name(facility) == pulse_name:
+                continue
+
+            device = get_device(facility, pulse_name)
+            if device is not None:
+                defaults.append((facility, device))
+
+        try:
+            if volumes or mutes or defaults:
+                audio_backend.write_batch(volumes, mutes, defaults)
+        except Exception as e:
+            log.error(f"Error while restoring scene {name}: {e}")
+            return False
+
+        with self._lock:
+            self.restores += 1
+            self.writes += len(volumes) + len(mutes) + len(defaults)
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": len(self._scenes),
+                "captures": self.captures,
+                "restores": self.restores,
+                "loads": self.loads,
+                "writes": self.writes,
+            }
+
+
+scene_store = SceneStore()
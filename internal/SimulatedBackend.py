@@ -0,0 +1,380 @@
+import copy
+import itertools
+import threading
+import time
+from collections import Counter, deque
+
+import pulsectl
+
+from .AudioBackend import AudioBackend, EventSubscription, PeakSampler
+
+DEVICE_FACILITIES = ("sink", "source")
+STREAM_FACILITIES = ("sink_input", "source_output")
+
+
+def enum_name(value) -> str:
+    # pulsectl enum values have no __str__ of their own, their name is kept in _value
+    return str(getattr(value, "_value", value))
+
+
+class SimulatedObject:
+    # Carries the attributes the plugin reads from pulsectl's sink, source and stream objects
+    def __init__(self, facility: str, index: int, name: str, description: str, volume: list[float], proplist: dict, **attributes):
+        self.facility = facility
+        self.index = index
+        self.name = name
+        self.description = description
+        self.volume = pulsectl.PulseVolumeInfo(list(volume))
+        self.channel_count = len(volume)
+        self.mute = 0
+        self.proplist = dict(proplist)
+
+        for key, value in attributes.items():
+            setattr(self, key, value)
+
+    def __repr__(self):
+        return f"<Simulated {self.facility} #{self.index} {self.name}>"
+
+
+class SimulatedEvent:
+    def __init__(self, facility: str, index: int, t: str):
+        self.facility = getattr(pulsectl.PulseEventFacilityEnum, facility)
+        self.index = index
+        self.t = getattr(pulsectl.PulseEventTypeEnum, t)
+
+    def __repr__(self):
+        return f"<SimulatedEvent {self.t} {self.facility} #{self.index}>"
+
+
+class SimulatedServerInfo:
+    def __init__(self, default_sink_name: str, default_source_name: str):
+        self.default_sink_name = default_sink_name
+        self.default_source_name = default_source_name
+        self.server_name = "simulator"
+
+
+class SimulatedSubscription(EventSubscription):
+    def __init__(self, backend: "SimulatedBackend", client_name: str, *masks):
+        self.backend = backend
+        self.client_name = client_name
+        self.masks = {enum_name(mask) for mask in masks}
+
+        self.events: deque = deque()
+        self.closed = False
+        self.waiting = False
+        self.condition = threading.Condition()
+
+    def wait(self) -> list:
+        event = self.next_event()
+        return [event] + self._take()
+
+    def collect(self, duration: float) -> list:
+        events = []
+        deadline = time.monotonic() + duration
+
+        while True:
+            event = self.next_event(timeout=deadline - time.monotonic())
+            if event is None:
+                return events
+            events.append(event)
+
+    def next_event(self, timeout: float = None):
+        # None once the timeout ran out
+        with self.condition:
+            # Only a wait without timeout means the caller is done with everything it received
+            self.waiting = timeout is None
+            try:
+                deadline = None if timeout is None else time.monotonic() + timeout
+
+                while not self.events and not self.closed:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    self.condition.wait(remaining)
+            finally:
+                self.waiting = False
+
+            if self.closed:
+                raise pulsectl.PulseDisconnected()
+            return self.events.popleft()
+
+    def is_idle(self) -> bool:
+        with self.condition:
+            return self.waiting and not self.events
+
+    def close(self):
+        self.backend._unsubscribe(self)
+
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def push(self, event: SimulatedEvent):
+        if "all" not in self.masks and enum_name(event.facility) not in self.masks:
+            return
+
+        with self.condition:
+            self.events.append(event)
+            self.condition.notify()
+
+    def _take(self) -> list:
+        with self.condition:
+            events = list(self.events)
+            self.events.clear()
+            return events
+
+
+class SimulatedPeakSampler(PeakSampler):
+    def __init__(self, backend: "SimulatedBackend", rate: float):
+        self.backend = backend
+        self.rate = rate
+        self.callback = None
+
+    def connect(self, source_name: str, callback):
+        self.backend._round_trip("peak_connect")
+        self.callback = callback
+
+    def disconnect(self):
+        self.callback = None
+
+    def run(self, duration: float):
+        time.sleep(duration)
+
+        if self.callback is None:
+            return
+        for _ in range(max(1, round(duration * self.rate))):
+            self.callback(self.backend.peak_level)
+
+    def close(self):
+        self.disconnect()
+
+
+class SimulatedBackend(AudioBackend):
+    # Deterministic in-process sound server for profiling and load tests without a daemon. Indices are handed out in
+    # order, every call sleeps for latency seconds and every write emits a change event like pulse does
+    name = "simulator"
+
+    def __init__(self, latency: float = 0.0, peak_level: float = 0.5):
+        self.latency = latency
+        self.peak_level = peak_level
+
+        self.objects: dict[str, dict[int, SimulatedObject]] = {facility: {} for facility in DEVICE_FACILITIES + STREAM_FACILITIES}
+        self.default_sink_name: str = None
+        self.default_source_name: str = None
+
+        self.subscriptions: list[SimulatedSubscription] = []
+        self._indices = itertools.count()
+        self._lock = threading.RLock()
+
+        # Counters
+        self.round_trips: int = 0
+        self.calls: Counter = Counter()
+        # (monotonic time, method, facility, index) of every write
+        self.writes: list[tuple] = []
+        self.events_emitted: int = 0
+
+    # Scripting
+
+    def populate(self, sinks: int = 2, sources: int = 2, apps: int = 4) -> "SimulatedBackend":
+        for i in range(sinks):
+            self.add_sink(f"simulator_output.{i}", f"Simulated Output {i}", proplist={"alsa.card_name": f"Simulated Card {i}"})
+        for i in range(sources):
+            self.add_source(f"simulator_input.{i}", f"Simulated Input {i}", proplist={"alsa.card_name": f"Simulated Mic {i}"})
+        for i in range(apps):
+            self.add_stream("sink_input", f"App {i}")
+        return self
+
+    def add_sink(self, name: str, description: str = None, volume: list[float] = (0.5, 0.5), proplist: dict = None) -> SimulatedObject:
+        description = description or name
+        monitor = self.add_source(f"{name}.monitor", f"Monitor of {description}", volume)
+        sink = self._add("sink", name, description, volume, proplist, monitor_source_name=monitor.name)
+
+        if self.default_sink_name is None:
+            self.default_sink_name = name
+        return sink
+
+    def add_source(self, name: str, description: str = None, volume: list[float] = (0.5, 0.5), proplist: dict = None) -> SimulatedObject:
+        source = self._add("source", name, description or name, volume, proplist)
+
+        if self.default_source_name is None and not name.endswith(".monitor"):
+            self.default_source_name = name
+        return source
+
+    def add_stream(self, facility: str, app: str, binary: str = None, volume: list[float] = (1.0, 1.0), **attributes) -> SimulatedObject:
+        # attributes like sink, source or corked are set on the stream as given
+        proplist = {"application.name": app, "application.process.binary": binary or app.lower().replace(" ", "-")}
+        return self._add(facility, f"{app}-stream", app, volume, proplist, **attributes)
+
+    def update(self, facility: str, index: int, **attributes):
+        # Changes a stream or device behind the plugin's back, like another client would
+        with self._lock:
+            obj = self.objects[facility][index]
+            for key, value in attributes.items():
+                setattr(obj, key, value)
+        self.emit(facility, index, "change")
+
+    def remove(self, facility: str, index: int):
+        with self._lock:
+            self.objects[facility].pop(index, None)
+        self.emit(facility, index, "remove")
+
+    def restart(self):
+        # Like a daemon restart: every subscriber is disconnected and every object gets a new index
+        with self._lock:
+            subscriptions, self.subscriptions = self.subscriptions, []
+
+            for facility, objects in self.objects.items():
+                self.objects[facility] = {}
+                for obj in objects.values():
+                    obj.index = next(self._indices)
+                    self.objects[facility][obj.index] = obj
+
+        for subscription in subscriptions:
+            subscription.close()
+
+    def emit(self, facility: str, index: int, t: str = "change"):
+        event = SimulatedEvent(facility, index, t)
+
+        with self._lock:
+            self.events_emitted += 1
+            subscriptions = list(self.subscriptions)
+
+        for subscription in subscriptions:
+            subscription.push(event)
+
+    def storm(self, count: int, facilities: tuple = DEVICE_FACILITIES, t: str = "change"):
+        # Emits count events round robin over every existing object of the facilities, as fast as possible
+        with self._lock:
+            targets = [(facility, index) for facility in facilities for index in self.objects.get(facility, {})]
+
+        for facility, index in itertools.islice(itertools.cycle(targets), count):
+            self.emit(facility, index, t)
+
+    def reset_counters(self):
+        with self._lock:
+            self.round_trips = 0
+            self.calls.clear()
+            self.writes.clear()
+            self.events_emitted = 0
+
+    def wait_idle(self, timeout: float = 10) -> bool:
+        # True once every subscriber handled its events and is waiting for more
+        deadline = time.monotonic() + timeout
+
+        while time.monotonic() < deadline:
+            with self._lock:
+                subscriptions = list(self.subscriptions)
+
+            if all(subscription.is_idle() for subscription in subscriptions):
+                return True
+            time.sleep(0.001)
+        return False
+
+    # AudioBackend
+
+    def get_all(self, facility: str) -> list:
+        self._round_trip("get_all")
+
+        with self._lock:
+            return [copy.deepcopy(obj) for obj in self.objects.get(facility, {}).values()]
+
+    def get(self, facility: str, index: int):
+        self._round_trip("get")
+
+        with self._lock:
+            obj = self.objects.get(facility, {}).get(index)
+            if obj is None:
+                raise pulsectl.PulseIndexError(index)
+            # Every query hands out a new object, like libpulse does
+            return copy.deepcopy(obj)
+
+    def get_by_name(self, facility: str, name: str):
+        self._round_trip("get_by_name")
+
+        with self._lock:
+            for obj in self.objects.get(facility, {}).values():
+                if obj.name == name:
+                    return copy.deepcopy(obj)
+        raise pulsectl.PulseIndexError(name)
+
+    def server_info(self) -> SimulatedServerInfo:
+        self._round_trip("server_info")
+        return SimulatedServerInfo(self.default_sink_name, self.default_source_name)
+
+    def set_volume(self, obj, values: list[float]):
+        self._round_trip("set_volume")
+        self._write("set_volume", obj, volume=pulsectl.PulseVolumeInfo(list(values)))
+        obj.volume = pulsectl.PulseVolumeInfo(list(values))
+
+    def mute(self, obj, state: bool):
+        self._round_trip("mute")
+        self._write("mute", obj, mute=int(state))
+        obj.mute = int(state)
+
+    def set_default(self, facility: str, obj):
+        self._round_trip("set_default")
+
+        with self._lock:
+            if facility == "sink":
+                self.default_sink_name = obj.name
+            elif facility == "source":
+                self.default_source_name = obj.name
+            self.writes.append((time.monotonic(), "set_default", facility, obj.index))
+
+        self.emit("server", 0, "change")
+
+    def subscribe(self, client_name: str, *masks) -> SimulatedSubscription:
+        subscription = SimulatedSubscription(self, client_name, *masks)
+
+        with self._lock:
+            self.subscriptions.append(subscription)
+        return subscription
+
+    def open_peak_sampler(self, client_name: str, rate: float) -> SimulatedPeakSampler:
+        return SimulatedPeakSampler(self, rate)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "round_trips": self.round_trips,
+                "writes": len(self.writes),
+                "events_emitted": self.events_emitted,
+                "subscriptions": len(self.subscriptions),
+            }
+
+    def _unsubscribe(self, subscription: SimulatedSubscription):
+        with self._lock:
+            if subscription in self.subscriptions:
+                self.subscriptions.remove(subscription)
+
+    def _round_trip(self, method: str):
+        with self._lock:
+            self.round_trips += 1
+            self.calls[method] += 1
+
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def _add(self, facility: str, name: str, description: str, volume, proplist: dict, **attributes) -> SimulatedObject:
+        with self._lock:
+            index = next(self._indices)
+            properties = {"device.description": description, "node.name": name}
+            properties.update(proplist or {})
+
+            obj = SimulatedObject(facility, index, name, description, list(volume), properties, **attributes)
+            self.objects[facility][index] = obj
+
+        self.emit(facility, index, "new")
+        return obj
+
+    def _write(self, method: str, obj, **changes):
+        with self._lock:
+            target = self.objects.get(obj.facility, {}).get(obj.index)
+            if target is None:
+                raise pulsectl.PulseIndexError(obj.index)
+
+            for key, value in changes.items():
+                setattr(target, key, value)
+            self.writes.append((time.monotonic(), method, obj.facility, obj.index))
+
+        self.emit(obj.facility, obj.index, "change")
@@ -0,0 +1,215 @@
+import asyncio
+import threading
+
+import pulsectl
+from loguru import logger as log
+
+from .DeviceCatalog import Device
+from .DeviceStore import facility_name
+from .AudioBackend import audio_backend
+
+STREAM_FACILITIES = ("sink_input", "source_output")
+
+APP_PROPERTIES = ("application.name", "application.process.binary")
+
+
+def get_app_name(stream) -> str | None:
+    for key in APP_PROPERTIES:
+        value = stream.proplist.get(key)
+        if value:
+            return value
+    return None
+
+
+def get_app_keys(stream) -> set[str]:
+    # A stream can be matched by its application name or by its binary
+    return {value for value in (stream.proplist.get(key) for key in APP_PROPERTIES) if value}
+
+
+class StreamIndex:
+    def __init__(self):
+        self._streams: dict[str, dict[int, object]] = {}
+        # app key -> indices of its current streams
+        self._apps: dict[str, dict[str, set[int]]] = {}
+        # Every app seen so far, handed out by reference like the device catalog
+        self._app_items: dict[str, list[Device]] = {}
+        self._lock = threading.RLock()
+
+        self.listeners: list = []
+
+    def snapshot(self, facility: str):
+        streams = audio_backend.get_all(facility)
+
+        with self._lock:
+            self._streams[facility] = {}
+            self._apps[facility] = {}
+            self._app_items.setdefault(facility, [])
+
+            for stream in streams:
+                self._put(facility, stream)
+
+    def resync(self):
+        with self._lock:
+            facilities = list(self._streams)
+
+        for facility in facilities:
+            self.snapshot(facility)
+            self._notify(facility)
+
+    def is_loaded(self, facility: str) -> bool:
+        return facility in self._streams
+
+    def get_all(self, filter) -> list:
+        facility = facility_name(filter)
+        self._ensure_loaded(facility)
+
+        with self._lock:
+            return list(self._streams[facility].values())
+
+    def get_stream(self, filter, index: int):
+        facility = facility_name(filter)
+        self._ensure_loaded(facility)
+
+        with self._lock:
+            return self._streams[facility].get(index)
+
+    def get_streams(self, filter, app: str) -> list:
+        facility = facility_name(filter)
+        self._ensure_loaded(facility)
+
+        with self._lock:
+            streams = self._streams[facility]
+            return [streams[index] for index in sorted(self._apps[facility].get(app, ())) if index in streams]
+
+    def get_indices(self, filter, app: str) -> set[int]:
+        facility = facility_name(filter)
+        self._ensure_loaded(facility)
+
+        with self._lock:
+            return set(self._apps[facility].get(app, ()))
+
+    def get_apps(self, filter) -> list[Device]:
+        facility = facility_name(filter)
+        self._ensure_loaded(facility)
+
+        with self._lock:
+            return self._app_items[facility]
+
+    def add_app(self, filter, app: str):
+        # Keeps a configured app selectable while it is not running
+        facility = facility_name(filter)
+        self._ensure_loaded(facility)
+
+        with self._lock:
+            self._add_app_item(facility, app)
+
+    def add_listener(self, callback):
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def apply_event(self, event):
+        facility = facility_name(event.facility)
+        if facility not in STREAM_FACILITIES or not self.is_loaded(facility):
+            return
+
+        try:
+            if event.t == pulsectl.PulseEventTypeEnum.remove:
+                changed = self._remove(facility, event.index)
+            else:
+                try:
+                    stream = audio_backend.get(facility, event.index)
+                    changed = self._update(facility, stream)
+                except pulsectl.PulseIndexError:
+                    changed = self._remove(facility, event.index)
+        except Exception as e:
+            log.error(f"Error while updating stream index for {facility} {event.index}: {e}")
+            return
+
+        if changed:
+            self._notify(facility)
+
+    async def apply_event_async(self, event, backend):
+        facility = facility_name(event.facility)
+        if facility not in STREAM_FACILITIES or not self.is_loaded(facility):
+            return
+
+        try:
+            if event.t == pulsectl.PulseEventTypeEnum.remove:
+                changed = self._remove(facility, event.index)
+            else:
+                try:
+                    changed = self._update(facility, await backend.call(f"{facility}_info", event.index))
+                except pulsectl.PulseIndexError:
+                    changed = self._remove(facility, event.index)
+        except Exception as e:
+            log.error(f"Error while updating stream index for {facility} {event.index}: {e}")
+            return
+
+        if changed:
+            # Listeners may block, which must not happen on the backend loop
+            await asyncio.get_running_loop().run_in_executor(None, self._notify, facility)
+
+    def clear(self):
+        with self._lock:
+            self._streams.clear()
+            self._apps.clear()
+
+    def _ensure_loaded(self, facility: str):
+        if not self.is_loaded(facility):
+            self.snapshot(facility)
+
+    def _update(self, facility: str, stream) -> bool:
+        # Returns True if the set of streams of an app changed, or one of them was corked or uncorked
+        with self._lock:
+            old = self._streams[facility].get(stream.index)
+            changed = old is None or get_app_keys(old) != get_app_keys(stream) or getattr(old, "corked", None) != getattr(stream, "corked", None)
+
+            if old is not None and changed:
+                self._remove(facility, stream.index)
+            self._put(facility, stream)
+            return changed
+
+    def _put(self, facility: str, stream):
+        self._streams[facility][stream.index] = stream
+
+        for key in get_app_keys(stream):
+            self._apps[facility].setdefault(key, set()).add(stream.index)
+
+        app_name = get_app_name(stream)
+        if app_name is not None:
+            self._add_app_item(facility, app_name)
+
+    def _remove(self, facility: str, index: int) -> bool:
+        with self._lock:
+            stream = self._streams[facility].pop(index, None)
+            if stream is None:
+                return False
+
+            apps = self._apps[facility]
+            for key in get_app_keys(stream):
+                indices = apps.get(key)
+                if indices is None:
+                    continue
+                indices.discard(index)
+                if not indices:
+                    del apps[key]
+            return True
+
+    def _add_app_item(self, facility: str, app: str):
+        items = self._app_items.setdefault(facility, [])
+        if not any(item.pulse_name == app for item in items):
+            items.append(Device(pulse_name=app, pulse_index=None, device_name=app))
+
+    def _notify(self, facility: str):
+        for callback in list(self.listeners):
+            try:
+                callback(facility)
+            except Exception as e:
+                log.error(f"Error while notifying stream index listener {callback}: {e}")
+
+
+stream_index = StreamIndex()
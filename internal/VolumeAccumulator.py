@@ -0,0 +1,97 @@
+import threading
+
+from loguru import logger as log
+
+
+class PendingAdjustment:
+    def __init__(self, apply):
+        self.apply = apply
+        self.delta: int = 0
+        self.detents: int = 0
+        self.scheduled: bool = False
+        self.running: bool = False
+
+
+class VolumeAccumulator:
+    def __init__(self, window: float = 1 / 30):
+        self.window = window
+
+        self._pending: dict[tuple, PendingAdjustment] = {}
+        self._lock = threading.Lock()
+
+        # Counters
+        self.detents_received: int = 0
+        self.writes: int = 0
+
+    def add(self, key: tuple, delta: int, apply):
+        # apply(delta) is called at most once per window and key with the sum of all deltas added in between. Callers
+        # that clamp differently need keys of their own, only the latest apply of a key is called
+        with self._lock:
+            self.detents_received += 1
+
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = PendingAdjustment(apply)
+                self._pending[key] = pending
+
+            pending.apply = apply
+            pending.delta += delta
+            pending.detents += 1
+
+            # While a write is running the next window is scheduled once it finishes
+            if not pending.scheduled and not pending.running:
+                self._schedule(key, pending)
+
+    def has_waiting(self, key: tuple) -> bool:
+        # True while detents wait for their write, not counting the one being written
+        with self._lock:
+            pending = self._pending.get(key)
+            return pending is not None and pending.detents > 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "detents_received": self.detents_received,
+                "writes": self.writes,
+                "detents_merged": self.detents_received - self.writes,
+            }
+
+    def _schedule(self, key: tuple, pending: PendingAdjustment):
+        pending.scheduled = True
+
+        timer = threading.Timer(self.window, self._flush, args=(key,))
+        timer.daemon = True
+        timer.start()
+
+    def _flush(self, key: tuple):
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                return
+
+            delta, detents, apply = pending.delta, pending.detents, pending.apply
+            pending.delta = 0
+            pending.detents = 0
+            pending.scheduled = False
+            pending.running = True
+            self.writes += 1
+
+        if detents > 1:
+            log.debug(f"Merged {detents} detents into one volume write for {key}")
+
+        try:
+            if delta != 0:
+                apply(delta)
+        except Exception as e:
+            log.error(f"Error while applying merged volume adjustment for {key}: {e}")
+        finally:
+            with self._lock:
+                pending.running = False
+
+                if pending.detents > 0:
+                    self._schedule(key, pending)
+                else:
+                    del self._pending[key]
+
+
+volume_accumulator = VolumeAccumulator()
@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw
+
+
+# ok, warning (above 100 %), track, muted
+DEFAULT_COLORS = (
+    (255, 255, 255, 255),
+    (220, 60, 60, 255),
+    (80, 80, 80, 160),
+    (120, 120, 120, 255),
+)
+
+
+class VolumeRenderer:
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+
+        # (style, size, value, colors, muted, base key, id of base) -> (base, frame), oldest first. Holding on to base
+        # keeps its id from being reused by another image while the entry lives
+        self._frames: OrderedDict[tuple, tuple[Image.Image, Image.Image]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.bytes: int = 0
+
+    def render(self, style: str, base: Image.Image, base_key, value: int, colors: tuple, muted: bool = False) -> Image.Image:
+        # base_key names the base, the image itself is identified rather than hashed
+        size = max(base.size)
+        value = max(0, min(int(value), 150))
+        key = (style, size, value, colors, muted, base_key, id(base))
+
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is not None:
+                self._frames.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        frame = self._draw(style, base, size, value, colors, muted)
+
+        with self._lock:
+            if key not in self._frames:
+                self._frames[key] = (base, frame)
+                self.bytes += self._frame_bytes(frame)
+                self._evict()
+        return frame
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "frames": len(self._frames),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and len(self._frames) > 1:
+            _, (_, frame) = self._frames.popitem(last=False)
+            self.bytes -= self._frame_bytes(frame)
+            self.evictions += 1
+
+    def _frame_bytes(self, frame: Image.Image) -> int:
+        return frame.width * frame.height * len(frame.getbands())
+
+    def _draw(self, style: str, base: Image.Image, size: int, value: int, colors: tuple, muted: bool) -> Image.Image:
+        ok_color, warning_color, track_color, muted_color = colors
+
+        frame = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        base = base.convert("RGBA")
+        frame.paste(base, ((size - base.width) // 2, (size - base.height) // 2), base)
+
+        draw = ImageDraw.Draw(frame)
+
+        if muted:
+            color = muted_color
+        elif value > 100:
+            color = warning_color
+        else:
+            color = ok_color
+
+        # 150 % fills the whole indicator
+        fill = value / 150
+        thickness = max(2, size // 12)
+
+        if style == "arc":
+            margin = thickness // 2 + 1
+            box = (margin, margin, size - margin - 1, size - margin - 1)
+            draw.arc(box, 135, 405, fill=track_color, width=thickness)
+            if fill > 0:
+                draw.arc(box, 135, 135 + 270 * fill, fill=color, width=thickness)
+        else:
+            top = size - thickness - 1
+            draw.rectangle((0, top, size - 1, size - 1), fill=track_color)
+            if fill > 0:
+                draw.rectangle((0, top, round((size - 1) * fill), size - 1), fill=color)
+
+        return frame
+
+
+volume_renderer = VolumeRenderer()
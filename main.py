@@ -1,8 +1,17 @@
 # Import StreamController modules
 import os.path
+import shutil
+import time
 
+# Start of the import-to-registered time
+IMPORT_STARTED = time.perf_counter()
+
+import gi
 import pulsectl
-from gi.repository import Gtk
+
+gi.require_version("Adw", "1")
+from gi.repository import Adw, GLib, Gtk
+from loguru import logger as log
 
 from src.backend.PluginManager.ActionHolder import ActionHolder
 from src.backend.PluginManager.ActionInputSupport import ActionInputSupport
@@ -11,7 +20,21 @@ from src.backend.PluginManager.PluginBase import PluginBase
 from src.backend.DeckManagement.InputIdentifier import Input
 from src.backend.DeckManagement.ImageHelpers import image2pixbuf
 
+from .internal.AudioBackend import audio_backend
+from .internal.DeviceCatalog import device_catalog
+from .internal.DeviceNames import device_names
+from .internal.DuckingEngine import ducking_engine
+from .internal.FadeEngine import fade_engine
+from .internal.IconLoader import icon_loader
+from .internal.Instrumentation import instrumentation
+from .internal.OutputCache import output_counters
+from .internal.PulseAsyncBackend import pulse_async_backend
+from .internal.PulseHelpers import DeviceFilter
 from .internal.PulseEventListener import PulseEvent
+from .internal.SceneStore import scene_store
+from .internal.SimulatedBackend import SimulatedBackend
+from .internal.VolumeAccumulator import volume_accumulator
+from .internal.VolumeRenderer import volume_renderer
 
 from .actions.Mute import Mute
 from .actions.SetVolume import SetVolume
@@ -19,13 +42,22 @@ from .actions.AdjustVolume import AdjustVolume
 from .actions.ToggleDefaultDevice import ToggleDefaultDevice
 from .actions.VolumeWarning import VolumeWarning
 from .actions.AudioDisplay import AudioDisplay
+from .actions.PeakMeter import PeakMeter
 from .actions.SetDefaultDevice import SetDefaultDevice
+from .actions.AppVolume import AppVolume
+from .actions.AppMute import AppMute
+from .actions.GroupSetVolume import GroupSetVolume
+from .actions.GroupAdjustVolume import GroupAdjustVolume
+from .actions.GroupMute import GroupMute
+from .actions.Scene import Scene
+from .actions.Ducking import Ducking
 
 from .globals import Icons, Colors
 
 class AudioControl(PluginBase):
     def __init__(self):
         super().__init__(use_legacy_locale=False)
+        self.init_backend()
         self.init_vars()
 
         self.has_plugin_settings = True
@@ -43,6 +75,19 @@ class AudioControl(PluginBase):
         )
         self.add_action_holder(self.audio_display)
 
+        self.peak_meter = ActionHolder(
+            plugin_base=self,
+            action_core=PeakMeter,
+            action_id_suffix="PeakMeter",
+            action_name="Peak Meter",
+            action_support= {
+                Input.Key: ActionInputSupport.SUPPORTED,
+                Input.Dial: ActionInputSupport.SUPPORTED,
+                Input.Touchscreen: ActionInputSupport.UNTESTED
+            }
+        )
+        self.add_action_holder(self.peak_meter)
+
         self.mute = ActionHolder(
             plugin_base=self,
             action_core=Mute,
@@ -121,37 +166,276 @@ class AudioControl(PluginBase):
         )
         self.add_action_holder(self.volume_warning)
 
+        self.app_volume = ActionHolder(
+            plugin_base=self,
+            action_core=AppVolume,
+            action_id_suffix="AppVolume",
+            action_name="App Volume",
+            action_support={
+                Input.Key: ActionInputSupport.SUPPORTED,
+                Input.Dial: ActionInputSupport.SUPPORTED,
+                Input.Touchscreen: ActionInputSupport.UNTESTED
+            }
+        )
+        self.add_action_holder(self.app_volume)
+
+        self.app_mute = ActionHolder(
+            plugin_base=self,
+            action_core=AppMute,
+            action_id_suffix="AppMute",
+            action_name="App Mute",
+            action_support={
+                Input.Key: ActionInputSupport.SUPPORTED,
+                Input.Dial: ActionInputSupport.SUPPORTED,
+                Input.Touchscreen: ActionInputSupport.UNTESTED
+            }
+        )
+        self.add_action_holder(self.app_mute)
+
+        self.group_set_volume = ActionHolder(
+            plugin_base=self,
+            action_core=GroupSetVolume,
+            action_id_suffix="GroupSetVolume",
+            action_name="Group Set Volume",
+            action_support={
+                Input.Key: ActionInputSupport.SUPPORTED,
+                Input.Dial: ActionInputSupport.SUPPORTED,
+                Input.Touchscreen: ActionInputSupport.UNTESTED
+            }
+        )
+        self.add_action_holder(self.group_set_volume)
+
+        self.group_adjust_volume = ActionHolder(
+            plugin_base=self,
+            action_core=GroupAdjustVolume,
+            action_id_suffix="GroupAdjustVolume",
+            action_name="Group Adjust Volume",
+            action_support={
+                Input.Key: ActionInputSupport.SUPPORTED,
+                Input.Dial: ActionInputSupport.SUPPORTED,
+                Input.Touchscreen: ActionInputSupport.UNTESTED
+            }
+        )
+        self.add_action_holder(self.group_adjust_volume)
+
+        self.group_mute = ActionHolder(
+            plugin_base=self,
+            action_core=GroupMute,
+            action_id_suffix="GroupMute",
+            action_name="Group Mute",
+            action_support={
+                Input.Key: ActionInputSupport.SUPPORTED,
+                Input.Dial: ActionInputSupport.SUPPORTED,
+                Input.Touchscreen: ActionInputSupport.UNTESTED
+            }
+        )
+        self.add_action_holder(self.group_mute)
+
+        self.scene = ActionHolder(
+            plugin_base=self,
+            action_core=Scene,
+            action_id_suffix="Scene",
+            action_name="Scene",
+            action_support={
+                Input.Key: ActionInputSupport.SUPPORTED,
+                Input.Dial: ActionInputSupport.SUPPORTED,
+                Input.Touchscreen: ActionInputSupport.UNTESTED
+            }
+        )
+        self.add_action_holder(self.scene)
+
+        self.ducking = ActionHolder(
+            plugin_base=self,
+            action_core=Ducking,
+            action_id_suffix="Ducking",
+            action_name="Ducking",
+            action_support={
+                Input.Key: ActionInputSupport.SUPPORTED,
+                Input.Dial: ActionInputSupport.SUPPORTED,
+                Input.Touchscreen: ActionInputSupport.UNTESTED
+            }
+        )
+        self.add_action_holder(self.ducking)
+
         # Events
 
         self.pulse_sink_event_holder = PulseEvent(
             self,
             "com_gapls_AudioControl::PulseEvent",
             pulsectl.PulseEventMaskEnum.sink,
-            pulsectl.PulseEventMaskEnum.source
+            pulsectl.PulseEventMaskEnum.source,
+            pulsectl.PulseEventMaskEnum.server,
+            pulsectl.PulseEventMaskEnum.sink_input,
+            pulsectl.PulseEventMaskEnum.source_output,
+            coalesce_window=self.get_settings().get("event-coalesce-window", 1 / 30)
         )
         self.add_event_holder(self.pulse_sink_event_holder)
 
+        self.init_instrumentation()
+
         self.register()
 
+        self.startup_time = time.perf_counter() - IMPORT_STARTED
+        log.info(f"AudioControl registered {self.startup_time * 1000:.1f} ms after import")
+
+        # Icons nobody asked for yet are loaded one at a time while the main loop is idle
+        GLib.idle_add(icon_loader.load_next)
+
     def get_selector_icon(self) -> Gtk.Widget:
+        icon_loader.load(Icons.MAIN)
         _, rendered = self.asset_manager.icons.get_asset_values(Icons.MAIN)
         return Gtk.Image.new_from_pixbuf(image2pixbuf(rendered))
 
+    def get_settings_area(self) -> Gtk.Widget:
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=24)
+        box.append(self.create_device_names_group())
+        box.append(self.create_instrumentation_group())
+        return box
+
+    def create_device_names_group(self) -> Adw.PreferencesGroup:
+        group = Adw.PreferencesGroup(
+            title="Device Names",
+            description="Overrides the detected name of a device. Leave empty to use the detected name"
+        )
+
+        for device_filter in DeviceFilter:
+            for device in device_catalog.get_devices(device_filter):
+                row = Adw.EntryRow(title=device.pulse_name, show_apply_button=True)
+                row.set_text(device_names.overrides.get(device.pulse_name, ""))
+                row.connect("apply", self.on_device_name_override_apply, device.pulse_name)
+                group.add(row)
+
+        return group
+
+    def on_device_name_override_apply(self, row, pulse_name: str):
+        device_names.set_override(pulse_name, row.get_text().strip())
+
+        settings = self.get_settings()
+        settings["device-name-overrides"] = device_names.overrides
+        self.set_settings(settings)
+
+        device_catalog.refresh_names()
+
+    def create_instrumentation_group(self) -> Adw.PreferencesGroup:
+        group = Adw.PreferencesGroup(
+            title="Performance",
+            description="Counters and latencies of pulse calls, events and action updates"
+        )
+
+        enabled_row = Adw.SwitchRow(title="Collect performance data", active=instrumentation.enabled)
+        enabled_row.connect("notify::active", self.on_instrumentation_toggled)
+        group.add(enabled_row)
+
+        summary = Gtk.Label(label=instrumentation.summary(), xalign=0, selectable=True, wrap=True, css_classes=["monospace"])
+
+        refresh_button = Gtk.Button(label="Refresh")
+        refresh_button.connect("clicked", lambda button: summary.set_label(instrumentation.summary()))
+
+        reset_button = Gtk.Button(label="Reset")
+        reset_button.connect("clicked", lambda button: (instrumentation.reset(), summary.set_label(instrumentation.summary())))
+
+        dump_button = Gtk.Button(label="Save as JSON")
+        dump_button.connect("clicked", self.on_instrumentation_dump, summary)
+
+        buttons = Gtk.Box(spacing=6, margin_top=12, margin_bottom=12)
+        buttons.append(refresh_button)
+        buttons.append(reset_button)
+        buttons.append(dump_button)
+
+        group.add(buttons)
+        group.add(summary)
+        return group
+
+    def on_instrumentation_toggled(self, row, *args):
+        instrumentation.enabled = row.get_active()
+
+        settings = self.get_settings()
+        settings["instrumentation"] = instrumentation.enabled
+        self.set_settings(settings)
+
+    def on_instrumentation_dump(self, button, summary: Gtk.Label):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"instrumentation-{time.strftime('%Y%m%d-%H%M%S')}.json")
+
+        try:
+            instrumentation.dump(path)
+            summary.set_label(f"Saved to {path}\n\n{instrumentation.summary()}")
+        except OSError as e:
+            summary.set_label(f"Could not save to {path}: {e}")
+
+    def init_instrumentation(self):
+        instrumentation.enabled = self.get_settings().get("instrumentation", False)
+
+        # Read only when a snapshot is taken
+        instrumentation.add_source("backend", lambda: audio_backend.backend.stats())
+        instrumentation.add_source("async_backend", pulse_async_backend.stats)
+        instrumentation.add_source("events", self.pulse_sink_event_holder.stats)
+        instrumentation.add_source("volume_accumulator", volume_accumulator.stats)
+        instrumentation.add_source("volume_renderer", volume_renderer.stats)
+        instrumentation.add_source("device_names", device_names.stats)
+        instrumentation.add_source("fades", fade_engine.stats)
+        instrumentation.add_source("scenes", scene_store.stats)
+        instrumentation.add_source("ducking", ducking_engine.stats)
+        instrumentation.add_source("device_catalog", lambda: {"builds": device_catalog.builds})
+        instrumentation.add_source("output", lambda: dict(output_counters))
+        instrumentation.add_source("icons", icon_loader.stats)
+        instrumentation.add_source("startup", lambda: {"import_to_registered_ms": round(self.startup_time * 1000, 3)})
+
+    def init_backend(self):
+        settings = self.get_settings()
+
+        if settings.get("audio-backend", "pulsectl") == "simulator":
+            # Runs without a sound server, e.g. to load test many buttons on a headless machine
+            simulator = SimulatedBackend(latency=settings.get("simulator-latency", 0) / 1000)
+            simulator.populate(
+                sinks=settings.get("simulator-devices", 2),
+                sources=settings.get("simulator-devices", 2),
+                apps=settings.get("simulator-apps", 4)
+            )
+            audio_backend.use(simulator)
+        else:
+            pulse_async_backend.enabled = settings.get("async-backend", True)
+
+    def get_scene_directory(self) -> str:
+        # Next to settings.json, which outlives updates and reinstalls of the plugin directory
+        settings_path = getattr(self, "settings_path", None)
+        if settings_path:
+            return os.path.join(os.path.dirname(settings_path), "scenes")
+
+        data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+        return os.path.join(data_home, "StreamController", "plugins", os.path.basename(os.path.dirname(os.path.abspath(__file__))), "scenes")
+
+    def move_old_scenes(self):
+        # Earlier versions kept scenes inside the plugin directory
+        old_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenes")
+        if not os.path.isdir(old_directory) or os.path.exists(scene_store.directory):
+            return
+
+        try:
+            os.makedirs(os.path.dirname(scene_store.directory), exist_ok=True)
+            shutil.move(old_directory, scene_store.directory)
+            log.info(f"Moved saved scenes to {scene_store.directory}")
+        except OSError as e:
+            log.error(f"Error while moving saved scenes to {scene_store.directory}: {e}")
+
     def init_vars(self):
-        self.pulse = pulsectl.Pulse("audio-control-main")
+        device_names.load_overrides(self.get_settings().get("device-name-overrides", {}))
+        scene_store.directory = self.get_scene_directory()
+        self.move_old_scenes()
 
         self.add_color(Colors.VOLUME_OK, (0,0,0,0))
         self.add_color(Colors.VOLUME_WARNING, (111,29,29,255))
 
+        # Decoded once the first action asks for them, see IconLoader
+        icon_loader.plugin_base = self
         size = 0.7
 
-        self.add_icon(Icons.MAIN, self.get_asset_path("main_icon.png"))
+        icon_loader.register(Icons.MAIN, self.get_asset_path("main_icon.png"))
 
-        self.add_icon(Icons.MUTED, self.get_asset_path("audio_muted.png"), size)
-        self.add_icon(Icons.UNMUTED, self.get_asset_path("audio.png"), size)
-        self.add_icon(Icons.VOLUME_DOWN, self.get_asset_path("volume_down.png"), size)
-        self.add_icon(Icons.VOLUME_UP, self.get_asset_path("volume_up.png"), size)
+        icon_loader.register(Icons.MUTED, self.get_asset_path("audio_muted.png"), size)
+        icon_loader.register(Icons.UNMUTED, self.get_asset_path("audio.png"), size)
+        icon_loader.register(Icons.VOLUME_DOWN, self.get_asset_path("volume_down.png"), size)
+        icon_loader.register(Icons.VOLUME_UP, self.get_asset_path("volume_up.png"), size)
 
-        self.add_icon(Icons.SPEAKER_DEFAULT, self.get_asset_path("speaker_default.png"))
-        self.add_icon(Icons.HEADPHONE_DEFAULT, self.get_asset_path("headphone_default.png"))
-        self.add_icon(Icons.NONE_DEFAULT, self.get_asset_path("none_default.png"))
\ No newline at end of file
+        icon_loader.register(Icons.SPEAKER_DEFAULT, self.get_asset_path("speaker_default.png"))
+        icon_loader.register(Icons.HEADPHONE_DEFAULT, self.get_asset_path("headphone_default.png"))
+        icon_loader.register(Icons.NONE_DEFAULT, self.get_asset_path("none_default.png"))
\ No newline at end of file